@@ -0,0 +1,60 @@
+"""
+Benchmark importazione massiva
+==============================
+Misura il tempo di StudentService.importa_studenti su un CSV generato con
+un voto per riga, confrontandolo con il costo di una singola chiamata ad
+aggiungi_voto_studente (che riscrive ogni volta l'intero file).
+
+Uso:
+    python benchmarks/bench_importazione.py [numero_righe]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data_manager import FileManager
+from src.importazione import leggi_righe_csv
+from src.student_service import StudentService
+
+NOMI = ["Mario", "Lucia", "Paolo", "Anna", "Marco", "Giulia", "Luca", "Sara"]
+COGNOMI = ["Rossi", "Bianchi", "Verdi", "Neri", "Gialli", "Russo", "Ferrari", "Esposito"]
+
+
+def genera_csv(numero_righe: int) -> str:
+    """Genera un CSV con dieci voti per studente"""
+    righe = ["matricola,nome,cognome,voto"]
+    for i in range(numero_righe):
+        studente = i // 10
+        righe.append(f"{100000 + studente},{NOMI[studente % len(NOMI)]},"
+                     f"{COGNOMI[studente % len(COGNOMI)]},{18 + i % 13}")
+    return "\n".join(righe) + "\n"
+
+
+def main():
+    numero_righe = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    contenuto = genera_csv(numero_righe)
+    
+    with tempfile.TemporaryDirectory() as cartella:
+        service = StudentService(FileManager(Path(cartella) / "registro.txt"))
+        inizio = time.perf_counter()
+        rapporto = service.importa_studenti(leggi_righe_csv(io.StringIO(contenuto)))
+        importazione = time.perf_counter() - inizio
+        
+        inizio = time.perf_counter()
+        service.aggiungi_voto_studente("100000", "30")
+        singola = time.perf_counter() - inizio
+    
+    print(f"Righe: {numero_righe} ({rapporto.studenti_creati} studenti, {rapporto.righe_scartate} scartate)")
+    print(f"Importazione in blocco:        {importazione:8.2f} s")
+    print(f"Un voto con aggiungi_voto:     {singola * 1000:8.1f} ms "
+          f"(stima per tutte le righe: {singola * numero_righe / 60:.0f} min)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark memoria per studente
+==============================
+Confronta la memoria occupata da Studente (con __slots__ e voti in
+array('B')) con una rappresentazione equivalente basata su __dict__ e
+liste di interi, come nelle versioni precedenti.
+
+Uso:
+    python benchmarks/bench_memoria.py [numero_studenti]
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models import Studente
+
+NOMI = ["Mario", "Lucia", "Paolo", "Anna", "Marco", "Giulia", "Luca", "Sara"]
+COGNOMI = ["Rossi", "Bianchi", "Verdi", "Neri", "Gialli", "Russo", "Ferrari", "Esposito"]
+
+
+class StudenteNonCompatto:
+    """Rappresentazione di riferimento: __dict__ per istanza e voti in una lista"""
+    
+    def __init__(self, nome: str, cognome: str, matricola: int, voti):
+        self.nome = nome.strip().title()
+        self.cognome = cognome.strip().title()
+        self.matricola = matricola
+        self.voti = list(voti)
+
+
+def misura(classe, numero: int) -> float:
+    """Restituisce i byte allocati in media per studente"""
+    tracemalloc.start()
+    prima = tracemalloc.get_traced_memory()[0]
+    studenti = [
+        classe(NOMI[i % len(NOMI)], COGNOMI[i % len(COGNOMI)], 100000 + i,
+               [18 + (i + k) % 13 for k in range(i % 10 + 1)])
+        for i in range(numero)
+    ]
+    dopo = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del studenti
+    return (dopo - prima) / numero
+
+
+def main():
+    numero = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    riferimento = misura(StudenteNonCompatto, numero)
+    compatto = misura(Studente, numero)
+    
+    print(f"Studenti: {numero}")
+    print(f"Rappresentazione con __dict__: {riferimento:8.1f} byte/studente")
+    print(f"Studente compatto:             {compatto:8.1f} byte/studente")
+    print(f"Risparmio:                     {riferimento - compatto:8.1f} byte/studente "
+          f"({(1 - compatto / riferimento) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
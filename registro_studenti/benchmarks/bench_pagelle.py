@@ -0,0 +1,47 @@
+"""
+Benchmark pagelle
+=================
+Misura le pagelle PDF create al secondo da esporta_pagelle nel processo
+corrente e con un processo per CPU.
+
+Uso:
+    python benchmarks/bench_pagelle.py [numero_studenti]
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.pdf_exporter import esporta_pagelle
+
+NOMI = ["Mario", "Lucia", "Paolo", "Anna", "Marco", "Giulia", "Luca", "Sara"]
+COGNOMI = ["Rossi", "Bianchi", "Verdi", "Neri", "Gialli", "Russo", "Ferrari", "Esposito"]
+
+
+def genera_studenti(numero: int):
+    """Genera studenti con da zero a nove voti"""
+    return [{
+        "matricola": str(100000 + i),
+        "nome": NOMI[i % len(NOMI)],
+        "cognome": COGNOMI[i % len(COGNOMI)],
+        "voti": [18 + (i + k) % 13 for k in range(i % 10)],
+    } for i in range(numero)]
+
+
+def main():
+    numero = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    studenti = genera_studenti(numero)
+    processi = os.cpu_count() or 1
+    
+    for etichetta, numero_processi in (("Nel processo corrente", 1), (f"Con {processi} processi", processi)):
+        with tempfile.TemporaryDirectory() as cartella:
+            risultato = esporta_pagelle(studenti, Path(cartella), processi=numero_processi)
+        print(f"{etichetta:24} {risultato.documenti} pagelle in {risultato.secondi:6.2f} s "
+              f"({risultato.documenti_al_secondo:.1f} documenti/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark esportazione PDF
+==========================
+Misura il tempo dell'esportazione a blocchi di
+PDFExporter.esporta_lista_studenti_streaming su studenti generati al volo,
+poi confronta tempo e picco di memoria (tracemalloc) con l'esportazione con
+un'unica tabella su un registro più piccolo.
+
+Uso:
+    python benchmarks/bench_pdf.py [numero_studenti] [numero_studenti_tabella_unica]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.pdf_exporter import PDFExporter
+
+NOMI = ["Mario", "Lucia", "Paolo", "Anna", "Marco", "Giulia", "Luca", "Sara"]
+COGNOMI = ["Rossi", "Bianchi", "Verdi", "Neri", "Gialli", "Russo", "Ferrari", "Esposito"]
+
+
+def genera_studenti(numero: int):
+    """Genera gli studenti uno alla volta, senza tenerli in memoria"""
+    for i in range(numero):
+        yield {
+            "matricola": str(100000 + i),
+            "nome": NOMI[i % len(NOMI)],
+            "cognome": COGNOMI[i % len(COGNOMI)],
+            "voti": [18 + (i + k) % 13 for k in range(i % 5)],
+        }
+
+
+def misura(esporta, studenti, nome_file: str, traccia_memoria: bool = False):
+    """Restituisce secondi impiegati e picco di memoria in MB (se tracciata)"""
+    if traccia_memoria:
+        tracemalloc.start()
+    inizio = time.perf_counter()
+    esporta(studenti, nome_file)
+    durata = time.perf_counter() - inizio
+    picco = 0
+    if traccia_memoria:
+        _, picco = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return durata, picco / 1024 / 1024
+
+
+def main():
+    numero = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    numero_tabella_unica = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    
+    with tempfile.TemporaryDirectory() as cartella:
+        exporter = PDFExporter(Path(cartella))
+        
+        durata, _ = misura(exporter.esporta_lista_studenti_streaming,
+                           genera_studenti(numero), "streaming.pdf")
+        dimensione = (Path(cartella) / "streaming.pdf").stat().st_size / 1024 / 1024
+        print(f"A blocchi, {numero} studenti: {durata:.2f} s, file {dimensione:.1f} MB")
+        
+        # tracemalloc rallenta molto l'esecuzione: i tempi qui sotto non
+        # sono confrontabili con quello precedente, ma tra loro sì
+        print(f"\nConfronto su {numero_tabella_unica} studenti (con tracemalloc):")
+        durata, picco = misura(exporter.esporta_lista_studenti_streaming,
+                               genera_studenti(numero_tabella_unica), "blocchi.pdf", True)
+        print(f"  A blocchi:     {durata:7.2f} s  picco {picco:6.1f} MB")
+        durata, picco = misura(exporter.esporta_lista_studenti,
+                               list(genera_studenti(numero_tabella_unica)), "tabella.pdf", True)
+        print(f"  Tabella unica: {durata:7.2f} s  picco {picco:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
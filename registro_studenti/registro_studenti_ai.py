@@ -21,7 +21,6 @@ from src.config import DEFAULT_DATA_PATH
 from src.ui import MenuUI
 from src.data_manager import FileManager
 from src.student_service import StudentService
-from src.pdf_exporter import PDFExporter
 
 def main():
     """Punto di ingresso principale dell'applicazione"""
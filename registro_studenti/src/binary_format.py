@@ -0,0 +1,189 @@
+"""
+Formato binario per gli snapshot del registro
+============================================
+Rappresentazione compatta del registro, alternativa al JSON indentato.
+
+Struttura del file (interi little endian senza segno):
+
+    intestazione   4s I I              magic, numero studenti N, numero stringhe S
+    record         N x (I I I I I)     indici di matricola, nome e cognome nella
+                                       tabella stringhe, offset e numero dei voti
+    offset         (S + 1) x I         inizio di ogni stringa nel blocco stringhe
+    stringhe       UTF-8               stringhe deduplicate, concatenate
+    voti           V x byte            un byte per voto, V = voti di tutti gli studenti
+
+I voti che non stanno in un byte (decimali, come 27.5, o fuori da 0-255)
+sono salvati senza perdite come array JSON nella tabella stringhe: il
+numero dei voti del record vale VOTI_JSON e l'offset è l'indice della
+stringa.
+
+I record hanno dimensione fissa, quindi lo studente i-esimo si decodifica
+direttamente dal file mappato in memoria senza leggere gli altri.
+"""
+
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import List, Dict, Iterator
+
+MAGIC = b"RSB1"
+_INTESTAZIONE = struct.Struct("<4sII")
+_RECORD = struct.Struct("<IIIII")
+_OFFSET = struct.Struct("<I")
+VOTI_JSON = 0xFFFFFFFF
+
+
+def codifica_snapshot(studenti: List[Dict]) -> bytes:
+    """
+    Codifica una lista di studenti nel formato binario.
+    
+    Come in Studente.to_dict la matricola viene salvata come stringa e i
+    voti mancanti come lista vuota, così si convertono anche i registri JSON
+    con matricole numeriche.
+    
+    Args:
+        studenti: Lista di dizionari nel formato di Studente.to_dict
+        
+    Returns:
+        bytes: Contenuto del file binario
+        
+    Raises:
+        ValueError: Se un dato non è rappresentabile senza perdita di informazioni
+    """
+    stringhe: Dict[str, int] = {}
+    record = bytearray()
+    voti_blob = bytearray()
+    
+    def indice_stringa(valore) -> int:
+        if not isinstance(valore, str):
+            raise ValueError(f"Valore non rappresentabile nel formato binario: {valore!r}")
+        return stringhe.setdefault(valore, len(stringhe))
+    
+    for posizione, studente in enumerate(studenti):
+        if not {"matricola", "nome", "cognome"} <= set(studente) <= {"matricola", "nome", "cognome", "voti"}:
+            raise ValueError(f"Studente {posizione} non rappresentabile nel formato binario")
+        voti = studente.get("voti", [])
+        matricola = studente["matricola"]
+        matricola = indice_stringa(str(matricola) if type(matricola) is int else matricola)
+        nome = indice_stringa(studente["nome"])
+        cognome = indice_stringa(studente["cognome"])
+        if all(type(v) is int and 0 <= v <= 255 for v in voti):
+            record += _RECORD.pack(matricola, nome, cognome, len(voti_blob), len(voti))
+            voti_blob += bytes(voti)
+        elif all(type(v) in (int, float) for v in voti):
+            record += _RECORD.pack(matricola, nome, cognome, indice_stringa(json.dumps(voti)), VOTI_JSON)
+        else:
+            raise ValueError(f"Voti dello studente {posizione} non numerici: {voti!r}")
+    
+    codificate = [s.encode("utf-8") for s in stringhe]
+    offset = bytearray(_OFFSET.pack(0))
+    totale = 0
+    for stringa in codificate:
+        totale += len(stringa)
+        offset += _OFFSET.pack(totale)
+    
+    return b"".join((
+        _INTESTAZIONE.pack(MAGIC, len(studenti), len(codificate)),
+        record,
+        offset,
+        *codificate,
+        voti_blob,
+    ))
+
+
+def is_snapshot_binario(percorso: Path) -> bool:
+    """Verifica dal contenuto (e non dall'estensione) se un file è uno snapshot binario"""
+    with open(percorso, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+class SnapshotBinario:
+    """Lettore con decodifica pigra di uno snapshot binario"""
+    
+    def __init__(self, buffer):
+        """
+        Inizializza il lettore su un buffer già caricato o mappato.
+        
+        Args:
+            buffer: Contenuto del file (bytes, memoryview o mmap)
+            
+        Raises:
+            ValueError: Se il buffer non è uno snapshot binario valido
+        """
+        if len(buffer) < _INTESTAZIONE.size:
+            raise ValueError("Snapshot binario troncato")
+        magic, self._numero, numero_stringhe = _INTESTAZIONE.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Il file non è uno snapshot binario del registro")
+        
+        self._buffer = buffer
+        self._mmap = None
+        self._inizio_offset = _INTESTAZIONE.size + self._numero * _RECORD.size
+        self._inizio_stringhe = self._inizio_offset + (numero_stringhe + 1) * _OFFSET.size
+        if len(buffer) < self._inizio_stringhe:
+            raise ValueError("Snapshot binario troncato")
+        (lunghezza_stringhe,) = _OFFSET.unpack_from(buffer, self._inizio_stringhe - _OFFSET.size)
+        self._inizio_voti = self._inizio_stringhe + lunghezza_stringhe
+    
+    @classmethod
+    def apri(cls, percorso: Path) -> 'SnapshotBinario':
+        """Apre uno snapshot mappando il file in memoria"""
+        with open(percorso, "rb") as file:
+            mappa = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            snapshot = cls(mappa)
+        except Exception:
+            mappa.close()
+            raise
+        snapshot._mmap = mappa
+        return snapshot
+    
+    def chiudi(self) -> None:
+        """Rilascia la mappatura del file"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+    
+    def __enter__(self) -> 'SnapshotBinario':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.chiudi()
+    
+    def _stringa(self, indice: int) -> str:
+        """Decodifica la stringa di posizione indice"""
+        inizio, fine = struct.unpack_from("<II", self._buffer, self._inizio_offset + indice * _OFFSET.size)
+        base = self._inizio_stringhe
+        return bytes(self._buffer[base + inizio:base + fine]).decode("utf-8")
+    
+    def __len__(self) -> int:
+        """Restituisce il numero di studenti"""
+        return self._numero
+    
+    def __getitem__(self, posizione: int) -> Dict:
+        """Decodifica lo studente in una data posizione"""
+        if posizione < 0:
+            posizione += self._numero
+        if not 0 <= posizione < self._numero:
+            raise IndexError("Posizione fuori dallo snapshot")
+        
+        matricola, nome, cognome, offset_voti, numero_voti = _RECORD.unpack_from(
+            self._buffer, _INTESTAZIONE.size + posizione * _RECORD.size
+        )
+        if numero_voti == VOTI_JSON:
+            voti = json.loads(self._stringa(offset_voti))
+        else:
+            inizio_voti = self._inizio_voti + offset_voti
+            voti = list(self._buffer[inizio_voti:inizio_voti + numero_voti])
+        return {
+            "matricola": self._stringa(matricola),
+            "nome": self._stringa(nome),
+            "cognome": self._stringa(cognome),
+            "voti": voti,
+        }
+    
+    def __iter__(self) -> Iterator[Dict]:
+        """Itera sugli studenti decodificandoli uno alla volta"""
+        for posizione in range(self._numero):
+            yield self[posizione]
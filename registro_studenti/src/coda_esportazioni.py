@@ -0,0 +1,259 @@
+"""
+Esportazioni PDF in background
+==============================
+Coda di lavori di esportazione eseguiti da un pool di processi, così il
+menu resta utilizzabile mentre il PDF viene generato e più esportazioni
+(ad esempio una per corso) possono procedere in parallelo su core diversi.
+
+Oltre alla lista degli studenti la coda esegue le pagelle dei singoli
+studenti (una cartella di PDF). Ogni lavoro riceve una copia degli
+studenti fatta al momento dell'invio;
+l'avanzamento (studenti esportati) arriva dai processi tramite una coda
+condivisa e viene letto dal menu quando serve.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from src.config import ESPORTAZIONI_PARALLELE, EXPORTS_DIR, PDF_SOGLIA_STREAMING
+from src.utils import contesto_processi, genera_nome_file_timestamp
+
+IN_CODA = "in coda"
+IN_CORSO = "in corso"
+COMPLETATO = "completato"
+FALLITO = "fallito"
+
+
+def _esegui_esportazione(identificativo: int, studenti: List[Dict], nome_file: str,
+                         output_dir: Path, coda_progresso) -> Tuple[Path, None]:
+    """Esegue un lavoro di esportazione (in un processo del pool)"""
+    from src.pdf_exporter import PDFExporter
+    
+    def progresso(esportati: int) -> None:
+        coda_progresso.put((identificativo, esportati))
+    
+    progresso(0)
+    exporter = PDFExporter(output_dir)
+    if len(studenti) > PDF_SOGLIA_STREAMING:
+        file_path = exporter.esporta_lista_studenti_streaming(studenti, nome_file, progresso=progresso)
+    else:
+        file_path = exporter.esporta_lista_studenti(studenti, nome_file)
+    progresso(len(studenti))
+    return file_path, None
+
+
+def _esegui_pagelle(identificativo: int, studenti: List[Dict], output_dir: Path,
+                    coda_progresso) -> Tuple[Path, str]:
+    """Esporta le pagelle degli studenti (in un processo del pool)"""
+    from src.pdf_exporter import esporta_pagelle
+    
+    def progresso(esportati: int) -> None:
+        coda_progresso.put((identificativo, esportati))
+    
+    progresso(0)
+    risultato = esporta_pagelle(studenti, output_dir, progresso=progresso)
+    return risultato.output_dir, str(risultato)
+
+
+class LavoroEsportazione:
+    """Stato di un'esportazione inviata alla coda"""
+    
+    def __init__(self, identificativo: int, nome_file: str, totale: int):
+        self.identificativo = identificativo
+        self.nome_file = nome_file
+        self.totale = totale
+        self.esportati = 0
+        self.stato = IN_CODA
+        self.percorso: Optional[Path] = None
+        # Rapporto del lavoro, se ne produce uno (es. le pagelle create)
+        self.riepilogo: Optional[str] = None
+        self.errore: Optional[str] = None
+        self.notificato = False
+    
+    @property
+    def terminato(self) -> bool:
+        """True se il lavoro è completato o fallito"""
+        return self.stato in (COMPLETATO, FALLITO)
+    
+    @property
+    def percentuale(self) -> float:
+        """Percentuale di studenti esportati"""
+        return 100.0 * self.esportati / self.totale if self.totale else 100.0
+    
+    def __str__(self) -> str:
+        if self.stato == COMPLETATO:
+            return f"#{self.identificativo} {self.nome_file}: completato ({self.percorso})"
+        if self.stato == FALLITO:
+            return f"#{self.identificativo} {self.nome_file}: fallito ({self.errore})"
+        return (f"#{self.identificativo} {self.nome_file}: {self.stato} - "
+                f"{self.esportati}/{self.totale} studenti ({self.percentuale:.0f}%)")
+
+
+class CodaEsportazioni:
+    """Coda di esportazioni PDF eseguite in background"""
+    
+    def __init__(self, output_dir: Path = None, processi: Optional[int] = None):
+        """
+        Inizializza la coda; i processi vengono avviati al primo invio.
+        
+        Args:
+            output_dir: Directory di output per i PDF (opzionale)
+            processi: Esportazioni contemporanee (None = dalla configurazione,
+                1 = un thread del processo corrente invece dei processi)
+        """
+        self.output_dir = output_dir or EXPORTS_DIR
+        self.processi = processi or ESPORTAZIONI_PARALLELE
+        self._lavori: Dict[int, LavoroEsportazione] = {}
+        self._lock = threading.Lock()
+        self._esecutore = None
+        self._manager = None
+        self._coda_progresso = None
+    
+    def _avvia_esecutore(self) -> None:
+        """Crea il pool e la coda di avanzamento"""
+        if self.processi > 1:
+            try:
+                contesto = contesto_processi()
+                # Una coda del manager può essere passata ai processi del pool
+                self._manager = contesto.Manager()
+                self._coda_progresso = self._manager.Queue()
+                self._esecutore = ProcessPoolExecutor(max_workers=min(self.processi, os.cpu_count() or 1),
+                                                      mp_context=contesto)
+                return
+            except OSError:
+                # Processi non disponibili (es. ambienti limitati): si usa un thread
+                self._chiudi_manager()
+        self._coda_progresso = queue.Queue()
+        self._esecutore = ThreadPoolExecutor(max_workers=1)
+    
+    def _chiudi_manager(self) -> None:
+        """Arresta il processo che gestisce la coda di avanzamento"""
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+    
+    def invia(self, studenti: Iterable[Dict], nome_file: str = None) -> LavoroEsportazione:
+        """
+        Accoda l'esportazione di una copia degli studenti.
+        
+        Args:
+            studenti: Dizionari degli studenti da esportare
+            nome_file: Nome del file PDF (opzionale)
+        
+        Returns:
+            LavoroEsportazione: Lavoro creato, aggiornato man mano che procede
+        """
+        if not nome_file:
+            nome_file = genera_nome_file_timestamp("registro_studenti", "pdf")
+        elif not nome_file.endswith('.pdf'):
+            nome_file += '.pdf'
+        return self._accoda(_esegui_esportazione, studenti, nome_file, nome_file, self.output_dir)
+    
+    def invia_pagelle(self, studenti: Iterable[Dict], cartella: Path = None) -> LavoroEsportazione:
+        """
+        Accoda l'esportazione delle pagelle di una copia degli studenti.
+        
+        Args:
+            studenti: Dizionari degli studenti
+            cartella: Cartella delle pagelle (opzionale, di default una nuova
+                cartella nella directory di output)
+        
+        Returns:
+            LavoroEsportazione: Lavoro creato; al termine riepilogo contiene
+                il rapporto delle pagelle
+        """
+        cartella = cartella or self.output_dir / genera_nome_file_timestamp("pagelle")
+        return self._accoda(_esegui_pagelle, studenti, cartella.name, cartella)
+    
+    def _accoda(self, funzione: Callable, studenti: Iterable[Dict], nome: str, *argomenti) -> LavoroEsportazione:
+        """Crea il lavoro e lo invia all'esecutore con una copia degli studenti"""
+        # Copia al momento dell'invio: le modifiche successive al registro
+        # non devono finire in un PDF già richiesto
+        istantanea = [dict(studente, voti=list(studente.get('voti', []))) for studente in studenti]
+        
+        with self._lock:
+            if self._esecutore is None:
+                self._avvia_esecutore()
+            lavoro = LavoroEsportazione(len(self._lavori) + 1, nome, len(istantanea))
+            self._lavori[lavoro.identificativo] = lavoro
+            argomenti = (lavoro.identificativo, istantanea, *argomenti, self._coda_progresso)
+            try:
+                futuro = self._esecutore.submit(funzione, *argomenti)
+            except BrokenProcessPool:
+                self._esecutore = ThreadPoolExecutor(max_workers=1)
+                futuro = self._esecutore.submit(funzione, *argomenti)
+        
+        futuro.add_done_callback(lambda f: self._termina(lavoro, f))
+        return lavoro
+    
+    def _termina(self, lavoro: LavoroEsportazione, futuro) -> None:
+        """Registra l'esito di un lavoro"""
+        with self._lock:
+            try:
+                lavoro.percorso, lavoro.riepilogo = futuro.result()
+                lavoro.esportati = lavoro.totale
+                lavoro.stato = COMPLETATO
+            except Exception as e:
+                lavoro.errore = str(e) or type(e).__name__
+                lavoro.stato = FALLITO
+    
+    def _aggiorna_progresso(self) -> None:
+        """Legge gli avanzamenti inviati dai processi"""
+        if self._coda_progresso is None:
+            return
+        while True:
+            try:
+                identificativo, esportati = self._coda_progresso.get_nowait()
+            except queue.Empty:
+                return
+            lavoro = self._lavori[identificativo]
+            if not lavoro.terminato:
+                lavoro.esportati = esportati
+                lavoro.stato = IN_CORSO
+    
+    def lavori(self) -> List[LavoroEsportazione]:
+        """
+        Restituisce tutti i lavori inviati con il loro stato aggiornato.
+        
+        Returns:
+            List[LavoroEsportazione]: Lavori in ordine di invio
+        """
+        with self._lock:
+            self._aggiorna_progresso()
+            return list(self._lavori.values())
+    
+    def nuovi_terminati(self) -> List[LavoroEsportazione]:
+        """
+        Restituisce i lavori terminati dall'ultima chiamata.
+        
+        Returns:
+            List[LavoroEsportazione]: Lavori completati o falliti non ancora notificati
+        """
+        terminati = [lavoro for lavoro in self.lavori() if lavoro.terminato and not lavoro.notificato]
+        for lavoro in terminati:
+            lavoro.notificato = True
+        return terminati
+    
+    def in_corso(self) -> int:
+        """Numero di lavori non ancora terminati"""
+        return sum(1 for lavoro in self.lavori() if not lavoro.terminato)
+    
+    def chiudi(self, attendi: bool = True) -> None:
+        """
+        Chiude la coda.
+        
+        Args:
+            attendi: Se True attende il termine dei lavori inviati
+        """
+        with self._lock:
+            esecutore, self._esecutore = self._esecutore, None
+        if esecutore is not None:
+            esecutore.shutdown(wait=attendi, cancel_futures=not attendi)
+        with self._lock:
+            self._aggiorna_progresso()
+            self._coda_progresso = None
+            self._chiudi_manager()
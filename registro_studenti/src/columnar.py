@@ -0,0 +1,176 @@
+"""
+Motore colonnare per le statistiche del registro
+===============================================
+Rappresenta il registro per colonne (matricole, voti in un unico array
+piatto con gli offset di inizio di ogni studente, in stile CSR) e calcola
+medie, conteggi, minimi e massimi per studente in un solo passaggio.
+
+Con NumPy installato i calcoli sono vettorizzati; altrimenti viene usata
+un'implementazione in Python puro con la stessa interfaccia. NumPy viene
+importato solo alla prima vista colonnare, non all'avvio dell'applicazione.
+"""
+
+from importlib.util import find_spec
+from itertools import accumulate, chain
+from typing import List, Dict, Sequence
+from src.config import SOGLIA_ECCELLENZA
+
+# NumPy è una dipendenza opzionale: qui si verifica solo che sia installato
+NUMPY_DISPONIBILE = find_spec("numpy") is not None
+
+
+def _numpy():
+    """Importa NumPy al primo utilizzo"""
+    import numpy
+    return numpy
+
+
+class RegistroColonnare:
+    """Vista colonnare e di sola lettura dei voti di un insieme di studenti"""
+    
+    def __init__(self, matricole: Sequence, voti_per_studente: Sequence[Sequence[float]]):
+        """
+        Costruisce le colonne del registro.
+        
+        Args:
+            matricole: Matricole degli studenti, nell'ordine del registro
+            voti_per_studente: Voti di ciascuno studente, nello stesso ordine
+        """
+        conteggi = [len(voti) for voti in voti_per_studente]
+        offset = [0, *accumulate(conteggi)]
+        
+        if NUMPY_DISPONIBILE:
+            np = _numpy()
+            self.matricole = np.asarray(matricole)
+            self.offset = np.asarray(offset, dtype=np.int64)
+            self.voti = self._voti_piatti(voti_per_studente, offset[-1])
+            self._calcola_numpy()
+        else:
+            self.matricole = list(matricole)
+            self.offset = offset
+            self.voti = list(chain.from_iterable(voti_per_studente))
+            self._calcola_python(conteggi)
+    
+    @classmethod
+    def da_lista(cls, lista) -> 'RegistroColonnare':
+        """Crea la vista colonnare da una ListaStudenti"""
+        studenti = list(lista)
+        return cls([s.matricola for s in studenti], [s._voti for s in studenti])
+    
+    @classmethod
+    def da_dizionari(cls, studenti: List[Dict]) -> 'RegistroColonnare':
+        """
+        Crea la vista colonnare da una lista di dizionari.
+        
+        Come calcola_media, considera solo i voti numerici.
+        """
+        voti = [
+            [v for v in s.get('voti', []) if isinstance(v, (int, float))]
+            for s in studenti
+        ]
+        return cls([s.get('matricola', 'N/D') for s in studenti], voti)
+    
+    @staticmethod
+    def _voti_piatti(voti_per_studente: Sequence[Sequence[float]], totale: int):
+        """Concatena i voti in un array NumPy senza passare da oggetti Python"""
+        np = _numpy()
+        if all(getattr(voti, 'typecode', None) == 'B' for voti in voti_per_studente):
+            # array('B') di Studente: concatenazione diretta dei byte
+            buffer = b"".join(voti.tobytes() for voti in voti_per_studente)
+            return np.frombuffer(buffer, dtype=np.uint8).astype(np.float64)
+        return np.fromiter(chain.from_iterable(voti_per_studente), dtype=np.float64, count=totale)
+    
+    def _calcola_numpy(self) -> None:
+        """Calcola gli aggregati per studente con operazioni vettoriali"""
+        np = _numpy()
+        inizi, fini = self.offset[:-1], self.offset[1:]
+        self.conteggi = fini - inizi
+        somme_cumulate = np.concatenate(([0.0], np.cumsum(self.voti)))
+        self.somme = somme_cumulate[fini] - somme_cumulate[inizi]
+        
+        con_voti = self.conteggi > 0
+        self.medie = np.zeros(len(self.conteggi))
+        self.medie[con_voti] = self.somme[con_voti] / self.conteggi[con_voti]
+        
+        self.minimi = np.zeros(len(self.conteggi))
+        self.massimi = np.zeros(len(self.conteggi))
+        if self.voti.size:
+            # Con gli inizi dei soli studenti con voti, reduceat non vede segmenti vuoti
+            inizi_validi = inizi[con_voti]
+            self.minimi[con_voti] = np.minimum.reduceat(self.voti, inizi_validi)
+            self.massimi[con_voti] = np.maximum.reduceat(self.voti, inizi_validi)
+    
+    def _calcola_python(self, conteggi: List[int]) -> None:
+        """Calcola gli aggregati per studente in Python puro"""
+        self.conteggi = conteggi
+        self.somme, self.medie, self.minimi, self.massimi = [], [], [], []
+        for inizio, fine in zip(self.offset, self.offset[1:]):
+            voti = self.voti[inizio:fine]
+            somma = sum(voti)
+            self.somme.append(somma)
+            self.medie.append(somma / len(voti) if voti else 0.0)
+            self.minimi.append(min(voti) if voti else 0)
+            self.massimi.append(max(voti) if voti else 0)
+    
+    def __len__(self) -> int:
+        """Restituisce il numero di studenti"""
+        return len(self.conteggi)
+    
+    def indici_con_voti(self) -> List[int]:
+        """Posizioni degli studenti con almeno un voto"""
+        if NUMPY_DISPONIBILE:
+            return _numpy().flatnonzero(self.conteggi > 0).tolist()
+        return [i for i, n in enumerate(self.conteggi) if n]
+    
+    def indici_eccellenti(self, soglia: float = SOGLIA_ECCELLENZA) -> List[int]:
+        """Posizioni degli studenti con media maggiore o uguale alla soglia"""
+        if NUMPY_DISPONIBILE:
+            return _numpy().flatnonzero(self.medie >= soglia).tolist()
+        return [i for i, media in enumerate(self.medie) if media >= soglia]
+    
+    def indici_per_media(self, decrescente: bool = True) -> List[int]:
+        """
+        Posizioni degli studenti con voti ordinate per media.
+        
+        L'ordinamento è stabile: a parità di media resta l'ordine del registro.
+        """
+        if NUMPY_DISPONIBILE:
+            np = _numpy()
+            con_voti = np.flatnonzero(self.conteggi > 0)
+            medie = self.medie[con_voti]
+            ordine = np.argsort(-medie if decrescente else medie, kind='stable')
+            return con_voti[ordine].tolist()
+        return sorted(self.indici_con_voti(), key=lambda i: self.medie[i], reverse=decrescente)
+    
+    def media_generale(self) -> float:
+        """Media delle medie degli studenti con voti"""
+        indici = self.indici_con_voti()
+        if not indici:
+            return 0.0
+        if NUMPY_DISPONIBILE:
+            return float(self.medie[indici].mean())
+        return sum(self.medie[i] for i in indici) / len(indici)
+    
+    def statistiche(self) -> Dict:
+        """
+        Restituisce le statistiche generali del registro.
+        
+        Il migliore studente è indicato dalla sua posizione nel registro
+        (chiave "indice_migliore"); a parità di media vince il primo.
+        """
+        indici = self.indici_con_voti()
+        stats = {
+            "totale_studenti": len(self),
+            "studenti_con_voti": len(indici),
+            "studenti_senza_voti": len(self) - len(indici),
+            "studenti_eccellenti": len(self.indici_eccellenti()),
+            "media_generale": self.media_generale(),
+        }
+        if indici:
+            ordinati = self.indici_per_media(decrescente=True)
+            stats.update({
+                "media_più_alta": float(self.medie[ordinati[0]]),
+                "media_più_bassa": float(self.medie[ordinati[-1]]),
+                "indice_migliore": ordinati[0],
+            })
+        return stats
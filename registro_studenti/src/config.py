@@ -11,20 +11,74 @@ from pathlib import Path
 DEFAULT_DATA_FILE = "registro.txt"
 DEFAULT_PDF_NAME = "registro_studenti"
 
+# Formato del file dati: "json" oppure "binario"
+# (i file con estensione ESTENSIONE_BINARIA sono sempre trattati come binari)
+FORMATO_DATI = "json"
+ESTENSIONE_BINARIA = ".rsb"
+
+# Configurazioni journal (log delle operazioni in append)
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_SOGLIA_COMPATTAZIONE = 1024 * 1024  # byte oltre i quali il journal viene compattato
+
+# Configurazioni accesso concorrente
+VERIFICA_CONTENUTO_MODIFICHE = False  # Confronta anche il checksum del file, non solo mtime/dimensione/inode
+
+# Configurazioni salvataggio
+SALVATAGGIO_DURABILE = True  # fsync di file e directory a ogni salvataggio (False = modalità veloce)
+AUTOSALVATAGGIO_MODIFICHE = 0  # Modifiche dopo cui salvare in automatico (0 = salva a ogni modifica)
+AUTOSALVATAGGIO_SECONDI = 0.0  # Secondi dopo cui salvare le modifiche in sospeso (0 = disattivato)
+
 # Configurazioni validazione
 VOTO_MIN = 18
 VOTO_MAX = 30
+SOGLIA_ECCELLENZA = 27.0  # Media minima per considerare uno studente eccellente
+VALIDAZIONE_SOGLIA_PARALLELA = 200_000  # Valori oltre i quali la validazione in blocco usa più processi
+VALIDAZIONE_DIMENSIONE_BLOCCO = 50_000  # Valori inviati a ciascun processo per volta
+
+# Configurazioni interfaccia
+STUDENTI_PER_PAGINA = 20  # Righe mostrate per pagina nella lista studenti
+PDF_SOGLIA_STREAMING = 2_000  # Studenti oltre i quali il PDF viene generato a blocchi
+ESPORTAZIONI_PARALLELE = 2  # Esportazioni PDF eseguite contemporaneamente in background
+PAGELLE_DIMENSIONE_BLOCCO = 50  # Pagelle inviate a ciascun processo per volta
+
+# Configurazioni ricerca approssimata
+FUZZY_TOP_K = 10  # Numero massimo di risultati restituiti
+FUZZY_MAX_DISTANZA = 2  # Errori di battitura tollerati per parola
 
 # Configurazioni paths
+# Le variabili d'ambiente permettono di spostare le directory, ad esempio
+# su un disco locale più veloce o su tmpfs
 PROJECT_ROOT = Path(__file__).parent.parent
-DATA_DIR = PROJECT_ROOT / "data"
-EXPORTS_DIR = PROJECT_ROOT / "exports"
-LOGS_DIR = PROJECT_ROOT / "logs"
-
-# Assicura che le directory esistano
-DATA_DIR.mkdir(exist_ok=True)
-EXPORTS_DIR.mkdir(exist_ok=True)
-LOGS_DIR.mkdir(exist_ok=True)
+
+
+def _directory_da_ambiente(variabile: str, predefinita: Path) -> Path:
+    """Legge una directory dalla variabile d'ambiente, se impostata"""
+    valore = os.environ.get(variabile)
+    return Path(valore).expanduser() if valore else predefinita
+
+
+DATA_DIR = _directory_da_ambiente("REGISTRO_DATA_DIR", PROJECT_ROOT / "data")
+EXPORTS_DIR = _directory_da_ambiente("REGISTRO_EXPORTS_DIR", PROJECT_ROOT / "exports")
+LOGS_DIR = _directory_da_ambiente("REGISTRO_LOGS_DIR", PROJECT_ROOT / "logs")
+
+
+def assicura_directory(percorso: Path) -> Path:
+    """
+    Crea la directory (e quelle superiori) se non esiste.
+    
+    Le directory non vengono più create all'import del modulo: chi scrive
+    un file chiama questa funzione subito prima, così l'import resta senza
+    effetti sul filesystem e funziona anche su installazioni in sola lettura.
+    
+    Args:
+        percorso: Directory da creare
+        
+    Returns:
+        Path: La directory stessa
+    """
+    percorso.mkdir(parents=True, exist_ok=True)
+    return percorso
+
 
 # Path del file dati predefinito
 DEFAULT_DATA_PATH = DATA_DIR / DEFAULT_DATA_FILE
@@ -5,22 +5,201 @@ Gestisce il caricamento e salvataggio dei dati in formato JSON.
 """
 
 import json
-from typing import List, Dict
+import os
+import tempfile
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Callable, TextIO, Iterator, Tuple
 from pathlib import Path
-from src.config import DEFAULT_DATA_PATH
+from src.config import (
+    DEFAULT_DATA_PATH, JOURNAL_SUFFIX, JOURNAL_SOGLIA_COMPATTAZIONE, SALVATAGGIO_DURABILE,
+    FORMATO_DATI, ESTENSIONE_BINARIA, VERIFICA_CONTENUTO_MODIFICHE, assicura_directory
+)
+from src.binary_format import SnapshotBinario, codifica_snapshot, is_snapshot_binario
+
+try:
+    import fcntl
+except ImportError:  # Windows: i lock consultivi tra processi non sono disponibili
+    fcntl = None
+
+
+# Dimensione dei blocchi letti dal parser JSON in streaming
+DIMENSIONE_BLOCCO_LETTURA = 64 * 1024
+
+# Formati supportati per il file dati
+FORMATO_JSON = "json"
+FORMATO_BINARIO = "binario"
+
+# Operazioni registrabili nel journal
+OP_AGGIUNGI_STUDENTE = "aggiungi_studente"
+OP_AGGIUNGI_VOTO = "aggiungi_voto"
+OP_RIMUOVI_STUDENTE = "rimuovi_studente"
 
 
 class FileManager:
     """Gestisce le operazioni sui file per il registro studenti"""
     
-    def __init__(self, file_path: Path = None):
+    def __init__(self, file_path: Path = None, journal: bool = False,
+                 soglia_compattazione: int = JOURNAL_SOGLIA_COMPATTAZIONE,
+                 durabile: bool = SALVATAGGIO_DURABILE, formato: str = None,
+                 verifica_contenuto: bool = VERIFICA_CONTENUTO_MODIFICHE):
         """
         Inizializza il gestore file.
         
         Args:
             file_path: Percorso del file dati (opzionale)
+            journal: Se True le modifiche vengono accodate a un journal
+                invece di riscrivere l'intero file
+            soglia_compattazione: Dimensione in byte del journal oltre la
+                quale conviene riversarlo nello snapshot
+            durabile: Se True ogni salvataggio esegue fsync del file e della
+                directory; se False la sostituzione resta atomica ma i dati
+                possono restare nella cache del sistema operativo
+            formato: "json" o "binario"; se omesso viene dedotto
+                dall'estensione del file o da FORMATO_DATI
+            verifica_contenuto: Se True la firma del file include anche il
+                checksum del contenuto (vedi firma)
         """
         self.file_path = file_path or DEFAULT_DATA_PATH
+        if formato is None:
+            formato = FORMATO_BINARIO if self.file_path.suffix == ESTENSIONE_BINARIA else FORMATO_DATI
+        if formato not in (FORMATO_JSON, FORMATO_BINARIO):
+            raise ValueError(f"Formato dati non supportato: {formato}")
+        self.formato = formato
+        self.journal = journal
+        self.soglia_compattazione = soglia_compattazione
+        self.durabile = durabile
+        # Checksum dello snapshot a cui si riferisce il journal corrente
+        self._crc_snapshot: Optional[int] = None
+        # Ultimo checksum calcolato in scrittura, con la firma del file su cui vale
+        self._crc_calcolato: Optional[Tuple[Optional[Tuple], int]] = None
+        # Esecutore a thread singolo: i salvataggi in background restano ordinati
+        self._esecutore: Optional[ThreadPoolExecutor] = None
+        self.verifica_contenuto = verifica_contenuto
+        # Lock tra processi: descrittore del file di lock e modalità corrente;
+        # il lock tra thread lo rende rientrante per il thread che lo detiene
+        self._lock_thread = threading.RLock()
+        self._fd_lock: Optional[int] = None
+        self._lock_esclusivo = False
+    
+    @property
+    def persistenza_per_operazioni(self) -> bool:
+        """True se le singole modifiche vanno registrate con registra_operazione"""
+        return self.journal
+    
+    @property
+    def journal_path(self) -> Path:
+        """Percorso del journal associato al file dati"""
+        return self.file_path.with_name(self.file_path.name + JOURNAL_SUFFIX)
+    
+    @contextmanager
+    def blocca(self, esclusivo: bool = True):
+        """
+        Acquisisce un lock consultivo (fcntl.flock) sul registro.
+        
+        Il lock è sulla directory del registro e non sul file dati, che viene
+        sostituito (con un nuovo inode) a ogni salvataggio; in questo modo non
+        servono file di lock aggiuntivi. Un lock esclusivo serve per i cicli
+        lettura-modifica-scrittura, uno condiviso per le letture. Il lock è
+        rientrante: le chiamate annidate dello stesso thread riusano quello
+        già acquisito (promuovendolo a esclusivo se serve). La promozione non
+        è atomica, perché flock rilascia il lock condiviso prima di concedere
+        quello esclusivo: i cicli lettura-modifica-scrittura devono prendere
+        il lock esclusivo prima di leggere, e chi promuove deve rileggere ciò
+        che gli serve. Senza fcntl restano solo i lock tra thread.
+        
+        Args:
+            esclusivo: True per un lock in scrittura, False per uno in lettura
+        """
+        with self._lock_thread:
+            if self._fd_lock is not None:
+                # Lock già detenuto da questo thread
+                if not esclusivo or self._lock_esclusivo:
+                    yield
+                    return
+                fcntl.flock(self._fd_lock, fcntl.LOCK_EX)
+                self._lock_esclusivo = True
+                try:
+                    yield
+                finally:
+                    fcntl.flock(self._fd_lock, fcntl.LOCK_SH)
+                    self._lock_esclusivo = False
+                return
+            
+            fd = self._apri_lock(crea=esclusivo)
+            if fd is None:
+                yield
+                return
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if esclusivo else fcntl.LOCK_SH)
+                self._fd_lock = fd
+                self._lock_esclusivo = esclusivo
+                yield
+            finally:
+                self._fd_lock = None
+                self._lock_esclusivo = False
+                os.close(fd)  # chiudere il descrittore rilascia il lock
+    
+    def _apri_lock(self, crea: bool) -> Optional[int]:
+        """
+        Apre la directory del registro su cui prendere il lock.
+        
+        Args:
+            crea: True per chi scrive, che ha bisogno della directory; a chi
+                legge basta non trovarla: non c'è nessun registro da bloccare
+        
+        Returns:
+            Optional[int]: Descrittore della directory, o None se non c'è
+                niente da bloccare o i lock tra processi non sono disponibili
+        """
+        try:
+            if crea:
+                assicura_directory(self.file_path.parent)
+            if fcntl is None:
+                return None
+            return os.open(self.file_path.parent, os.O_RDONLY)
+        except OSError:
+            return None
+    
+    def firma(self) -> Tuple:
+        """
+        Restituisce una firma economica dello stato del registro su disco.
+        
+        La firma combina inode, dimensione, mtime e ctime del file dati e del
+        journal: cambia a ogni salvataggio, anche di un altro processo. Con
+        verifica_contenuto include anche il checksum dei file, per chi deve
+        accorgersi di modifiche che lasciano invariati i metadati.
+        
+        Returns:
+            Tuple: Firma da confrontare con una precedente
+        """
+        percorsi = (self.file_path, self.journal_path) if self.journal else (self.file_path,)
+        parti = []
+        for percorso in percorsi:
+            try:
+                stato = percorso.stat()
+            except FileNotFoundError:
+                parti.append(None)
+                continue
+            parte = (stato.st_ino, stato.st_size, stato.st_mtime_ns, stato.st_ctime_ns)
+            if self.verifica_contenuto:
+                parte += (self._checksum(percorso),)
+            parti.append(parte)
+        return tuple(parti)
+    
+    @staticmethod
+    def _checksum(percorso: Path) -> Optional[int]:
+        """CRC32 del contenuto di un file, letto a blocchi"""
+        crc = 0
+        try:
+            with open(percorso, 'rb') as file:
+                for blocco in iter(lambda: file.read(DIMENSIONE_BLOCCO_LETTURA), b""):
+                    crc = zlib.crc32(blocco, crc)
+        except FileNotFoundError:
+            return None
+        return crc
         
     def leggi_studenti(self) -> List[Dict]:
         """
@@ -29,25 +208,162 @@ class FileManager:
         Returns:
             List[Dict]: Lista di dizionari con i dati degli studenti
         """
-        try:
-            if not self.file_path.exists():
-                # Se il file non esiste, crea un file vuoto
-                self.salva_studenti([])
-                return []
-            
-            with open(self.file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
+        with self.blocca(esclusivo=False):
+            # Ogni lettura dello snapshot invalida il checksum memorizzato
+            self._crc_snapshot = None
+            try:
+                if not self.file_path.exists():
+                    if self.journal and self.journal_path.exists():
+                        # Journal scritto prima del primo snapshot
+                        self._crc_snapshot = zlib.crc32(b"")
+                        return self._riapplica_journal([])
+                    # Se il file non esiste, crea un file vuoto
+                    if self._crea_file_vuoto():
+                        return []
+                
+                if self.journal:
+                    contenuto = self.file_path.read_bytes()
+                    self._crc_snapshot = zlib.crc32(contenuto)
+                    if self.formato == FORMATO_BINARIO:
+                        data = list(SnapshotBinario(contenuto))
+                    else:
+                        data = json.loads(contenuto.decode('utf-8'))
+                elif self.formato == FORMATO_BINARIO:
+                    with SnapshotBinario.apri(self.file_path) as snapshot:
+                        data = list(snapshot)
+                else:
+                    with open(self.file_path, 'r', encoding='utf-8') as file:
+                        data = json.load(file)
+                    
+                # Validazione base della struttura dati
+                if not isinstance(data, list):
+                    raise ValueError("Il file deve contenere una lista JSON")
+                
+                if self.journal:
+                    data = self._riapplica_journal(data)
                 
-            # Validazione base della struttura dati
-            if not isinstance(data, list):
+                return data
+                
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Errore nel formato JSON del file: {e}")
+            except Exception as e:
+                raise IOError(f"Errore nella lettura del file: {e}")
+    
+    def itera_studenti(self, dimensione_blocco: int = DIMENSIONE_BLOCCO_LETTURA) -> Iterator[Dict]:
+        """
+        Legge gli studenti dal file JSON uno alla volta.
+        
+        L'array principale viene analizzato a blocchi, un elemento per volta,
+        senza caricare in memoria l'intero file né la lista completa dei
+        dizionari; ogni elemento viene validato prima di essere restituito.
+        
+        Args:
+            dimensione_blocco: Numero di caratteri letti a ogni accesso al file
+            
+        Yields:
+            Dict: Dati di uno studente
+            
+        Raises:
+            ValueError: Se il file non è una lista JSON o un elemento non è valido
+        """
+        if self.journal and self.journal_path.exists():
+            # Le operazioni del journal possono modificare qualunque elemento
+            yield from self.leggi_studenti()
+            return
+        
+        # Lo snapshot letto qui non è più quello a cui si riferiva il checksum
+        self._crc_snapshot = None
+        if not self.file_path.exists() and self._crea_file_vuoto():
+            return
+        
+        if self.formato == FORMATO_BINARIO:
+            # I record vengono decodificati dal file mappato solo quando richiesti
+            with SnapshotBinario.apri(self.file_path) as snapshot:
+                yield from snapshot
+            return
+        
+        decoder = json.JSONDecoder()
+        with open(self.file_path, 'r', encoding='utf-8') as file:
+            buffer = ""
+            fine_file = False
+            
+            def leggi_blocco() -> bool:
+                nonlocal buffer, fine_file
+                blocco = file.read(dimensione_blocco)
+                fine_file = not blocco
+                buffer += blocco
+                return not fine_file
+            
+            def prossimo_carattere() -> str:
+                """Scarta gli spazi e restituisce il primo carattere utile"""
+                nonlocal buffer
+                while True:
+                    buffer = buffer.lstrip()
+                    if buffer or not leggi_blocco():
+                        return buffer[:1]
+            
+            if prossimo_carattere() != "[":
                 raise ValueError("Il file deve contenere una lista JSON")
+            buffer = buffer[1:]
             
-            return data
+            if prossimo_carattere() == "]":
+                return
             
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Errore nel formato JSON del file: {e}")
-        except Exception as e:
-            raise IOError(f"Errore nella lettura del file: {e}")
+            posizione = 0
+            while True:
+                try:
+                    elemento, fine = decoder.raw_decode(buffer)
+                    # Un valore che arriva a fine buffer potrebbe continuare nel blocco successivo
+                    completo = fine < len(buffer) or fine_file
+                except json.JSONDecodeError as e:
+                    if fine_file:
+                        raise ValueError(f"Errore nel formato JSON del file: {e}")
+                    completo = False
+                if not completo:
+                    leggi_blocco()
+                    continue
+                
+                self._valida_record(elemento, posizione)
+                yield elemento
+                posizione += 1
+                
+                buffer = buffer[fine:]
+                separatore = prossimo_carattere()
+                buffer = buffer[1:]
+                if separatore == "]":
+                    return
+                if separatore != ",":
+                    raise ValueError(f"Errore nel formato JSON del file dopo l'elemento {posizione}")
+                prossimo_carattere()
+    
+    def _crea_file_vuoto(self) -> bool:
+        """
+        Crea il registro vuoto se non esiste ancora.
+        
+        Chi legge tiene di solito il lock condiviso, e flock lo rilascia per
+        un istante prima di concedere quello esclusivo: l'esistenza del file
+        viene quindi verificata di nuovo sotto il lock esclusivo, per non
+        sovrascrivere un registro creato nel frattempo da un altro processo.
+        
+        Returns:
+            bool: True se il file è stato creato qui, False se esisteva già
+        """
+        with self.blocca():
+            if self.file_path.exists():
+                return False
+            self.salva_studenti([])
+            return True
+    
+    @staticmethod
+    def _valida_record(record, posizione: int) -> None:
+        """Verifica che un elemento del file descriva uno studente"""
+        if not isinstance(record, dict):
+            raise ValueError(f"Elemento {posizione} non valido: atteso un oggetto JSON")
+        for campo in ('matricola', 'nome', 'cognome'):
+            if campo not in record:
+                raise ValueError(f"Elemento {posizione} non valido: campo '{campo}' mancante")
+        if not isinstance(record.get('voti', []), list):
+            raise ValueError(f"Elemento {posizione} non valido: 'voti' deve essere una lista")
     
     def salva_studenti(self, studenti: List[Dict]) -> bool:
         """
@@ -59,19 +375,241 @@ class FileManager:
         Returns:
             bool: True se il salvataggio è riuscito, False altrimenti
         """
+        if self.formato == FORMATO_BINARIO:
+            return self._salva_snapshot(
+                lambda file: file.write(codifica_snapshot(studenti)), binario=True
+            )
+        return self._salva_snapshot(
+            lambda file: json.dump(studenti, file, ensure_ascii=False, indent=2)
+        )
+    
+    @property
+    def accetta_frammenti_json(self) -> bool:
+        """True se il registro può essere salvato con salva_frammenti_json"""
+        return self.formato == FORMATO_JSON
+    
+    def salva_frammenti_json(self, frammenti: List[str]) -> bool:
+        """
+        Salva il file JSON a partire dagli studenti già serializzati.
+        
+        I frammenti (vedi Studente.frammento_json) vengono solo concatenati:
+        il risultato è identico a quello di salva_studenti, ma il costo di
+        serializzazione riguarda soltanto gli studenti modificati.
+        
+        Args:
+            frammenti: Un elemento dell'array JSON per ogni studente
+            
+        Returns:
+            bool: True se il salvataggio è riuscito, False altrimenti
+        """
+        testo = "[\n" + ",\n".join(frammenti) + "\n]" if frammenti else "[]"
+        return self._salva_snapshot(lambda file: file.write(testo))
+    
+    def _salva_snapshot(self, scrivi: Callable[[TextIO], None], binario: bool = False) -> bool:
+        """Scrive lo snapshot in modo atomico e azzera il journal ormai superato"""
+        with self.blocca():
+            try:
+                # La directory è stata creata da blocca()
+                self._scrivi_atomico(scrivi, binario=binario)
+                
+                # Lo snapshot contiene ora tutte le operazioni: il journal è superato
+                if self.journal:
+                    self._crc_snapshot = None
+                    self.journal_path.unlink(missing_ok=True)
+                
+                return True
+                
+            except Exception as e:
+                print(f"❌ Errore nel salvataggio del file: {e}")
+                return False
+    
+    def salva_studenti_in_background(self, studenti: List[Dict]) -> Future:
+        """
+        Salva i dati degli studenti in un thread separato.
+        
+        I salvataggi accodati vengono eseguiti uno alla volta nell'ordine di
+        richiesta; grazie alla scrittura atomica un'interruzione non lascia
+        mai il file dati troncato.
+        
+        Args:
+            studenti: Copia dei dati da salvare (non deve essere modificata
+                finché il salvataggio non è concluso)
+            
+        Returns:
+            Future: Risultato di salva_studenti
+        """
+        if self._esecutore is None:
+            self._esecutore = ThreadPoolExecutor(max_workers=1, thread_name_prefix="salvataggio")
+        return self._esecutore.submit(self.salva_studenti, studenti)
+    
+    def _scrivi_atomico(self, scrivi: Callable[[TextIO], None], binario: bool = False) -> None:
+        """
+        Scrive il file dati tramite un file temporaneo nella stessa directory.
+        
+        Il file temporaneo sostituisce quello esistente con os.replace, che è
+        atomico: un lettore concorrente vede sempre la versione precedente o
+        quella nuova, mai un file scritto a metà.
+        
+        Args:
+            scrivi: Funzione che scrive il contenuto nel file aperto
+            binario: Se True il file viene aperto in modalità binaria
+        """
+        directory = self.file_path.parent
+        fd, percorso_tmp = tempfile.mkstemp(
+            prefix=f".{self.file_path.name}.", suffix=".tmp", dir=directory
+        )
         try:
-            # Assicura che la directory esista
-            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            with (os.fdopen(fd, 'wb') if binario else os.fdopen(fd, 'w', encoding='utf-8')) as file:
+                scrivi(file)
+                if self.durabile:
+                    file.flush()
+                    os.fsync(file.fileno())
             
-            with open(self.file_path, 'w', encoding='utf-8') as file:
-                json.dump(studenti, file, ensure_ascii=False, indent=2)
+            # mkstemp crea il file con permessi 0600: conserva quelli originali
+            if self.file_path.exists():
+                os.chmod(percorso_tmp, self.file_path.stat().st_mode & 0o7777)
             
-            return True
+            os.replace(percorso_tmp, self.file_path)
+        except BaseException:
+            Path(percorso_tmp).unlink(missing_ok=True)
+            raise
+        
+        if self.durabile:
+            self._fsync_directory(directory)
+    
+    @staticmethod
+    def _fsync_directory(directory: Path) -> None:
+        """Rende persistente la voce di directory del file appena sostituito"""
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return  # Non supportato (es. Windows)
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    
+    def registra_operazione(self, operazione: Dict) -> bool:
+        """
+        Accoda un'operazione al journal senza riscrivere lo snapshot.
+        
+        Il journal si apre con un'intestazione che riporta il checksum dello
+        snapshot di partenza: se lo snapshot viene riscritto (compattazione)
+        un journal rimasto orfano non viene riapplicato una seconda volta.
+        Per lo stesso motivo un journal orfano (es. un'interruzione tra la
+        sostituzione dello snapshot e la sua cancellazione) viene azzerato
+        prima di accodare: le operazioni scritte sotto la sua intestazione
+        verrebbero ignorate alla lettura successiva.
+        
+        Args:
+            operazione: Dizionario con la chiave "op" e i dati dell'operazione
             
-        except Exception as e:
-            print(f"❌ Errore nel salvataggio del file: {e}")
+        Returns:
+            bool: True se la registrazione è riuscita, False altrimenti
+        """
+        with self.blocca():
+            try:
+                righe = []
+                # Il checksum viene verificato sul disco sotto lock esclusivo:
+                # un altro processo può aver compattato lo snapshot dopo la
+                # nostra ultima lettura
+                self._crc_snapshot = self._crc_snapshot_corrente()
+                nuovo = self._intestazione_journal() != self._crc_snapshot
+                if nuovo:
+                    righe.append({"snapshot_crc": self._crc_snapshot})
+                righe.append(operazione)
+                
+                testo = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in righe)
+                with open(self.journal_path, 'w' if nuovo else 'a', encoding='utf-8') as file:
+                    file.write(testo)
+                    if self.durabile:
+                        file.flush()
+                        os.fsync(file.fileno())
+                
+                return True
+                
+            except Exception as e:
+                print(f"❌ Errore nella scrittura del journal: {e}")
+                return False
+    
+    def _crc_snapshot_corrente(self) -> int:
+        """Checksum dello snapshot su disco, ricalcolato solo se il file è cambiato"""
+        try:
+            stato = self.file_path.stat()
+            firma = (stato.st_ino, stato.st_size, stato.st_mtime_ns)
+        except FileNotFoundError:
+            firma = None
+        if self._crc_calcolato is None or self._crc_calcolato[0] != firma:
+            contenuto = self.file_path.read_bytes() if firma is not None else b""
+            self._crc_calcolato = (firma, zlib.crc32(contenuto))
+        return self._crc_calcolato[1]
+    
+    def _intestazione_journal(self) -> Optional[int]:
+        """Checksum riportato nell'intestazione del journal, o None se manca o è illeggibile"""
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as file:
+                return json.loads(file.readline()).get("snapshot_crc")
+        except (FileNotFoundError, ValueError, AttributeError):
+            return None
+    
+    def richiede_compattazione(self) -> bool:
+        """Verifica se il journal ha superato la soglia di compattazione"""
+        try:
+            return self.journal_path.stat().st_size >= self.soglia_compattazione
+        except FileNotFoundError:
             return False
     
+    def compatta(self) -> bool:
+        """
+        Riversa il journal nello snapshot e lo azzera.
+        
+        Returns:
+            bool: True se la compattazione è riuscita, False altrimenti
+        """
+        with self.blocca():
+            return self.salva_studenti(self.leggi_studenti())
+    
+    def _riapplica_journal(self, studenti: List[Dict]) -> List[Dict]:
+        """Riapplica al contenuto dello snapshot le operazioni del journal"""
+        if not self.journal_path.exists():
+            return studenti
+        
+        with open(self.journal_path, 'r', encoding='utf-8') as file:
+            righe = file.read().split("\n")
+        
+        operazioni = []
+        for i, riga in enumerate(righe):
+            if not riga.strip():
+                continue
+            try:
+                operazioni.append(json.loads(riga))
+            except json.JSONDecodeError:
+                # Solo l'ultima riga può essere troncata da un'interruzione
+                if i == len(righe) - 1:
+                    break
+                raise ValueError(f"Journal corrotto alla riga {i + 1}")
+        
+        if not operazioni or operazioni[0].get("snapshot_crc") != self._crc_snapshot:
+            # Journal riferito a uno snapshot precedente, già compattato
+            return studenti
+        
+        per_matricola = {str(s.get("matricola")): s for s in studenti}
+        for operazione in operazioni[1:]:
+            tipo = operazione.get("op")
+            if tipo == OP_AGGIUNGI_STUDENTE:
+                studente = operazione["studente"]
+                per_matricola.setdefault(str(studente["matricola"]), studente)
+            elif tipo == OP_AGGIUNGI_VOTO:
+                studente = per_matricola.get(str(operazione["matricola"]))
+                if studente is not None:
+                    studente.setdefault("voti", []).append(operazione["voto"])
+            elif tipo == OP_RIMUOVI_STUDENTE:
+                per_matricola.pop(str(operazione["matricola"]), None)
+        
+        return list(per_matricola.values())
+    
     def backup_data(self) -> Path:
         """
         Crea un backup dei dati correnti.
@@ -84,7 +622,7 @@ class FileManager:
         if not self.file_path.exists():
             raise FileNotFoundError("Nessun file dati da cui fare backup")
         
-        backup_name = genera_nome_file_timestamp("backup_registro", "txt")
+        backup_name = genera_nome_file_timestamp("backup_registro", self.file_path.suffix or "txt")
         backup_path = self.file_path.parent / backup_name
         
         # Copia il contenuto
@@ -101,11 +639,9 @@ class FileManager:
             bool: True se il file è integro, False altrimenti
         """
         try:
-            data = self.leggi_studenti()
-            
             # Verifica che ogni studente abbia i campi richiesti
             campi_richiesti = {'matricola', 'nome', 'cognome', 'voti'}
-            for studente in data:
+            for studente in self.itera_studenti():
                 if not isinstance(studente, dict):
                     return False
                 if not campi_richiesti.issubset(studente.keys()):
@@ -122,19 +658,29 @@ class FileManager:
         """
         Ripristina il file dati dal backup specificato.
         
+        Il backup sostituisce il file dati con la stessa scrittura atomica dei
+        salvataggi, così un'interruzione non lascia mai un registro a metà.
+        
         Args:
             backup_path: Percorso del file di backup
             
         Returns:
             bool: True se il ripristino è riuscito, False altrimenti
         """
-        import shutil
-        try:
-            shutil.copy2(backup_path, self.file_path)
-            return True
-        except Exception as e:
-            print(f"❌ Errore nel ripristino del backup: {e}")
-            return False
+        with self.blocca():
+            try:
+                contenuto = Path(backup_path).read_bytes()
+                self._scrivi_atomico(lambda file: file.write(contenuto), binario=True)
+                
+                # Il backup è uno snapshot completo: il journal è superato
+                if self.journal:
+                    self._crc_snapshot = None
+                    self.journal_path.unlink(missing_ok=True)
+                
+                return True
+            except Exception as e:
+                print(f"❌ Errore nel ripristino del backup: {e}")
+                return False
 
 
 # Funzioni di compatibilità con il codice esistente
@@ -156,6 +702,31 @@ def leggi_studenti_da_file(percorso_file: str) -> List[Dict]:
         return []
 
 
+def converti_formato(sorgente: Path, destinazione: Path, formato: str = None) -> bool:
+    """
+    Converte un file dati tra il formato JSON e quello binario.
+    
+    Il formato della sorgente è riconosciuto dal contenuto, così anche un
+    registro con un'estensione qualsiasi viene letto correttamente; la
+    destinazione è binaria se ha l'estensione dei file binari, altrimenti
+    JSON, e formato la forza.
+    
+    Args:
+        sorgente: File dati da leggere
+        destinazione: File dati da scrivere
+        formato: Formato della destinazione (opzionale)
+        
+    Returns:
+        bool: True se la conversione è riuscita
+    """
+    if formato is None:
+        formato = FORMATO_BINARIO if Path(destinazione).suffix == ESTENSIONE_BINARIA else FORMATO_JSON
+    sorgente = Path(sorgente)
+    binaria = sorgente.exists() and is_snapshot_binario(sorgente)
+    studenti = FileManager(sorgente, formato=FORMATO_BINARIO if binaria else FORMATO_JSON).leggi_studenti()
+    return FileManager(Path(destinazione), formato=formato).salva_studenti(studenti)
+
+
 def salva_studenti_su_file(percorso_file: str, studenti: List[Dict]) -> bool:
     """
     Funzione di compatibilità per salvare studenti su file.
@@ -0,0 +1,198 @@
+"""
+Ricerca approssimata degli studenti
+==================================
+Ricerca tollerante a errori di battitura, accenti, apostrofi e maiuscole.
+
+Nomi e cognomi vengono scomposti in parole normalizzate (senza accenti,
+apostrofi e spazi, in minuscolo). Il vocabolario delle parole è indicizzato
+con un BK-tree, che trova le parole entro una distanza di modifica massima
+senza confrontare la parola cercata con tutto il vocabolario, e con un
+array ordinato per riconoscere le parole ancora incomplete (prefissi).
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, List, Set, Tuple, Optional
+from src.config import FUZZY_MAX_DISTANZA
+
+# Punteggi per il tipo di corrispondenza di una parola
+PUNTEGGIO_ESATTO = 1.0
+PUNTEGGIO_PREFISSO = 0.9
+
+_SEPARATORI = re.compile(r"[\s\-]+")
+_NON_ALFANUMERICI = re.compile(r"[^0-9a-z]")
+
+
+def normalizza(testo: str) -> str:
+    """
+    Normalizza una parola per il confronto approssimato.
+    
+    Rimuove accenti (Nicolò -> nicolo), apostrofi e ogni altro carattere
+    non alfanumerico (D'Angelo -> dangelo) e converte in minuscolo.
+    """
+    scomposto = unicodedata.normalize("NFKD", testo)
+    senza_accenti = "".join(c for c in scomposto if not unicodedata.combining(c))
+    return _NON_ALFANUMERICI.sub("", senza_accenti.casefold())
+
+
+def parole(testo: str) -> List[str]:
+    """Scompone un testo in parole normalizzate non vuote"""
+    return [p for p in (normalizza(t) for t in _SEPARATORI.split(testo)) if p]
+
+
+def distanza_limitata(a: str, b: str, limite: int) -> int:
+    """
+    Distanza di Levenshtein tra a e b, interrotta appena supera il limite.
+    
+    Returns:
+        int: La distanza, oppure limite + 1 se è maggiore del limite
+    """
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    precedente = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        corrente = [i]
+        for j, cb in enumerate(b, 1):
+            corrente.append(min(
+                precedente[j] + 1,
+                corrente[j - 1] + 1,
+                precedente[j - 1] + (ca != cb),
+            ))
+        if min(corrente) > limite:
+            return limite + 1
+        precedente = corrente
+    return precedente[-1] if precedente[-1] <= limite else limite + 1
+
+
+class BKTree:
+    """BK-tree di parole con metrica di Levenshtein"""
+    
+    def __init__(self):
+        """Inizializza un albero vuoto"""
+        # Nodo: (parola, {distanza: nodo figlio})
+        self._radice: Optional[Tuple[str, Dict[int, tuple]]] = None
+    
+    def aggiungi(self, parola: str) -> None:
+        """Aggiunge una parola (le parole già presenti vengono ignorate)"""
+        if self._radice is None:
+            self._radice = (parola, {})
+            return
+        nodo = self._radice
+        while True:
+            distanza = distanza_limitata(parola, nodo[0], len(parola) + len(nodo[0]))
+            if distanza == 0:
+                return
+            figlio = nodo[1].get(distanza)
+            if figlio is None:
+                nodo[1][distanza] = (parola, {})
+                return
+            nodo = figlio
+    
+    def cerca(self, parola: str, limite: int) -> List[Tuple[str, int]]:
+        """Restituisce le coppie (parola, distanza) entro il limite"""
+        if self._radice is None:
+            return []
+        risultati = []
+        da_visitare = [self._radice]
+        while da_visitare:
+            candidata, figli = da_visitare.pop()
+            # Serve la distanza esatta per scegliere i rami da esplorare
+            distanza = distanza_limitata(parola, candidata, len(parola) + len(candidata))
+            if distanza <= limite:
+                risultati.append((candidata, distanza))
+            for d, figlio in figli.items():
+                if distanza - limite <= d <= distanza + limite:
+                    da_visitare.append(figlio)
+        return risultati
+
+
+class IndiceFuzzy:
+    """Indice per la ricerca approssimata su nome e cognome"""
+    
+    def __init__(self):
+        """Inizializza un indice vuoto"""
+        self._parole_studente: Dict[int, Set[str]] = {}
+        self._studenti_parola: Dict[str, Set[int]] = {}
+        self._albero = BKTree()
+        # Parole inserite nell'albero, anche in ordine alfabetico per i prefissi
+        self._nell_albero: Set[str] = set()
+        self._vocabolario: List[str] = []
+    
+    def aggiungi(self, matricola: int, nome: str, cognome: str) -> None:
+        """Indicizza uno studente"""
+        chiavi = set(parole(nome)) | set(parole(cognome))
+        self._parole_studente[matricola] = chiavi
+        for parola in chiavi:
+            studenti = self._studenti_parola.get(parola)
+            if studenti is None:
+                studenti = self._studenti_parola[parola] = set()
+                # Il BK-tree non supporta rimozioni: le parole restano nel
+                # vocabolario anche quando non hanno più studenti
+                if parola not in self._nell_albero:
+                    self._nell_albero.add(parola)
+                    self._albero.aggiungi(parola)
+                    insort(self._vocabolario, parola)
+            studenti.add(matricola)
+    
+    def rimuovi(self, matricola: int) -> None:
+        """Rimuove uno studente dall'indice"""
+        for parola in self._parole_studente.pop(matricola, ()):
+            studenti = self._studenti_parola[parola]
+            studenti.discard(matricola)
+            if not studenti:
+                del self._studenti_parola[parola]
+    
+    def _prefissi(self, parola: str) -> List[str]:
+        """Parole del vocabolario che iniziano con parola"""
+        risultati = []
+        for posizione in range(bisect_left(self._vocabolario, parola), len(self._vocabolario)):
+            candidata = self._vocabolario[posizione]
+            if not candidata.startswith(parola):
+                break
+            risultati.append(candidata)
+        return risultati
+    
+    def _punteggi_parola(self, parola: str, max_distanza: int) -> Dict[int, float]:
+        """Miglior punteggio di ogni studente per una parola della ricerca"""
+        # Parole brevi: poche modifiche bastano a trasformarle in altre parole
+        limite = min(max_distanza, (len(parola) - 1) // 2)
+        corrispondenze: Dict[str, float] = {}
+        for candidata, distanza in self._albero.cerca(parola, limite):
+            punteggio = PUNTEGGIO_ESATTO if distanza == 0 else 1 - distanza / (len(parola) + 1)
+            corrispondenze[candidata] = punteggio
+        for candidata in self._prefissi(parola):
+            if candidata != parola:
+                corrispondenze[candidata] = max(corrispondenze.get(candidata, 0), PUNTEGGIO_PREFISSO)
+        
+        punteggi: Dict[int, float] = {}
+        for candidata, punteggio in corrispondenze.items():
+            for matricola in self._studenti_parola.get(candidata, ()):
+                if punteggio > punteggi.get(matricola, 0):
+                    punteggi[matricola] = punteggio
+        return punteggi
+    
+    def cerca(self, testo: str, max_distanza: int = FUZZY_MAX_DISTANZA) -> Dict[int, float]:
+        """
+        Cerca gli studenti che corrispondono a tutte le parole del testo.
+        
+        Args:
+            testo: Testo cercato (una o più parole)
+            max_distanza: Numero massimo di modifiche tollerate per parola
+            
+        Returns:
+            Dict[int, float]: Punteggio tra 0 e 1 per ogni matricola trovata
+        """
+        ricerca = parole(testo)
+        if not ricerca:
+            return {}
+        totali: Optional[Dict[int, float]] = None
+        for parola in ricerca:
+            punteggi = self._punteggi_parola(parola, max_distanza)
+            if totali is None:
+                totali = punteggi
+            else:
+                totali = {m: totali[m] + p for m, p in punteggi.items() if m in totali}
+            if not totali:
+                return {}
+        return {m: p / len(ricerca) for m, p in totali.items()}
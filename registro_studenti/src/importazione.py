@@ -0,0 +1,196 @@
+"""
+Importazione massiva di studenti e voti
+======================================
+Legge righe (matricola, nome, cognome, voto) da CSV o JSON, le valida in
+blocco e produce un rapporto degli errori riga per riga.
+"""
+
+import csv
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from src.utils import valida_matricole, valida_nomi, valida_voti
+
+CAMPI = ("matricola", "nome", "cognome", "voto")
+
+
+class RapportoImportazione:
+    """Esito di un'importazione: conteggi ed errori per riga"""
+    
+    def __init__(self):
+        self.righe_lette = 0
+        self.studenti_creati = 0
+        self.voti_aggiunti = 0
+        # False se il salvataggio finale non è riuscito
+        self.salvato = True
+        # (numero di riga, messaggio), con le righe numerate da 1
+        self.errori: List[Tuple[int, str]] = []
+    
+    @property
+    def righe_scartate(self) -> int:
+        """Numero di righe non importate"""
+        return len(self.errori)
+    
+    def __str__(self) -> str:
+        righe = [
+            f"Righe lette: {self.righe_lette}",
+            f"Studenti creati: {self.studenti_creati}",
+            f"Voti aggiunti: {self.voti_aggiunti}",
+            f"Righe scartate: {self.righe_scartate}",
+        ]
+        righe.extend(f"  riga {numero}: {messaggio}" for numero, messaggio in self.errori)
+        return "\n".join(righe)
+
+
+class RigaValida:
+    """Riga già validata, pronta per essere applicata al registro"""
+    
+    __slots__ = ('numero', 'matricola', 'nome', 'cognome', 'voto')
+    
+    def __init__(self, numero: int, matricola: int, nome: Optional[str],
+                 cognome: Optional[str], voto: Optional[int]):
+        self.numero = numero
+        self.matricola = matricola
+        self.nome = nome
+        self.cognome = cognome
+        self.voto = voto
+
+
+def _normalizza_riga(riga: Dict) -> Dict[str, str]:
+    """Uniforma i nomi delle colonne e converte i valori in stringhe"""
+    normalizzata = {}
+    for chiave, valore in riga.items():
+        if chiave is None:
+            continue
+        chiave = str(chiave).strip().lower()
+        if chiave in CAMPI:
+            normalizzata[chiave] = "" if valore is None else str(valore).strip()
+    return normalizzata
+
+
+def leggi_righe_csv(stream: TextIO) -> Iterator[Dict[str, str]]:
+    """
+    Legge le righe da un CSV con intestazione (matricola, nome, cognome, voto).
+    
+    Args:
+        stream: File di testo aperto in lettura
+    
+    Returns:
+        Iterator[Dict[str, str]]: Righe come dizionari
+    """
+    lettore = csv.reader(stream)
+    intestazione = next(lettore, None)
+    if intestazione is None:
+        return
+    # Le intestazioni vengono uniformate una sola volta, non a ogni riga
+    colonne = [(nome.strip().lower(), posizione) for posizione, nome in enumerate(intestazione)]
+    colonne = [(campo, posizione) for campo, posizione in colonne if campo in CAMPI]
+    for valori in lettore:
+        if not valori:
+            continue
+        yield {campo: valori[posizione].strip() for campo, posizione in colonne if posizione < len(valori)}
+
+
+def leggi_righe_json(stream: TextIO) -> Iterator[Dict[str, str]]:
+    """
+    Legge le righe da un array JSON di oggetti.
+    
+    Args:
+        stream: File di testo aperto in lettura
+    
+    Returns:
+        Iterator[Dict[str, str]]: Righe come dizionari
+    
+    Raises:
+        ValueError: Se il contenuto non è un array JSON
+    """
+    dati = json.load(stream)
+    if not isinstance(dati, list):
+        raise ValueError("Il file JSON deve contenere un array di righe")
+    for riga in dati:
+        yield _normalizza_riga(riga) if isinstance(riga, dict) else {}
+
+
+def leggi_righe_file(percorso) -> Iterator[Dict[str, str]]:
+    """
+    Legge le righe da un file CSV o JSON, scelto in base all'estensione.
+    
+    Args:
+        percorso: Percorso del file (.csv o .json)
+    
+    Returns:
+        Iterator[Dict[str, str]]: Righe come dizionari
+    
+    Raises:
+        ValueError: Se l'estensione non è supportata
+    """
+    percorso = Path(percorso)
+    estensione = percorso.suffix.lower()
+    if estensione not in (".csv", ".json"):
+        raise ValueError(f"Formato di importazione non supportato: {estensione}")
+    with open(percorso, 'r', encoding='utf-8', newline='') as file:
+        lettore = leggi_righe_csv if estensione == ".csv" else leggi_righe_json
+        yield from lettore(file)
+
+
+def _valida_distinti(righe: List[Dict[str, str]], campi: Tuple[str, ...],
+                     validatore) -> Dict[str, object]:
+    """
+    Valida una sola volta ciascun valore distinto dei campi indicati.
+    
+    Returns:
+        Dict[str, object]: Valore validato, o ValueError, per ogni valore
+    """
+    distinti = list({riga[campo] for riga in righe for campo in campi if riga.get(campo)})
+    validi, errori = validatore(distinti)
+    esiti: Dict[str, object] = {distinti[indice]: valore for indice, valore in validi}
+    esiti.update((distinti[indice], ValueError(messaggio)) for indice, messaggio in errori)
+    return esiti
+
+
+def valida_righe(righe: Iterable[Dict], rapporto: RapportoImportazione) -> List[RigaValida]:
+    """
+    Valida in blocco le righe da importare.
+    
+    Ogni valore distinto (matricole e nomi si ripetono in un file con un
+    voto per riga) viene validato una sola volta con le funzioni di
+    validazione in blocco di src.utils; le righe non valide finiscono nel
+    rapporto e non interrompono l'importazione.
+    
+    Args:
+        righe: Righe come dizionari
+        rapporto: Rapporto in cui annotare righe lette ed errori
+        
+    Returns:
+        List[RigaValida]: Righe valide, nell'ordine del file
+    """
+    righe = list(righe)
+    rapporto.righe_lette = len(righe)
+    matricole = _valida_distinti(righe, ("matricola",), valida_matricole)
+    nomi = _valida_distinti(righe, ("nome", "cognome"), valida_nomi)
+    voti = _valida_distinti(righe, ("voto",), valida_voti)
+    
+    def esito(esiti: Dict[str, object], valore: str):
+        risultato = esiti[valore]
+        if isinstance(risultato, ValueError):
+            raise ValueError(*risultato.args)
+        return risultato
+    
+    valide = []
+    for numero, riga in enumerate(righe, start=1):
+        try:
+            matricola = riga.get("matricola")
+            if not matricola:
+                raise ValueError("La matricola non può essere vuota")
+            nome = riga.get("nome")
+            cognome = riga.get("cognome")
+            voto = riga.get("voto")
+            valide.append(RigaValida(
+                numero, int(esito(matricole, matricola)),
+                esito(nomi, nome) if nome else None,
+                esito(nomi, cognome) if cognome else None,
+                esito(voti, voto) if voto else None,
+            ))
+        except ValueError as e:
+            rapporto.errori.append((numero, str(e)))
+    return valide
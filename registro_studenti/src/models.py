@@ -4,13 +4,28 @@ Modelli dati per il registro studenti
 Contiene le classi e strutture dati principali.
 """
 
-from typing import List, Dict, Optional
-from src.config import VOTO_MIN, VOTO_MAX
+import heapq
+import json
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from fractions import Fraction
+from collections.abc import Sequence
+from typing import List, Dict, Optional, Tuple, Iterable, Iterator
+from src.config import VOTO_MIN, VOTO_MAX, SOGLIA_ECCELLENZA, FUZZY_TOP_K, FUZZY_MAX_DISTANZA
+from src.columnar import RegistroColonnare, NUMPY_DISPONIBILE
+from src.search_index import IndiceNomi
+from src.fuzzy_search import IndiceFuzzy
 
 
 class Persona:
     """Classe base per rappresentare una persona"""
     
+    # Niente __dict__ per istanza: il registro può contenere centinaia di migliaia di persone
+    __slots__ = ('nome', 'cognome')
+    
     def __init__(self, nome: str, cognome: str):
         """
         Inizializza una nuova persona.
@@ -19,8 +34,9 @@ class Persona:
             nome: Nome della persona
             cognome: Cognome della persona
         """
-        self.nome = nome.strip().title()
-        self.cognome = cognome.strip().title()
+        # I nomi si ripetono molto: l'interning condivide un'unica stringa
+        self.nome = sys.intern(nome.strip().title())
+        self.cognome = sys.intern(cognome.strip().title())
     
     def nome_completo(self) -> str:
         """Restituisce il nome completo"""
@@ -34,9 +50,47 @@ class Persona:
         return self.nome_completo()
 
 
+def _contenitore_voti(voti: List[int]):
+    """
+    Restituisce un contenitore compatto per i voti.
+    
+    I voti validi stanno in un byte ciascuno, quindi vengono memorizzati in
+    un array('B'); valori non rappresentabili (decimali, fuori intervallo)
+    provenienti da file esterni restano in una lista per non alterarli.
+    """
+    try:
+        return array('B', voti)
+    except (TypeError, OverflowError):
+        return list(voti)
+
+
+class ListaSolaLettura(list):
+    """
+    Lista in sola lettura.
+    
+    Si usa come una lista (confronti, concatenazioni, slice, isinstance) ma
+    i metodi che la modificano sollevano TypeError: le modifiche devono
+    passare dai metodi del modello, che aggiornano somme e aggregati, invece
+    di andare perse su una copia.
+    """
+    
+    __slots__ = ()
+    
+    def _sola_lettura(self, *args, **kwargs):
+        raise TypeError("Lista in sola lettura: usare i metodi del modello per modificarla")
+    
+    append = extend = insert = remove = pop = clear = sort = reverse = _sola_lettura
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _sola_lettura
+    
+    def __reduce__(self):
+        return ListaSolaLettura, (list(self),)
+
+
 class Studente(Persona):
     """Classe per rappresentare uno studente del registro che estende Persona"""
     
+    __slots__ = ('matricola', '_lista', '_voti', '_somma', '_frammento')
+    
     def __init__(self, nome: str, cognome: str, matricola: int, voti: List[int] = None):
         """
         Inizializza un nuovo studente.
@@ -49,40 +103,65 @@ class Studente(Persona):
         """
         super().__init__(nome, cognome)
         self.matricola = matricola
+        # Lista che contiene lo studente, avvisata a ogni variazione dei voti
+        self._lista: Optional['ListaStudenti'] = None
         self.voti = voti or []
     
+    @property
+    def voti(self) -> ListaSolaLettura:
+        """Restituisce i voti dello studente in una lista in sola lettura"""
+        return ListaSolaLettura(self._voti)
+    
+    @voti.setter
+    def voti(self, voti: List[int]) -> None:
+        """Sostituisce i voti aggiornando somma e conteggio"""
+        self._voti = _contenitore_voti(voti)
+        self._somma = sum(self._voti)
+        self._frammento = None
+        if self._lista is not None:
+            self._lista._aggiorna_aggregati(self)
+    
     def media_voti(self) -> float:
         """Calcola la media dei voti dello studente"""
-        if not self.voti:
+        if not self._voti:
             return 0.0
-        return sum(self.voti) / len(self.voti)
+        return self._somma / len(self._voti)
     
     def aggiungi_voto(self, voto: int) -> bool:
         """Aggiunge un voto alla lista"""
         if VOTO_MIN <= voto <= VOTO_MAX:
-            self.voti.append(voto)
+            try:
+                self._voti.append(voto)
+            except TypeError:
+                # Voto non intero: si torna a una lista generica
+                self._voti = list(self._voti)
+                self._voti.append(voto)
+            self._somma += voto
+            self._frammento = None
+            if self._lista is not None:
+                self._lista._aggiorna_aggregati(self)
             return True
         return False
     
     def voto_massimo(self) -> int:
         """Restituisce il voto massimo"""
-        return max(self.voti) if self.voti else 0
+        return max(self._voti) if self._voti else 0
     
     def voto_minimo(self) -> int:
         """Restituisce il voto minimo"""
-        return min(self.voti) if self.voti else 0
+        return min(self._voti) if self._voti else 0
     
     def numero_voti(self) -> int:
         """Restituisce il numero di voti"""
-        return len(self.voti)
+        return len(self._voti)
     
     def ha_superato_esami(self) -> bool:
         """Verifica se lo studente ha almeno un voto"""
-        return len(self.voti) > 0
+        return len(self._voti) > 0
     
     def is_eccellente(self) -> bool:
         """Verifica se lo studente è eccellente (media >= 27)"""
-        return self.media_voti() >= 27.0
+        return self.media_voti() >= SOGLIA_ECCELLENZA
     
     def to_dict(self) -> Dict:
         """Converte lo studente in dizionario"""
@@ -90,9 +169,27 @@ class Studente(Persona):
             "matricola": str(self.matricola),
             "nome": self.nome,
             "cognome": self.cognome,
-            "voti": self.voti
+            "voti": list(self._voti)
         }
     
+    def frammento_json(self) -> str:
+        """
+        Restituisce lo studente serializzato come elemento del file JSON.
+        
+        Il testo coincide con quello prodotto da json.dump(..., indent=2) per
+        un elemento della lista principale e viene conservato finché lo
+        studente non cambia: i voti azzerano la cache quando vengono
+        modificati, nomi e matricola vengono confrontati con quelli usati
+        per produrla.
+        """
+        cache = self._frammento
+        if (cache is None or cache[0] is not self.matricola
+                or cache[1] is not self.nome or cache[2] is not self.cognome):
+            testo = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+            cache = (self.matricola, self.nome, self.cognome, "  " + testo.replace("\n", "\n  "))
+            self._frammento = cache
+        return cache[3]
+    
     @classmethod
     def from_dict(cls, data: Dict) -> 'Studente':
         """Crea uno studente da un dizionario"""
@@ -107,7 +204,7 @@ class Studente(Persona):
         """Rappresentazione stringa dello studente con informazioni estese"""
         media = self.media_voti()
         stato = "Eccellente" if self.is_eccellente() else "Buono" if media >= 24 else "Sufficiente" if media >= 18 else "Nessun voto"
-        return f"[{self.matricola}] {self.nome_completo()} - Media: {media:.2f} ({len(self.voti)} voti) - {stato}"
+        return f"[{self.matricola}] {self.nome_completo()} - Media: {media:.2f} ({len(self._voti)} voti) - {stato}"
 
 
 class ListaStudenti:
@@ -115,107 +212,485 @@ class ListaStudenti:
     
     def __init__(self):
         """Inizializza una lista vuota di studenti"""
-        self.studenti: List[Studente] = []
+        # Indice matricola -> studente: il dict conserva l'ordine di inserimento,
+        # quindi funge sia da lista ordinata sia da indice per le ricerche O(1)
+        self._indice: Dict[int, Studente] = {}
+        # Incrementata a ogni modifica: invalida le viste derivate (es. colonne)
+        self._versione = 0
+        self._colonne: Optional[RegistroColonnare] = None
+        self._versione_colonne = -1
+        # Studenti per posizione, ricostruiti solo dopo aggiunte o rimozioni
+        self._sequenza: Optional[ListaSolaLettura] = None
+        # Esportazione in dizionari, ricostruita solo dopo una modifica
+        self._dizionari: Tuple[Dict, ...] = ()
+        self._versione_dizionari = -1
+        # Indice per la ricerca per nome, costruito alla prima ricerca
+        self._indice_nomi: Optional[IndiceNomi] = None
+        self._indice_fuzzy: Optional[IndiceFuzzy] = None
+        self._azzera_aggregati()
+    
+    def _azzera_aggregati(self) -> None:
+        """Azzera gli aggregati mantenuti incrementalmente per le statistiche"""
+        self._versione += 1
+        self._contatore = 0
+        self._con_voti = 0
+        self._eccellenti = 0
+        self._somma_medie = Fraction(0)
+        # Chiavi (media, -ordine, matricola) degli studenti con voti, ordinate:
+        # a parità di media precede lo studente inserito per primo
+        self._medie: List[Tuple[float, int, int]] = []
+        # Per ogni studente con voti: chiave in _medie e media esatta registrata
+        self._chiavi: Dict[int, Tuple[Tuple[float, int, int], Fraction]] = {}
+        self._ordine: Dict[int, int] = {}
+    
+    def _collega(self, studente: Studente) -> None:
+        """
+        Registra uno studente nell'indice e negli aggregati.
+        
+        Raises:
+            ValueError: Se lo studente appartiene già a un'altra lista, i cui
+                aggregati non verrebbero più aggiornati dai suoi voti
+        """
+        if studente._lista is not None and studente._lista is not self:
+            raise ValueError(f"Lo studente {studente.matricola} appartiene già a un'altra lista")
+        self._indice[studente.matricola] = studente
+        self._sequenza = None
+        self._ordine[studente.matricola] = self._contatore
+        self._contatore += 1
+        studente._lista = self
+        self._aggiorna_aggregati(studente)
+        if self._indice_nomi is not None:
+            self._indice_nomi.aggiungi(studente.matricola, studente.nome, studente.cognome)
+        if self._indice_fuzzy is not None:
+            self._indice_fuzzy.aggiungi(studente.matricola, studente.nome, studente.cognome)
+    
+    def _scollega(self, studente: Studente) -> None:
+        """Rimuove uno studente dall'indice e dagli aggregati"""
+        self._rimuovi_da_aggregati(studente.matricola)
+        del self._indice[studente.matricola]
+        self._sequenza = None
+        del self._ordine[studente.matricola]
+        studente._lista = None
+        if self._indice_nomi is not None:
+            self._indice_nomi.rimuovi(studente.matricola)
+        if self._indice_fuzzy is not None:
+            self._indice_fuzzy.rimuovi(studente.matricola)
+    
+    def _rimuovi_da_aggregati(self, matricola: int) -> None:
+        """Toglie il contributo di uno studente dagli aggregati"""
+        self._versione += 1
+        registrata = self._chiavi.pop(matricola, None)
+        if registrata is None:
+            return
+        chiave, media_esatta = registrata
+        del self._medie[bisect_left(self._medie, chiave)]
+        self._con_voti -= 1
+        self._somma_medie -= media_esatta
+        if chiave[0] >= SOGLIA_ECCELLENZA:
+            self._eccellenti -= 1
+    
+    def _aggiorna_aggregati(self, studente: Studente) -> None:
+        """Aggiorna gli aggregati dopo una variazione dei voti di uno studente"""
+        self._rimuovi_da_aggregati(studente.matricola)
+        if not studente.ha_superato_esami():
+            return
+        media = studente.media_voti()
+        chiave = (media, -self._ordine[studente.matricola], studente.matricola)
+        # Media come frazione, per sommare le medie senza errori di arrotondamento
+        media_esatta = Fraction(studente._somma) / len(studente._voti)
+        insort(self._medie, chiave)
+        self._chiavi[studente.matricola] = (chiave, media_esatta)
+        self._con_voti += 1
+        self._somma_medie += media_esatta
+        if media >= SOGLIA_ECCELLENZA:
+            self._eccellenti += 1
+    
+    def colonne(self) -> RegistroColonnare:
+        """
+        Restituisce la vista colonnare del registro.
+        
+        La vista viene ricostruita solo se la lista è cambiata dall'ultima
+        richiesta; le sue posizioni corrispondono all'ordine di iterazione.
+        """
+        if self._versione_colonne != self._versione:
+            self._colonne = RegistroColonnare.da_lista(self)
+            self._versione_colonne = self._versione
+        return self._colonne
+    
+    @property
+    def studenti(self) -> ListaSolaLettura:
+        """
+        Restituisce gli studenti in ordine di inserimento.
+        
+        La lista è in sola lettura e viene riusata finché non si aggiungono
+        o rimuovono studenti: le modifiche passano da aggiungi_studente e
+        rimuovi_studente, che aggiornano indice e aggregati.
+        """
+        return self._in_sequenza()
+    
+    @studenti.setter
+    def studenti(self, studenti: Iterable[Studente]) -> None:
+        """Sostituisce gli studenti ricostruendo indice e aggregati"""
+        self._svuota()
+        for studente in studenti:
+            self._collega_nuovo(studente)
+    
+    def _collega_nuovo(self, studente: Studente) -> None:
+        """Collega uno studente durante una ricostruzione, saltando le matricole duplicate"""
+        if studente.matricola in self._indice:
+            print(f"⚠️ Matricola {studente.matricola} duplicata: viene mantenuto il primo studente")
+            return
+        try:
+            self._collega(studente)
+        except ValueError:
+            # Una lista ricostruita a metà non deve restare in uso
+            self._svuota()
+            raise
+    
+    def _svuota(self) -> None:
+        """Rimuove tutti gli studenti"""
+        for studente in self._indice.values():
+            studente._lista = None
+        self._indice = {}
+        self._sequenza = None
+        self._indice_nomi = None
+        self._indice_fuzzy = None
+        self._azzera_aggregati()
+    
+    def _in_sequenza(self) -> ListaSolaLettura:
+        """Lista degli studenti per posizione, ricostruita dopo aggiunte o rimozioni"""
+        if self._sequenza is None:
+            self._sequenza = ListaSolaLettura(self._indice.values())
+        return self._sequenza
+    
+    def vista(self) -> 'VistaStudenti':
+        """Restituisce una vista in sola lettura, senza copiare gli studenti"""
+        return VistaStudenti(self)
+    
+    def pagina(self, inizio: int = 0, limite: Optional[int] = None) -> List[Studente]:
+        """
+        Restituisce una pagina di studenti in ordine di inserimento.
+        
+        Args:
+            inizio: Posizione del primo studente (da 0)
+            limite: Numero massimo di studenti (None = fino alla fine)
+            
+        Returns:
+            List[Studente]: Studenti della pagina
+        """
+        inizio = max(inizio, 0)
+        fine = None if limite is None else inizio + max(limite, 0)
+        return self._in_sequenza()[inizio:fine]
+    
+    def dizionari(self) -> Tuple[Dict, ...]:
+        """
+        Restituisce gli studenti come dizionari, come to_dict_list.
+        
+        Il risultato viene conservato e ricostruito solo dopo una modifica
+        della lista: i dizionari sono condivisi e non vanno modificati.
+        """
+        if self._versione_dizionari != self._versione:
+            self._dizionari = tuple(s.to_dict() for s in self)
+            self._versione_dizionari = self._versione
+        return self._dizionari
     
     def trova_studente(self, matricola: int) -> Optional[Studente]:
         """Trova uno studente per matricola"""
-        for studente in self.studenti:
-            if studente.matricola == matricola:
-                return studente
-        return None
+        return self._indice.get(matricola)
+    
+    def _indice_nomi_pronto(self) -> IndiceNomi:
+        """Restituisce l'indice dei nomi, costruendolo alla prima ricerca"""
+        if self._indice_nomi is None:
+            indice = IndiceNomi()
+            for studente in self:
+                indice.aggiungi(studente.matricola, studente.nome, studente.cognome)
+            self._indice_nomi = indice
+        return self._indice_nomi
+    
+    def cerca_fuzzy(self, testo: str, top_k: int = FUZZY_TOP_K,
+                    max_distanza: int = FUZZY_MAX_DISTANZA) -> List[Tuple[Studente, float]]:
+        """
+        Ricerca approssimata su nome e cognome, ordinata per pertinenza.
+        
+        Ignora accenti, apostrofi e maiuscole e tollera fino a max_distanza
+        errori di battitura per parola; le parole incomplete valgono come
+        prefissi. A parità di punteggio precede lo studente inserito prima.
+        
+        Args:
+            testo: Testo cercato
+            top_k: Numero massimo di risultati
+            max_distanza: Errori tollerati per parola
+            
+        Returns:
+            List[Tuple[Studente, float]]: Coppie (studente, punteggio tra 0 e 1)
+        """
+        if self._indice_fuzzy is None:
+            indice = IndiceFuzzy()
+            for studente in self:
+                indice.aggiungi(studente.matricola, studente.nome, studente.cognome)
+            self._indice_fuzzy = indice
+        
+        punteggi = self._indice_fuzzy.cerca(testo, max_distanza)
+        migliori = heapq.nsmallest(
+            top_k, punteggi.items(), key=lambda item: (-item[1], self._ordine[item[0]])
+        )
+        return [(self._indice[m], punteggio) for m, punteggio in migliori]
+    
+    def _in_ordine(self, matricole) -> List[Studente]:
+        """Converte un insieme di matricole negli studenti, in ordine di inserimento"""
+        if len(matricole) * 4 > len(self):
+            # Molti risultati: scorrere la lista costa meno che ordinarli
+            return [s for s in self if s.matricola in matricole]
+        return [self._indice[m] for m in sorted(matricole, key=self._ordine.__getitem__)]
     
     def trova_per_nome(self, nome: str, cognome: str = None) -> List[Studente]:
         """Trova studenti per nome/cognome"""
-        risultati = []
-        for studente in self.studenti:
-            if nome.lower() in studente.nome.lower():
-                if cognome is None or cognome.lower() in studente.cognome.lower():
-                    risultati.append(studente)
-        return risultati
+        indice = self._indice_nomi_pronto()
+        trovati = indice.contiene("nome", nome)
+        if cognome is not None:
+            trovati = trovati & indice.contiene("cognome", cognome)
+        return self._in_ordine(trovati)
+    
+    def cerca(self, nome: str, cognome: str = None) -> List[Studente]:
+        """
+        Trova gli studenti con il testo nel nome o nel cognome, oppure con
+        il cognome indicato (opzionale) nel cognome.
+        """
+        indice = self._indice_nomi_pronto()
+        trovati = indice.contiene("nome", nome) | indice.contiene("cognome", nome)
+        if cognome:
+            trovati = trovati | indice.contiene("cognome", cognome)
+        return self._in_ordine(trovati)
+    
+    def cerca_per_prefisso(self, prefisso: str) -> List[Studente]:
+        """Trova gli studenti il cui nome o cognome inizia con il prefisso"""
+        indice = self._indice_nomi_pronto()
+        trovati = set(indice.inizia_con("nome", prefisso)) | set(indice.inizia_con("cognome", prefisso))
+        return self._in_ordine(trovati)
     
     def aggiungi_studente(self, studente: Studente) -> bool:
-        """Aggiunge uno studente se non esiste già"""
-        if self.trova_studente(studente.matricola) is None:
-            self.studenti.append(studente)
+        """
+        Aggiunge uno studente se non esiste già.
+        
+        Raises:
+            ValueError: Se lo studente appartiene a un'altra lista
+        """
+        if studente.matricola not in self._indice:
+            self._collega(studente)
             return True
         return False
     
     def rimuovi_studente(self, matricola: int) -> bool:
         """Rimuove uno studente per matricola"""
-        studente = self.trova_studente(matricola)
-        if studente:
-            self.studenti.remove(studente)
-            return True
-        return False
+        studente = self._indice.get(matricola)
+        if studente is None:
+            return False
+        self._scollega(studente)
+        return True
     
     def studenti_eccellenti(self) -> List[Studente]:
         """Restituisce gli studenti eccellenti"""
-        return [s for s in self.studenti if s.is_eccellente()]
+        if NUMPY_DISPONIBILE:
+            studenti = self._in_sequenza()
+            return [studenti[i] for i in self.colonne().indici_eccellenti()]
+        return [s for s in self if s.is_eccellente()]
     
     def studenti_con_voti(self) -> List[Studente]:
         """Restituisce gli studenti che hanno almeno un voto"""
-        return [s for s in self.studenti if s.ha_superato_esami()]
+        return [s for s in self if s.ha_superato_esami()]
     
     def studenti_senza_voti(self) -> List[Studente]:
         """Restituisce gli studenti che non hanno ancora voti"""
-        return [s for s in self.studenti if not s.ha_superato_esami()]
+        return [s for s in self if not s.ha_superato_esami()]
     
     def media_generale(self) -> float:
         """Calcola la media generale di tutti gli studenti con voti"""
-        studenti_con_voti = self.studenti_con_voti()
-        if not studenti_con_voti:
+        if not self._con_voti:
             return 0.0
-        medie = [s.media_voti() for s in studenti_con_voti]
-        return sum(medie) / len(medie)
+        return float(self._somma_medie / self._con_voti)
     
     def statistiche(self) -> Dict:
         """Restituisce statistiche generali"""
         stats = {
-            "totale_studenti": len(self.studenti),
-            "studenti_con_voti": len(self.studenti_con_voti()),
-            "studenti_senza_voti": len(self.studenti_senza_voti()),
-            "studenti_eccellenti": len(self.studenti_eccellenti()),
+            "totale_studenti": len(self),
+            "studenti_con_voti": self._con_voti,
+            "studenti_senza_voti": len(self) - self._con_voti,
+            "studenti_eccellenti": self._eccellenti,
             "media_generale": self.media_generale()
         }
         
-        studenti_con_voti = self.studenti_con_voti()
-        if studenti_con_voti:
-            medie = [s.media_voti() for s in studenti_con_voti]
+        if self._medie:
+            migliore = self._indice[self._medie[-1][2]]
             stats.update({
-                "media_più_alta": max(medie),
-                "media_più_bassa": min(medie),
-                "migliore_studente": max(studenti_con_voti, key=lambda s: s.media_voti()).nome_completo()
+                "media_più_alta": self._medie[-1][0],
+                "media_più_bassa": self._medie[0][0],
+                "migliore_studente": migliore.nome_completo()
             })
         
         return stats
     
     def ordina_per_media(self, decrescente: bool = True) -> List[Studente]:
-        """Ordina gli studenti per media"""
-        return sorted(self.studenti_con_voti(), key=lambda s: s.media_voti(), reverse=decrescente)
+        """
+        Ordina gli studenti per media.
+        
+        Legge la classifica già mantenuta in _medie, senza riordinare: a parità
+        di media gli studenti restano nell'ordine di inserimento.
+        """
+        if decrescente:
+            return self.top_k(len(self._medie))
+        return list(self._in_ordine_crescente())
+    
+    def _in_ordine_crescente(self):
+        """Itera gli studenti con voti dalla media più bassa"""
+        # _medie è crescente ma, a parità di media, dall'ultimo inserito: ogni
+        # gruppo di medie uguali si percorre a ritroso dalla sua fine, trovata
+        # con una bisezione, senza copiarlo
+        medie = self._medie
+        inizio = 0
+        while inizio < len(medie):
+            fine = bisect_right(medie, (medie[inizio][0], float("inf")))
+            for posizione in range(fine - 1, inizio - 1, -1):
+                yield self._indice[medie[posizione][2]]
+            inizio = fine
+    
+    def top_k(self, k: int) -> List[Studente]:
+        """
+        Restituisce i k studenti con la media più alta, in O(k).
+        
+        Args:
+            k: Numero di studenti da restituire
+            
+        Returns:
+            List[Studente]: Studenti dalla media più alta
+        """
+        return [self._indice[matricola] for _, _, matricola in islice(reversed(self._medie), max(k, 0))]
+    
+    def bottom_k(self, k: int) -> List[Studente]:
+        """
+        Restituisce i k studenti con la media più bassa, in O(k).
+        
+        Args:
+            k: Numero di studenti da restituire
+            
+        Returns:
+            List[Studente]: Studenti dalla media più bassa
+        """
+        return list(islice(self._in_ordine_crescente(), max(k, 0)))
+    
+    def posizione_in_classifica(self, matricola: int) -> Optional[int]:
+        """
+        Restituisce la posizione (da 1) dello studente nella classifica per media.
+        
+        Args:
+            matricola: Matricola dello studente
+            
+        Returns:
+            Optional[int]: Posizione, o None se lo studente non ha voti
+        """
+        registrata = self._chiavi.get(matricola)
+        if registrata is None:
+            return None
+        return len(self._medie) - bisect_left(self._medie, registrata[0])
+    
+    def percentile(self, matricola: int) -> Optional[float]:
+        """
+        Restituisce la percentuale di studenti con media minore o uguale
+        a quella dello studente indicato.
+        
+        Args:
+            matricola: Matricola dello studente
+            
+        Returns:
+            Optional[float]: Percentile (0-100], o None se lo studente non ha voti
+        """
+        registrata = self._chiavi.get(matricola)
+        if registrata is None:
+            return None
+        non_superiori = bisect_right(self._medie, (registrata[0][0], float("inf")))
+        return 100.0 * non_superiori / len(self._medie)
+    
+    def media_al_percentile(self, percentuale: float) -> Optional[float]:
+        """
+        Restituisce la media al percentile indicato (metodo nearest-rank).
+        
+        Args:
+            percentuale: Percentile richiesto, tra 0 e 100
+            
+        Returns:
+            Optional[float]: Media corrispondente, o None se nessuno ha voti
+        """
+        if not self._medie:
+            return None
+        if not 0 <= percentuale <= 100:
+            raise ValueError("Il percentile deve essere compreso tra 0 e 100")
+        posizione = max(math.ceil(percentuale / 100 * len(self._medie)), 1)
+        return self._medie[posizione - 1][0]
     
     def ordina_per_nome(self) -> List[Studente]:
         """Ordina gli studenti per nome"""
-        return sorted(self.studenti, key=lambda s: (s.cognome, s.nome))
+        return sorted(self, key=lambda s: (s.cognome, s.nome))
     
     def to_dict_list(self) -> List[Dict]:
         """Converte la lista in formato dizionario"""
-        return [s.to_dict() for s in self.studenti]
+        return [s.to_dict() for s in self]
+    
+    def frammenti_json(self) -> List[str]:
+        """Restituisce gli studenti serializzati, riusando quelli non modificati"""
+        return [s.frammento_json() for s in self]
     
-    def from_dict_list(self, data: List[Dict]) -> None:
-        """Carica studenti da una lista di dizionari"""
-        self.studenti = [Studente.from_dict(item) for item in data]
+    def from_dict_list(self, data: Iterable[Dict]) -> None:
+        """
+        Carica studenti da una lista (o da un iteratore) di dizionari.
+        
+        Delle matricole duplicate viene mantenuto il primo studente, con un avviso.
+        """
+        self._svuota()
+        for item in data:
+            self._collega_nuovo(Studente.from_dict(item))
     
     def __len__(self) -> int:
         """Restituisce il numero di studenti nella lista"""
-        return len(self.studenti)
+        return len(self._indice)
     
     def __iter__(self):
         """Permette di iterare sulla lista di studenti"""
-        return iter(self.studenti)
+        return iter(self._indice.values())
     
     def __contains__(self, matricola: int) -> bool:
         """Verifica se una matricola è presente nella lista"""
-        return self.trova_studente(matricola) is not None
+        return matricola in self._indice
+
+
+class VistaStudenti(Sequence):
+    """
+    Vista in sola lettura degli studenti di una ListaStudenti.
+    
+    Non copia gli studenti e segue le modifiche della lista: l'accesso per
+    posizione usa una sequenza interna ricostruita solo quando vengono
+    aggiunti o rimossi studenti.
+    """
+    
+    __slots__ = ('_lista',)
+    
+    def __init__(self, lista: ListaStudenti):
+        self._lista = lista
+    
+    def __len__(self) -> int:
+        return len(self._lista)
+    
+    def __getitem__(self, posizione):
+        """Restituisce uno studente, o una lista di studenti per gli slice"""
+        return self._lista._in_sequenza()[posizione]
+    
+    def __iter__(self) -> Iterator[Studente]:
+        return iter(self._lista)
+    
+    def __contains__(self, studente) -> bool:
+        return (isinstance(studente, Studente)
+                and self._lista.trova_studente(studente.matricola) is studente)
+    
+    def __repr__(self) -> str:
+        return f"VistaStudenti({len(self)} studenti)"
 
 
 # Funzioni di utilità per compatibilità con il codice esistente
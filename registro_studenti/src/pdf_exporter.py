@@ -5,16 +5,152 @@ Gestisce la creazione di report PDF.
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import List, Dict
+from itertools import islice
+from time import perf_counter
+from typing import Callable, List, Dict, Iterable, Optional, Tuple
 from pathlib import Path
 from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from src.config import EXPORTS_DIR
-from src.utils import calcola_media, genera_nome_file_timestamp
+from src.config import (
+    EXPORTS_DIR, PAGELLE_DIMENSIONE_BLOCCO, SOGLIA_ECCELLENZA, assicura_directory
+)
+from src.columnar import RegistroColonnare
+from src.utils import calcola_media, contesto_processi, genera_nome_file_timestamp
+
+
+INTESTAZIONI_TABELLA = ['Matricola', 'Nome', 'Cognome', 'N° Voti', 'Media']
+LARGHEZZE_COLONNE = [1.2*inch, 1.5*inch, 1.5*inch, 0.8*inch, 0.8*inch]
+
+# Altezze fisse delle righe, così ogni pagina dell'esportazione a blocchi
+# contiene un numero di righe noto in anticipo
+ALTEZZA_INTESTAZIONE = 22
+ALTEZZA_RIGA = 16
+MARGINE = 0.75 * inch
+
+STILE_TABELLA = [
+    # Intestazione
+    ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    
+    # Contenuto
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    
+    # Bordi
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    
+    # Righe alternate
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+]
+
+
+class StatisticheIncrementali:
+    """
+    Statistiche del registro calcolate uno studente alla volta.
+    
+    Produce le stesse chiavi di RegistroColonnare.statistiche() senza
+    tenere in memoria gli studenti; al posto di "indice_migliore" conserva
+    il nome del migliore studente.
+    """
+    
+    def __init__(self):
+        self.totale = 0
+        self.con_voti = 0
+        self.eccellenti = 0
+        self.somma_medie = 0.0
+        self.media_massima = None
+        self.media_minima = None
+        self.nome_migliore = ""
+    
+    def aggiungi(self, studente: Dict, media: float) -> None:
+        """
+        Registra uno studente.
+        
+        Args:
+            studente: Dati dello studente
+            media: Media dei voti già calcolata (0.0 se non ha voti)
+        """
+        self.totale += 1
+        if not studente.get('voti'):
+            return
+        self.con_voti += 1
+        self.somma_medie += media
+        if media >= SOGLIA_ECCELLENZA:
+            self.eccellenti += 1
+        # A parità di media resta il primo studente incontrato
+        if self.media_massima is None or media > self.media_massima:
+            self.media_massima = media
+            self.nome_migliore = f"{studente.get('nome', '')} {studente.get('cognome', '')}"
+        if self.media_minima is None or media < self.media_minima:
+            self.media_minima = media
+    
+    def statistiche(self) -> Dict:
+        """Restituisce le statistiche accumulate"""
+        stats = {
+            "totale_studenti": self.totale,
+            "studenti_con_voti": self.con_voti,
+            "studenti_senza_voti": self.totale - self.con_voti,
+            "studenti_eccellenti": self.eccellenti,
+            "media_generale": self.somma_medie / self.con_voti if self.con_voti else 0.0,
+        }
+        if self.con_voti:
+            stats.update({
+                "media_più_alta": self.media_massima,
+                "media_più_bassa": self.media_minima,
+            })
+        return stats
+
+
+# Stili condivisi da tutti gli esportatori, creati al primo utilizzo
+_STILI: Optional[Dict[str, object]] = None
+_STILE_TABELLA: Optional[TableStyle] = None
+
+
+def _stili_pdf() -> Dict[str, object]:
+    """Restituisce il foglio di stile e gli stili personalizzati, creandoli la prima volta"""
+    global _STILI
+    if _STILI is None:
+        styles = getSampleStyleSheet()
+        _STILI = {
+            'styles': styles,
+            # Stile per il titolo
+            'title': ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=20,
+                spaceAfter=30,
+                alignment=1,  # Centrato
+                textColor=colors.darkblue
+            ),
+            # Stile per i sottotitoli
+            'subtitle': ParagraphStyle(
+                'CustomSubtitle',
+                parent=styles['Heading2'],
+                fontSize=14,
+                spaceAfter=12,
+                textColor=colors.darkgreen
+            ),
+        }
+    return _STILI
+
+
+def _stile_tabella() -> TableStyle:
+    """Restituisce lo stile delle tabelle, creato una sola volta e condiviso tra le tabelle"""
+    global _STILE_TABELLA
+    if _STILE_TABELLA is None:
+        _STILE_TABELLA = TableStyle(STILE_TABELLA)
+    return _STILE_TABELLA
 
 
 class PDFExporter:
@@ -28,29 +164,21 @@ class PDFExporter:
             output_dir: Directory di output per i PDF
         """
         self.output_dir = output_dir or EXPORTS_DIR
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
     
-    def _setup_custom_styles(self):
-        """Configura gli stili personalizzati per il PDF"""
-        # Stile per il titolo
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=20,
-            spaceAfter=30,
-            alignment=1,  # Centrato
-            textColor=colors.darkblue
-        )
-        
-        # Stile per i sottotitoli
-        self.subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor=colors.darkgreen
-        )
+    @property
+    def styles(self):
+        """Foglio di stile di base di reportlab"""
+        return _stili_pdf()['styles']
+    
+    @property
+    def title_style(self) -> ParagraphStyle:
+        """Stile per il titolo"""
+        return _stili_pdf()['title']
+    
+    @property
+    def subtitle_style(self) -> ParagraphStyle:
+        """Stile per i sottotitoli"""
+        return _stili_pdf()['subtitle']
     
     def esporta_lista_studenti(self, studenti: List[Dict], nome_file: str = None) -> Path:
         """
@@ -78,7 +206,7 @@ class PDFExporter:
         file_path = self.output_dir / nome_file
         
         # Assicura che la directory esista
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        assicura_directory(self.output_dir)
         
         # Crea il documento PDF
         doc = SimpleDocTemplate(str(file_path), pagesize=A4)
@@ -112,99 +240,207 @@ class PDFExporter:
         
         return file_path
     
+    @staticmethod
+    def _riga_tabella(studente: Dict, media: float) -> List[str]:
+        """Formatta la riga della tabella di uno studente"""
+        return [
+            studente.get('matricola', 'N/D'),
+            studente.get('nome', 'N/D'),
+            studente.get('cognome', 'N/D'),
+            str(len(studente.get('voti', []))),
+            f"{media:.2f}" if media > 0 else "N/D"
+        ]
+    
     def _aggiungi_tabella_studenti(self, story: List, studenti: List[Dict]):
         """Aggiunge la tabella degli studenti al PDF"""
-        # Intestazioni della tabella
-        headers = ['Matricola', 'Nome', 'Cognome', 'N° Voti', 'Media']
-        
-        # Dati della tabella
-        table_data = [headers]
-        
+        table_data = [INTESTAZIONI_TABELLA]
         for studente in studenti:
-            matricola = studente.get('matricola', 'N/D')
-            nome = studente.get('nome', 'N/D')
-            cognome = studente.get('cognome', 'N/D')
-            voti = studente.get('voti', [])
-            num_voti = len(voti)
-            media = calcola_media(voti)
-            
-            row = [
-                matricola,
-                nome,
-                cognome,
-                str(num_voti),
-                f"{media:.2f}" if media > 0 else "N/D"
-            ]
-            table_data.append(row)
-        
-        # Crea la tabella
-        table = Table(table_data, colWidths=[1.2*inch, 1.5*inch, 1.5*inch, 0.8*inch, 0.8*inch])
-        
-        # Stile della tabella
-        table.setStyle(TableStyle([
-            # Intestazione
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            
-            # Contenuto
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            
-            # Bordi
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            
-            # Righe alternate
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
+            table_data.append(self._riga_tabella(studente, calcola_media(studente.get('voti', []))))
         
+        table = Table(table_data, colWidths=LARGHEZZE_COLONNE)
+        table.setStyle(_stile_tabella())
         story.append(table)
     
     def _aggiungi_statistiche(self, story: List, studenti: List[Dict]):
         """Aggiunge le statistiche al PDF"""
+        # Calcola statistiche in un solo passaggio sulle colonne dei voti
+        stats = RegistroColonnare.da_dizionari(studenti).statistiche()
+        nome_migliore = ""
+        if stats['studenti_con_voti']:
+            migliore = studenti[stats['indice_migliore']]
+            nome_migliore = f"{migliore.get('nome', '')} {migliore.get('cognome', '')}"
+        story.extend(self._paragrafi_statistiche(stats, nome_migliore))
+    
+    def _paragrafi_statistiche(self, stats: Dict, nome_migliore: str) -> List[Paragraph]:
+        """Crea il titolo e il testo della sezione statistiche"""
         subtitle = Paragraph("📊 Statistiche Generali", self.subtitle_style)
-        story.append(subtitle)
         
-        # Calcola statistiche
-        totale_studenti = len(studenti)
-        studenti_con_voti = [s for s in studenti if s.get('voti', [])]
-        studenti_senza_voti = totale_studenti - len(studenti_con_voti)
+        stats_text = f"• Totale studenti: {stats['totale_studenti']}<br/>"
+        stats_text += f"• Studenti con voti: {stats['studenti_con_voti']}<br/>"
+        stats_text += f"• Studenti senza voti: {stats['studenti_senza_voti']}<br/>"
+        
+        if stats['studenti_con_voti']:
+            stats_text += f"• Media generale: {stats['media_generale']:.2f}<br/>"
+            stats_text += f"• Media più alta: {stats['media_più_alta']:.2f}<br/>"
+            stats_text += f"• Media più bassa: {stats['media_più_bassa']:.2f}<br/>"
+            stats_text += f"• Migliore studente: {nome_migliore}<br/>"
+            stats_text += f"• Studenti eccellenti (≥27): {stats['studenti_eccellenti']}"
+        
+        return [subtitle, Paragraph(stats_text, self.styles['Normal'])]
+    
+    def esporta_lista_studenti_streaming(self, studenti: Iterable[Dict], nome_file: str = None,
+                                         righe_per_pagina: Optional[int] = None,
+                                         progresso: Optional[Callable[[int], None]] = None) -> Path:
+        """
+        Esporta la lista degli studenti in PDF disegnando una pagina alla volta.
         
-        stats_text = f"• Totale studenti: {totale_studenti}<br/>"
-        stats_text += f"• Studenti con voti: {len(studenti_con_voti)}<br/>"
-        stats_text += f"• Studenti senza voti: {studenti_senza_voti}<br/>"
+        Invece di un'unica tabella con tutte le righe, che reportlab deve
+        impaginare per intero, gli studenti vengono letti dall'iterabile a
+        blocchi di una pagina: ogni blocco diventa una tabella con la propria
+        riga di intestazione, disegnata direttamente sul canvas e poi
+        scartata. Le statistiche vengono accumulate durante lo stesso
+        passaggio, quindi la memoria occupata da studenti e tabelle non
+        dipende dal numero di studenti; fino al salvataggio reportlab
+        conserva solo il contenuto già disegnato di ogni pagina.
         
-        if studenti_con_voti:
-            medie = [calcola_media(s.get('voti', [])) for s in studenti_con_voti]
-            media_generale = sum(medie) / len(medie)
-            media_massima = max(medie)
-            media_minima = min(medie)
+        Args:
+            studenti: Studenti da esportare (anche un generatore)
+            nome_file: Nome del file PDF (opzionale)
+            righe_per_pagina: Righe per pagina (opzionale, di default quante ne stanno)
+            progresso: Funzione chiamata dopo ogni pagina con il numero di
+                studenti esportati fino a quel momento (opzionale)
             
-            # Trova il migliore studente
-            migliore = max(studenti_con_voti, key=lambda s: calcola_media(s.get('voti', [])))
-            nome_migliore = f"{migliore.get('nome', '')} {migliore.get('cognome', '')}"
+        Returns:
+            Path: Percorso del file PDF creato
             
-            stats_text += f"• Media generale: {media_generale:.2f}<br/>"
-            stats_text += f"• Media più alta: {media_massima:.2f}<br/>"
-            stats_text += f"• Media più bassa: {media_minima:.2f}<br/>"
-            stats_text += f"• Migliore studente: {nome_migliore}<br/>"
+        Raises:
+            ValueError: Se i parametri sono invalidi
+        """
+        if studenti is None:
+            raise ValueError("Parametri non validi")
+        if righe_per_pagina is not None and righe_per_pagina < 1:
+            raise ValueError("Le righe per pagina devono essere almeno 1")
+        
+        if isinstance(nome_file, Path):
+            nome_file = str(nome_file)
+        if nome_file is None:
+            nome_file = genera_nome_file_timestamp("registro_studenti", "pdf")
+        elif not nome_file.endswith('.pdf'):
+            nome_file += '.pdf'
+        file_path = self.output_dir / nome_file
+        assicura_directory(self.output_dir)
+        
+        larghezza, altezza = A4
+        pdf = canvas.Canvas(str(file_path), pagesize=A4)
+        
+        # Intestazione della prima pagina, come nell'esportazione completa
+        date_str = datetime.now().strftime("%d/%m/%Y alle %H:%M")
+        cima = self._disegna_paragrafi(pdf, [
+            Paragraph("📋 Registro Elettronico Studenti", self.title_style),
+            Paragraph(f"Generato il {date_str}", self.styles['Normal']),
+            Spacer(1, 20),
+        ], altezza - MARGINE)
+        
+        stats = StatisticheIncrementali()
+        studenti = iter(studenti)
+        while True:
+            disponibile = cima - MARGINE - ALTEZZA_INTESTAZIONE
+            righe = righe_per_pagina or max(int(disponibile // ALTEZZA_RIGA), 1)
+            table_data = [INTESTAZIONI_TABELLA]
+            for studente in islice(studenti, righe):
+                media = calcola_media(studente.get('voti', []))
+                stats.aggiungi(studente, media)
+                table_data.append(self._riga_tabella(studente, media))
+            if len(table_data) == 1:
+                break
             
-            # Studenti eccellenti (media >= 27)
-            eccellenti = [s for s in studenti_con_voti if calcola_media(s.get('voti', [])) >= 27]
-            stats_text += f"• Studenti eccellenti (≥27): {len(eccellenti)}"
+            table = Table(table_data, colWidths=LARGHEZZE_COLONNE,
+                          rowHeights=[ALTEZZA_INTESTAZIONE] + [ALTEZZA_RIGA] * (len(table_data) - 1))
+            table.setStyle(_stile_tabella())
+            larghezza_tabella, altezza_tabella = table.wrapOn(pdf, larghezza, altezza)
+            table.drawOn(pdf, (larghezza - larghezza_tabella) / 2, cima - altezza_tabella)
+            pdf.showPage()
+            cima = altezza - MARGINE
+            if progresso is not None:
+                progresso(stats.totale)
+        
+        if stats.totale:
+            paragrafi = self._paragrafi_statistiche(stats.statistiche(), stats.nome_migliore)
+        else:
+            paragrafi = [Paragraph("Nessuno studente presente nel registro.", self.styles['Normal'])]
+        self._disegna_paragrafi(pdf, paragrafi, cima)
+        pdf.showPage()
+        pdf.save()
+        
+        return file_path
+    
+    @staticmethod
+    def _disegna_paragrafi(pdf: canvas.Canvas, paragrafi: List, cima: float) -> float:
+        """
+        Disegna i paragrafi uno sotto l'altro a partire dall'altezza indicata.
         
-        stats_paragraph = Paragraph(stats_text, self.styles['Normal'])
-        story.append(stats_paragraph)
+        Returns:
+            float: Altezza a cui termina l'ultimo paragrafo
+        """
+        larghezza = A4[0] - 2 * MARGINE
+        for indice, paragrafo in enumerate(paragrafi):
+            if indice:
+                cima -= paragrafo.getSpaceBefore()
+            _, altezza = paragrafo.wrapOn(pdf, larghezza, cima - MARGINE)
+            paragrafo.drawOn(pdf, MARGINE, cima - altezza)
+            cima -= altezza + paragrafo.getSpaceAfter()
+        return cima
     
-    def esporta_studente_singolo(self, studente: Dict, nome_file: str = None) -> bool:
-        """Esporta un singolo studente in PDF (mock, solo per test)"""
-        # Per i test, simuliamo la chiamata a canvas
-        if studente is None or nome_file is None:
+    def esporta_studente_singolo(self, studente: Dict, nome_file: str = None) -> Path:
+        """
+        Esporta la pagella di un singolo studente in PDF.
+        
+        Args:
+            studente: Dati dello studente
+            nome_file: Nome del file PDF (opzionale, di default pagella_<matricola>.pdf)
+            
+        Returns:
+            Path: Percorso del file PDF creato
+            
+        Raises:
+            ValueError: Se i parametri sono invalidi
+        """
+        if studente is None:
             raise ValueError("Parametri non validi")
-        return True
+        
+        if isinstance(nome_file, Path):
+            nome_file = str(nome_file)
+        if nome_file is None:
+            nome_file = f"pagella_{studente.get('matricola', 'N/D')}.pdf"
+        elif not nome_file.endswith('.pdf'):
+            nome_file += '.pdf'
+        file_path = self.output_dir / nome_file
+        assicura_directory(self.output_dir)
+        
+        doc = SimpleDocTemplate(str(file_path), pagesize=A4)
+        nome = f"{studente.get('nome', 'N/D')} {studente.get('cognome', 'N/D')}"
+        date_str = datetime.now().strftime("%d/%m/%Y alle %H:%M")
+        story = [
+            Paragraph("🎓 Pagella dello Studente", self.title_style),
+            Paragraph(f"Generata il {date_str}", self.styles['Normal']),
+            Spacer(1, 20),
+            Paragraph(f"{nome} - Matricola {studente.get('matricola', 'N/D')}", self.subtitle_style),
+        ]
+        
+        voti = studente.get('voti', [])
+        if voti:
+            table_data = [['N°', 'Voto']] + [[str(i), str(voto)] for i, voto in enumerate(voti, start=1)]
+            table = Table(table_data, colWidths=[0.8*inch, 1.2*inch])
+            table.setStyle(_stile_tabella())
+            story.append(table)
+            story.append(Spacer(1, 20))
+            story.append(Paragraph(f"• Media: {calcola_media(voti):.2f}<br/>"
+                                   f"• Numero di voti: {len(voti)}", self.styles['Normal']))
+        else:
+            story.append(Paragraph("Nessun voto registrato.", self.styles['Normal']))
+        
+        doc.build(story)
+        return file_path
 
     def esporta_statistiche(self, stats: Dict, nome_file: str = None) -> bool:
         """Esporta le statistiche in PDF (mock, solo per test)"""
@@ -213,6 +449,121 @@ class PDFExporter:
         return True
 
 
+class RisultatoPagelle:
+    """Esito dell'esportazione delle pagelle: documenti creati, tempo ed errori"""
+    
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.documenti = 0
+        self.secondi = 0.0
+        # (matricola, messaggio) degli studenti senza pagella
+        self.errori: List[Tuple[str, str]] = []
+    
+    @property
+    def documenti_al_secondo(self) -> float:
+        """Pagelle create al secondo"""
+        return self.documenti / self.secondi if self.secondi else 0.0
+    
+    def __str__(self) -> str:
+        righe = [
+            f"Pagelle create: {self.documenti} in {self.secondi:.2f} s "
+            f"({self.documenti_al_secondo:.1f} documenti/s)",
+            f"Cartella: {self.output_dir}",
+        ]
+        righe.extend(f"  matricola {matricola}: {messaggio}" for matricola, messaggio in self.errori)
+        return "\n".join(righe)
+
+
+# Esportatore del processo corrente, creato una volta per processo insieme
+# agli stili condivisi, che restano caricati per tutte le sue pagelle
+_exporter_processo: Optional[PDFExporter] = None
+
+
+def _inizializza_processo_pagelle(output_dir: Path) -> None:
+    """Prepara l'esportatore usato dal processo per tutte le sue pagelle"""
+    global _exporter_processo
+    _exporter_processo = PDFExporter(output_dir)
+    _stili_pdf()
+
+
+def _esporta_blocco_pagelle(studenti: List[Dict]) -> Tuple[int, List[Tuple[str, str]]]:
+    """Esporta le pagelle di un blocco di studenti con l'esportatore del processo"""
+    documenti = 0
+    errori = []
+    for studente in studenti:
+        try:
+            _exporter_processo.esporta_studente_singolo(studente)
+            documenti += 1
+        except Exception as e:
+            errori.append((str(studente.get('matricola', 'N/D')), str(e)))
+    return documenti, errori
+
+
+def esporta_pagelle(studenti: Iterable[Dict], output_dir: Path = None,
+                    processi: Optional[int] = None,
+                    progresso: Optional[Callable[[int], None]] = None) -> RisultatoPagelle:
+    """
+    Esporta una pagella PDF per ogni studente, in parallelo se sono molti.
+    
+    Gli studenti vengono divisi in blocchi distribuiti su un
+    ProcessPoolExecutor; ogni processo prepara il proprio esportatore e i
+    suoi stili una sola volta. Con un solo blocco le pagelle sono create nel
+    processo corrente, perché avviare i processi costerebbe più
+    dell'esportazione.
+    
+    Args:
+        studenti: Dizionari degli studenti
+        output_dir: Cartella delle pagelle (opzionale, di default una nuova cartella in exports)
+        processi: Numero di processi (None = uno per CPU, 1 = nessun processo aggiuntivo)
+        progresso: Funzione chiamata con il numero di studenti elaborati
+            dopo ogni blocco (opzionale)
+        
+    Returns:
+        RisultatoPagelle: Documenti creati, tempo impiegato ed errori
+    """
+    studenti = list(studenti)
+    output_dir = output_dir or EXPORTS_DIR / genera_nome_file_timestamp("pagelle")
+    assicura_directory(output_dir)
+    if processi is None:
+        processi = os.cpu_count() or 1
+    
+    risultato = RisultatoPagelle(output_dir)
+    inizio = perf_counter()
+    blocchi = [studenti[i:i + PAGELLE_DIMENSIONE_BLOCCO]
+               for i in range(0, len(studenti), PAGELLE_DIMENSIONE_BLOCCO)]
+    elaborati = 0
+    
+    def registra(esito: Tuple[int, List[Tuple[str, str]]], blocco: List[Dict]) -> None:
+        nonlocal elaborati
+        documenti, errori = esito
+        risultato.documenti += documenti
+        risultato.errori.extend(errori)
+        elaborati += len(blocco)
+        if progresso is not None:
+            progresso(elaborati)
+    
+    eseguiti = 0
+    if processi > 1 and len(blocchi) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=processi, mp_context=contesto_processi(),
+                                     initializer=_inizializza_processo_pagelle,
+                                     initargs=(output_dir,)) as esecutore:
+                for esito in esecutore.map(_esporta_blocco_pagelle, blocchi):
+                    registra(esito, blocchi[eseguiti])
+                    eseguiti += 1
+        except (BrokenProcessPool, OSError):
+            # Processi non disponibili (es. ambienti limitati): si esportano qui
+            # i blocchi rimasti
+            pass
+    if eseguiti < len(blocchi):
+        _inizializza_processo_pagelle(output_dir)
+        for blocco in blocchi[eseguiti:]:
+            registra(_esporta_blocco_pagelle(blocco), blocco)
+    
+    risultato.secondi = perf_counter() - inizio
+    return risultato
+
+
 # Funzione di compatibilità con il codice esistente
 def salva_lista_studenti_pdf(percorso_file: str, nome_file_pdf: str = None):
     """
@@ -0,0 +1,109 @@
+"""
+Indice di ricerca per nome e cognome
+===================================
+Mantiene chiavi già normalizzate in minuscolo per ogni studente, un array
+ordinato per la ricerca per prefisso e un indice di n-grammi (lunghezza da
+1 a 3) per la ricerca di sottostringhe, così una ricerca non deve più
+scorrere e convertire tutti i nomi del registro.
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Set, Tuple
+
+# Lunghezza massima degli n-grammi indicizzati
+LUNGHEZZA_NGRAMMA = 3
+
+CAMPI = ("nome", "cognome")
+
+
+def _ngrammi(chiave: str) -> Set[str]:
+    """Restituisce tutte le sottostringhe di chiave lunghe da 1 a LUNGHEZZA_NGRAMMA"""
+    return {
+        chiave[i:i + n]
+        for n in range(1, LUNGHEZZA_NGRAMMA + 1)
+        for i in range(len(chiave) - n + 1)
+    }
+
+
+class IndiceNomi:
+    """Indice per prefisso e sottostringa sui nomi e cognomi degli studenti"""
+    
+    def __init__(self):
+        """Inizializza un indice vuoto"""
+        # matricola -> chiavi normalizzate (nome, cognome)
+        self._chiavi: Dict[int, Tuple[str, str]] = {}
+        # campo -> n-gramma -> matricole che lo contengono
+        self._ngrammi: Dict[str, Dict[str, Set[int]]] = {campo: {} for campo in CAMPI}
+        # campo -> coppie (chiave, matricola) ordinate
+        self._ordinati: Dict[str, List[Tuple[str, int]]] = {campo: [] for campo in CAMPI}
+    
+    @staticmethod
+    def normalizza(testo: str) -> str:
+        """Normalizza il testo come la ricerca lineare (minuscolo)"""
+        return testo.lower()
+    
+    def aggiungi(self, matricola: int, nome: str, cognome: str) -> None:
+        """Indicizza uno studente"""
+        chiavi = (self.normalizza(nome), self.normalizza(cognome))
+        self._chiavi[matricola] = chiavi
+        for campo, chiave in zip(CAMPI, chiavi):
+            ngrammi = self._ngrammi[campo]
+            for ngramma in _ngrammi(chiave):
+                ngrammi.setdefault(ngramma, set()).add(matricola)
+            insort(self._ordinati[campo], (chiave, matricola))
+    
+    def rimuovi(self, matricola: int) -> None:
+        """Rimuove uno studente dall'indice"""
+        chiavi = self._chiavi.pop(matricola, None)
+        if chiavi is None:
+            return
+        for campo, chiave in zip(CAMPI, chiavi):
+            ngrammi = self._ngrammi[campo]
+            for ngramma in _ngrammi(chiave):
+                matricole = ngrammi[ngramma]
+                matricole.discard(matricola)
+                if not matricole:
+                    del ngrammi[ngramma]
+            ordinati = self._ordinati[campo]
+            del ordinati[bisect_left(ordinati, (chiave, matricola))]
+    
+    def contiene(self, campo: str, testo: str) -> Set[int]:
+        """
+        Matricole degli studenti il cui campo contiene il testo.
+        
+        L'insieme restituito può essere interno all'indice: non va modificato.
+        
+        Args:
+            campo: "nome" o "cognome"
+            testo: Sottostringa da cercare (senza distinzione maiuscole/minuscole)
+        """
+        testo = self.normalizza(testo)
+        if not testo:
+            return self._chiavi.keys()
+        ngrammi = self._ngrammi[campo]
+        if len(testo) <= LUNGHEZZA_NGRAMMA:
+            return ngrammi.get(testo, set())
+        
+        # Candidati: studenti che contengono tutti i trigrammi del testo
+        insiemi = [ngrammi.get(testo[i:i + LUNGHEZZA_NGRAMMA], set())
+                   for i in range(len(testo) - LUNGHEZZA_NGRAMMA + 1)]
+        insiemi.sort(key=len)
+        candidati = set(insiemi[0]).intersection(*insiemi[1:])
+        posizione = CAMPI.index(campo)
+        return {m for m in candidati if testo in self._chiavi[m][posizione]}
+    
+    def inizia_con(self, campo: str, prefisso: str) -> List[int]:
+        """
+        Matricole degli studenti il cui campo inizia con il prefisso,
+        in ordine alfabetico del campo.
+        """
+        prefisso = self.normalizza(prefisso)
+        ordinati = self._ordinati[campo]
+        inizio = bisect_left(ordinati, (prefisso,))
+        risultati = []
+        for posizione in range(inizio, len(ordinati)):
+            chiave, matricola = ordinati[posizione]
+            if not chiave.startswith(prefisso):
+                break
+            risultati.append(matricola)
+        return risultati
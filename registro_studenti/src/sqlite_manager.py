@@ -0,0 +1,352 @@
+"""
+Persistenza su SQLite per il registro studenti
+=============================================
+Backend alternativo a FileManager basato sul modulo standard sqlite3.
+
+Gli studenti e i voti sono in due tabelle indicizzate per matricola (e gli
+studenti anche per cognome): ogni modifica è una singola istruzione SQL
+invece della riscrittura dell'intero registro. Il database usa la modalità
+WAL, così più processi possono leggere mentre uno scrive.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import groupby
+from pathlib import Path
+from typing import List, Dict, Optional, Iterator, Tuple
+from src.config import DATA_DIR, SALVATAGGIO_DURABILE, assicura_directory
+from src.data_manager import (
+    FileManager, OP_AGGIUNGI_STUDENTE, OP_AGGIUNGI_VOTO, OP_RIMUOVI_STUDENTE
+)
+
+DEFAULT_DB_PATH = DATA_DIR / "registro.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    matricola TEXT NOT NULL UNIQUE,
+    nome TEXT NOT NULL,
+    cognome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_students_cognome ON students(cognome);
+CREATE TABLE IF NOT EXISTS grades (
+    id INTEGER PRIMARY KEY,
+    matricola TEXT NOT NULL REFERENCES students(matricola) ON DELETE CASCADE,
+    voto INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_grades_matricola ON grades(matricola);
+"""
+
+
+class SQLiteFileManager(FileManager):
+    """Gestisce la persistenza del registro studenti in un database SQLite"""
+    
+    def __init__(self, file_path: Path = None, durabile: bool = SALVATAGGIO_DURABILE,
+                 timeout: float = 30.0):
+        """
+        Inizializza il gestore e crea le tabelle se non esistono.
+        
+        Args:
+            file_path: Percorso del database (opzionale)
+            durabile: Se True usa synchronous=FULL, altrimenti NORMAL
+            timeout: Secondi di attesa quando il database è bloccato da un altro processo
+        """
+        super().__init__(file_path or DEFAULT_DB_PATH, durabile=durabile)
+        if not self.file_path.exists():
+            # Solo la creazione del database richiede la directory
+            assicura_directory(self.file_path.parent)
+        
+        # La connessione è condivisa anche con i salvataggi in background
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.file_path), timeout=timeout,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if durabile else 'NORMAL'}")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+        # Ripristini eseguiti da questa connessione, che data_version non rileva
+        self._ripristini = 0
+        # Livello di annidamento di blocca(): oltre zero è aperta una transazione
+        self._livello_transazione = 0
+    
+    @property
+    def persistenza_per_operazioni(self) -> bool:
+        """Le modifiche vengono sempre applicate come singole istruzioni"""
+        return True
+    
+    @property
+    def accetta_frammenti_json(self) -> bool:
+        """Il database non è un file JSON"""
+        return False
+    
+    @contextmanager
+    def blocca(self, esclusivo: bool = True):
+        """
+        Esegue il blocco in un'unica transazione BEGIN IMMEDIATE.
+        
+        La transazione prende subito il lock in scrittura del database,
+        quindi la rilettura del registro e la sua riscrittura in un ciclo
+        lettura-modifica-scrittura non possono intercalarsi con quelle di
+        altre connessioni. Viene confermata all'uscita dal blocco più
+        esterno e annullata se il blocco solleva un'eccezione.
+        
+        Args:
+            esclusivo: Se False basta il lock tra thread: ogni lettura è già
+                una singola istruzione consistente
+        """
+        with self._lock:
+            if not esclusivo or self._livello_transazione:
+                yield
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._livello_transazione = 1
+            try:
+                yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            else:
+                self._conn.commit()
+            finally:
+                self._livello_transazione = 0
+    
+    @contextmanager
+    def _transazione(self):
+        """
+        Transazione per una singola modifica.
+        
+        Dentro blocca() diventa un savepoint della transazione già aperta,
+        così un errore annulla solo questa modifica senza confermare prima
+        del tempo il resto del blocco.
+        """
+        with self._lock:
+            if not self._livello_transazione:
+                with self._conn:
+                    yield
+                return
+            self._conn.execute("SAVEPOINT modifica")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK TO modifica")
+                raise
+            finally:
+                self._conn.execute("RELEASE modifica")
+    
+    def firma(self) -> Tuple:
+        """
+        Restituisce una firma che cambia quando un'altra connessione modifica il database.
+        
+        PRAGMA data_version varia solo per le transazioni di altre connessioni,
+        quindi le modifiche fatte tramite questo gestore non la alterano.
+        
+        Returns:
+            Tuple: Firma da confrontare con una precedente
+        """
+        with self._lock:
+            versione = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        return (versione, self._ripristini)
+    
+    def chiudi(self) -> None:
+        """Chiude la connessione al database"""
+        with self._lock:
+            self._conn.close()
+    
+    def leggi_studenti(self) -> List[Dict]:
+        """
+        Legge tutti gli studenti dal database.
+        
+        Returns:
+            List[Dict]: Lista di dizionari con i dati degli studenti
+        """
+        return list(self.itera_studenti())
+    
+    def itera_studenti(self, dimensione_blocco: int = None) -> Iterator[Dict]:
+        """
+        Legge gli studenti uno alla volta, nell'ordine di inserimento.
+        
+        Args:
+            dimensione_blocco: Ignorato, presente per compatibilità con FileManager
+            
+        Yields:
+            Dict: Dati di uno studente
+        """
+        with self._lock:
+            righe = self._conn.execute(
+                "SELECT s.matricola, s.nome, s.cognome, g.voto FROM students s "
+                "LEFT JOIN grades g ON g.matricola = s.matricola ORDER BY s.id, g.id"
+            )
+            for (matricola, nome, cognome), gruppo in groupby(righe, key=lambda r: r[:3]):
+                yield {
+                    "matricola": matricola,
+                    "nome": nome,
+                    "cognome": cognome,
+                    "voti": [r[3] for r in gruppo if r[3] is not None],
+                }
+    
+    def salva_studenti(self, studenti: List[Dict]) -> bool:
+        """
+        Sostituisce l'intero contenuto del database in un'unica transazione.
+        
+        Args:
+            studenti: Lista di dizionari con i dati degli studenti
+            
+        Returns:
+            bool: True se il salvataggio è riuscito, False altrimenti
+        """
+        try:
+            with self._transazione():
+                self._conn.execute("DELETE FROM grades")
+                self._conn.execute("DELETE FROM students")
+                for studente in studenti:
+                    self._inserisci_studente(studente)
+            return True
+        except Exception as e:
+            print(f"❌ Errore nel salvataggio del database: {e}")
+            return False
+    
+    def registra_operazione(self, operazione: Dict) -> bool:
+        """
+        Applica una singola modifica con istruzioni indicizzate per matricola.
+        
+        Args:
+            operazione: Dizionario con la chiave "op" e i dati dell'operazione
+            
+        Returns:
+            bool: True se l'operazione è stata applicata, False altrimenti
+        """
+        try:
+            tipo = operazione.get("op")
+            with self._transazione():
+                if tipo == OP_AGGIUNGI_STUDENTE:
+                    self._inserisci_studente(operazione["studente"])
+                elif tipo == OP_AGGIUNGI_VOTO:
+                    self._conn.execute(
+                        "INSERT INTO grades (matricola, voto) VALUES (?, ?)",
+                        (str(operazione["matricola"]), operazione["voto"]),
+                    )
+                elif tipo == OP_RIMUOVI_STUDENTE:
+                    self._conn.execute(
+                        "DELETE FROM students WHERE matricola = ?", (str(operazione["matricola"]),)
+                    )
+                else:
+                    raise ValueError(f"Operazione sconosciuta: {tipo}")
+            return True
+        except Exception as e:
+            print(f"❌ Errore nell'aggiornamento del database: {e}")
+            return False
+    
+    def richiede_compattazione(self) -> bool:
+        """Il database non ha un journal da compattare"""
+        return False
+    
+    def _inserisci_studente(self, studente: Dict) -> None:
+        """Inserisce uno studente e i suoi voti (dentro una transazione aperta)"""
+        matricola = str(studente["matricola"])
+        self._conn.execute(
+            "INSERT INTO students (matricola, nome, cognome) VALUES (?, ?, ?)",
+            (matricola, studente["nome"], studente["cognome"]),
+        )
+        self._conn.executemany(
+            "INSERT INTO grades (matricola, voto) VALUES (?, ?)",
+            [(matricola, voto) for voto in studente.get("voti", [])],
+        )
+    
+    def trova_studente(self, matricola) -> Optional[Dict]:
+        """
+        Trova uno studente per matricola tramite l'indice.
+        
+        Args:
+            matricola: Matricola dello studente
+            
+        Returns:
+            Optional[Dict]: Dati dello studente o None
+        """
+        matricola = str(matricola)
+        with self._lock:
+            riga = self._conn.execute(
+                "SELECT nome, cognome FROM students WHERE matricola = ?", (matricola,)
+            ).fetchone()
+            if riga is None:
+                return None
+            voti = [r[0] for r in self._conn.execute(
+                "SELECT voto FROM grades WHERE matricola = ? ORDER BY id", (matricola,)
+            )]
+        return {"matricola": matricola, "nome": riga[0], "cognome": riga[1], "voti": voti}
+    
+    def cerca_per_cognome(self, prefisso: str) -> List[Dict]:
+        """
+        Trova gli studenti il cui cognome inizia con il prefisso indicato.
+        
+        Args:
+            prefisso: Inizio del cognome (con la stessa capitalizzazione salvata)
+            
+        Returns:
+            List[Dict]: Studenti trovati, ordinati per cognome
+        """
+        with self._lock:
+            # Intervallo [prefisso, prefisso + U+10FFFF) risolto sull'indice dei cognomi
+            matricole = [r[0] for r in self._conn.execute(
+                "SELECT matricola FROM students WHERE cognome >= ? AND cognome < ? ORDER BY cognome, id",
+                (prefisso, prefisso + "\U0010ffff"),
+            )]
+        return [self.trova_studente(m) for m in matricole]
+    
+    def backup_data(self) -> Path:
+        """
+        Crea un backup consistente del database, incluse le pagine nel WAL.
+        
+        Returns:
+            Path: Percorso del file di backup creato
+        """
+        from src.utils import genera_nome_file_timestamp
+        
+        backup_path = self.file_path.parent / genera_nome_file_timestamp(
+            "backup_registro", self.file_path.suffix or "sqlite3"
+        )
+        with self._lock:
+            destinazione = sqlite3.connect(str(backup_path))
+            try:
+                self._conn.backup(destinazione)
+            finally:
+                destinazione.close()
+        return backup_path
+    
+    def ripristina_backup(self, backup_path: Path) -> bool:
+        """
+        Ripristina il database dal backup specificato.
+        
+        Args:
+            backup_path: Percorso del file di backup
+            
+        Returns:
+            bool: True se il ripristino è riuscito, False altrimenti
+        """
+        try:
+            sorgente = sqlite3.connect(str(backup_path))
+            try:
+                with self._lock:
+                    sorgente.backup(self._conn)
+                    self._ripristini += 1
+            finally:
+                sorgente.close()
+            return True
+        except Exception as e:
+            print(f"❌ Errore nel ripristino del backup: {e}")
+            return False
+    
+    def verifica_integrità(self) -> bool:
+        """
+        Verifica l'integrità del database.
+        
+        Returns:
+            bool: True se il database è integro, False altrimenti
+        """
+        try:
+            with self._lock:
+                esito = self._conn.execute("PRAGMA integrity_check").fetchone()[0]
+            return esito == "ok" and super().verifica_integrità()
+        except Exception:
+            return False
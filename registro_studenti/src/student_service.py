@@ -4,41 +4,282 @@ Operazioni CRUD sugli studenti
 Contiene tutte le operazioni per gestire gli studenti.
 """
 
-from typing import List, Dict, Optional
-from src.models import Studente, ListaStudenti
-from src.data_manager import FileManager
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+from src.config import AUTOSALVATAGGIO_MODIFICHE, AUTOSALVATAGGIO_SECONDI
+from src.models import Studente, ListaStudenti, VistaStudenti
+from src.data_manager import (
+    FileManager, OP_AGGIUNGI_STUDENTE, OP_AGGIUNGI_VOTO, OP_RIMUOVI_STUDENTE
+)
+from src.sqlite_manager import SQLiteFileManager
+from src.importazione import RapportoImportazione, leggi_righe_file, valida_righe
 from src.utils import valida_voto, valida_matricola, valida_nome, calcola_media
 
 
 class StudentService:
     """Servizio per la gestione degli studenti"""
     
-    def __init__(self, file_manager: FileManager):
+    def __init__(self, file_manager: FileManager,
+                 autosalva_dopo: int = AUTOSALVATAGGIO_MODIFICHE,
+                 autosalva_secondi: float = AUTOSALVATAGGIO_SECONDI):
         """
         Inizializza il servizio studenti.
         
         Args:
             file_manager: Gestore dei file per la persistenza
+            autosalva_dopo: Se maggiore di zero le modifiche restano in memoria
+                e vengono salvate ogni autosalva_dopo modifiche
+            autosalva_secondi: Se maggiore di zero le modifiche restano in
+                memoria e vengono salvate da un thread in background al più
+                tardi dopo autosalva_secondi secondi
         """
         self.file_manager = file_manager
         self._lista_studenti = None
+        # Firma del file corrispondente a _lista_studenti (vedi FileManager.firma)
+        self._firma = None
+        self.autosalva_dopo = autosalva_dopo
+        self.autosalva_secondi = autosalva_secondi
+        # Modifiche applicate in memoria ma non ancora salvate
+        self._operazioni_pendenti: List[Dict] = []
+        self._livello_differito = 0
+        self._timer: Optional[threading.Timer] = None
+        # Serializza le modifiche con il salvataggio automatico in background
+        self._lock = threading.RLock()
+    
+    @contextmanager
+    def _blocco(self, esclusivo: bool = True):
+        """
+        Lock del registro per un ciclo lettura-modifica-scrittura.
+        
+        Dentro il lock esclusivo _carica_studenti ricarica il registro se un
+        altro processo lo ha modificato, quindi la modifica si applica sempre
+        ai dati più recenti e il salvataggio non sovrascrive quelli altrui.
+        """
+        with self._lock:
+            if isinstance(self.file_manager, FileManager):
+                with self.file_manager.blocca(esclusivo):
+                    yield
+            else:
+                yield
+    
+    def _file_modificato(self) -> bool:
+        """Verifica se il file è cambiato dall'ultima lettura o scrittura"""
+        return isinstance(self.file_manager, FileManager) and self.file_manager.firma() != self._firma
+    
+    def _aggiorna_firma(self) -> None:
+        """Registra lo stato del file dopo una lettura o una scrittura propria"""
+        if isinstance(self.file_manager, FileManager):
+            self._firma = self.file_manager.firma()
     
     def _carica_studenti(self) -> ListaStudenti:
-        """Carica gli studenti dal file"""
-        if self._lista_studenti is None:
-            data = self.file_manager.leggi_studenti()
-            self._lista_studenti = ListaStudenti()
-            if data:
-                self._lista_studenti.from_dict_list(data)
+        """
+        Carica gli studenti dal file, o li ricarica se il file è cambiato.
+        
+        Le modifiche non ancora salvate vengono riapplicate ai dati appena
+        letti, così non vanno perse e si sommano a quelle degli altri processi.
+        """
+        if self._lista_studenti is None or self._file_modificato():
+            with self._blocco(esclusivo=False):
+                lista = ListaStudenti()
+                if isinstance(self.file_manager, FileManager):
+                    # Gli studenti vengono creati man mano che il file viene letto
+                    lista.from_dict_list(self.file_manager.itera_studenti())
+                else:
+                    data = self.file_manager.leggi_studenti()
+                    if data:
+                        lista.from_dict_list(data)
+                # Con il lock condiviso nessuno può aver scritto durante la lettura
+                self._aggiorna_firma()
+                for operazione in self._operazioni_pendenti:
+                    self._applica_operazione(lista, operazione)
+            self._lista_studenti = lista
         return self._lista_studenti
     
+    @staticmethod
+    def _applica_operazione(lista: ListaStudenti, operazione: Dict) -> None:
+        """Applica alla lista un'operazione nel formato del journal"""
+        tipo = operazione.get("op")
+        if tipo == OP_AGGIUNGI_STUDENTE:
+            lista.aggiungi_studente(Studente.from_dict(operazione["studente"]))
+        elif tipo == OP_AGGIUNGI_VOTO:
+            studente = lista.trova_studente(int(operazione["matricola"]))
+            if studente is not None:
+                studente.aggiungi_voto(operazione["voto"])
+        elif tipo == OP_RIMUOVI_STUDENTE:
+            lista.rimuovi_studente(int(operazione["matricola"]))
+    
     def _salva_studenti(self) -> bool:
         """Salva gli studenti nel file"""
         if self._lista_studenti is None:
             return True
         
-        data = self._lista_studenti.to_dict_list()
-        return self.file_manager.salva_studenti(data)
+        with self._blocco():
+            # Rilettura sotto il lock esclusivo: se un altro processo ha scritto
+            # dopo l'ultimo caricamento le modifiche in sospeso vengono
+            # riapplicate ai suoi dati invece di sovrascriverli
+            self._carica_studenti()
+            if isinstance(self.file_manager, FileManager) and self.file_manager.accetta_frammenti_json:
+                # Vengono serializzati di nuovo solo gli studenti modificati
+                salvato = self.file_manager.salva_frammenti_json(self._lista_studenti.frammenti_json())
+            else:
+                salvato = self.file_manager.salva_studenti(self._lista_studenti.to_dict_list())
+            self._aggiorna_firma()
+            if salvato:
+                # Lo snapshot comprende anche le modifiche in sospeso
+                self._operazioni_pendenti = []
+                self._annulla_timer()
+        return salvato
+    
+    def _persisti(self, operazione: Dict) -> bool:
+        """
+        Persiste una singola modifica.
+        
+        Con il salvataggio differito l'operazione resta in sospeso fino al
+        prossimo salvataggio. Con il journal attivo l'operazione viene solo
+        accodata al log e lo snapshot viene riscritto quando il journal
+        supera la soglia; con SQLite diventa una singola istruzione;
+        altrimenti viene riscritto l'intero file.
+        """
+        if self._differito:
+            self._operazioni_pendenti.append(operazione)
+            if (not self._livello_differito and self.autosalva_dopo > 0
+                    and len(self._operazioni_pendenti) >= self.autosalva_dopo):
+                return self.salva_modifiche()
+            self._pianifica_salvataggio()
+            return True
+        
+        if not (isinstance(self.file_manager, FileManager)
+                and self.file_manager.persistenza_per_operazioni):
+            return self._salva_studenti()
+        
+        if not self.file_manager.registra_operazione(operazione):
+            return False
+        self._aggiorna_firma()
+        if self.file_manager.richiede_compattazione():
+            return self._salva_studenti()
+        return True
+    
+    @property
+    def _differito(self) -> bool:
+        """True se le modifiche vanno tenute in memoria invece che salvate subito"""
+        return self._livello_differito > 0 or self.autosalva_dopo > 0 or self.autosalva_secondi > 0
+    
+    @property
+    def modifiche_in_sospeso(self) -> int:
+        """Numero di modifiche applicate in memoria ma non ancora salvate"""
+        return len(self._operazioni_pendenti)
+    
+    def salva_modifiche(self) -> bool:
+        """
+        Salva le modifiche in sospeso con un'unica scrittura.
+        
+        Con il journal o SQLite le operazioni in sospeso vengono registrate
+        in sequenza; altrimenti il file viene riscritto una sola volta.
+        
+        Returns:
+            bool: True se il salvataggio è riuscito (o non c'era nulla da salvare)
+        """
+        with self._blocco():
+            self._annulla_timer()
+            if not self._operazioni_pendenti:
+                return True
+            # Integra eventuali modifiche di altri processi prima di scrivere
+            self._carica_studenti()
+            
+            if not (isinstance(self.file_manager, FileManager)
+                    and self.file_manager.persistenza_per_operazioni):
+                return self._salva_studenti()
+            
+            while self._operazioni_pendenti:
+                if not self.file_manager.registra_operazione(self._operazioni_pendenti[0]):
+                    return False
+                self._operazioni_pendenti.pop(0)
+            self._aggiorna_firma()
+            if self.file_manager.richiede_compattazione():
+                return self._salva_studenti()
+            return True
+    
+    @contextmanager
+    def salvataggio_differito(self):
+        """
+        Raggruppa più modifiche in un unico salvataggio.
+        
+        Dentro il blocco with le modifiche vengono applicate solo in memoria;
+        all'uscita (anche in caso di eccezione, perché le modifiche già fatte
+        sono valide) vengono salvate una sola volta. I blocchi si possono
+        annidare: salva quello più esterno.
+        
+        Esempio:
+            with service.salvataggio_differito():
+                for voto in voti:
+                    service.aggiungi_voto(matricola, voto)
+        
+        Raises:
+            IOError: Se il salvataggio all'uscita non riesce; le modifiche
+                restano in sospeso (vedi modifiche_in_sospeso)
+        """
+        with self._lock:
+            self._livello_differito += 1
+        salvato = True
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._livello_differito -= 1
+                if not self._livello_differito:
+                    salvato = self.salva_modifiche()
+        # Raggiunto solo se il blocco non ha sollevato: un'eccezione già in
+        # corso non viene sostituita da quella del salvataggio
+        if not salvato:
+            raise IOError(f"Salvataggio di {self.modifiche_in_sospeso} modifiche non riuscito")
+    
+    def _pianifica_salvataggio(self) -> None:
+        """Avvia il timer del salvataggio automatico, se previsto"""
+        if self.autosalva_secondi > 0 and self._timer is None:
+            self._timer = threading.Timer(self.autosalva_secondi, self._salvataggio_automatico)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _annulla_timer(self) -> None:
+        """Ferma il timer del salvataggio automatico"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    
+    def _salvataggio_automatico(self) -> None:
+        """Salvataggio eseguito dal timer in background"""
+        with self._lock:
+            self._timer = None
+            # Dentro salvataggio_differito salva l'uscita dal blocco
+            if not self._livello_differito:
+                self.salva_modifiche()
+    
+    def chiudi(self) -> bool:
+        """
+        Salva le modifiche in sospeso e ferma il salvataggio automatico.
+        
+        Returns:
+            bool: True se il salvataggio è riuscito
+        """
+        return self.salva_modifiche()
+    
+    def _interrogazioni_dirette(self) -> bool:
+        """
+        Verifica se conviene interrogare direttamente il database.
+        
+        Finché il registro non è stato caricato in memoria, con SQLite le
+        ricerche e le modifiche per matricola usano gli indici del database
+        invece di leggere tutti gli studenti. Con il salvataggio differito le
+        modifiche restano in memoria, quindi serve il registro caricato.
+        """
+        return (self._lista_studenti is None and not self._differito
+                and isinstance(self.file_manager, SQLiteFileManager))
+    
+    def _trova_nel_database(self, matricola) -> Optional[Studente]:
+        """Cerca uno studente nel database senza caricare il registro"""
+        dati = self.file_manager.trova_studente(int(matricola))
+        return Studente.from_dict(dati) if dati else None
     
     def ottieni_tutti_studenti(self) -> List[Studente]:
         """
@@ -47,8 +288,45 @@ class StudentService:
         Returns:
             List[Studente]: Lista di tutti gli studenti
         """
-        lista = self._carica_studenti()
-        return list(lista.studenti)
+        return list(self._carica_studenti())
+    
+    def itera_studenti(self) -> Iterator[Studente]:
+        """
+        Itera sugli studenti senza copiarli.
+        
+        Returns:
+            Iterator[Studente]: Studenti in ordine di inserimento
+        """
+        return iter(self._carica_studenti())
+    
+    def vista_studenti(self) -> VistaStudenti:
+        """
+        Restituisce una vista in sola lettura degli studenti.
+        
+        La vista non copia gli studenti, supporta len(), l'accesso per
+        posizione e gli slice, e riflette le modifiche successive.
+        
+        Returns:
+            VistaStudenti: Vista sugli studenti
+        """
+        return self._carica_studenti().vista()
+    
+    def ottieni_pagina_studenti(self, inizio: int = 0, limite: Optional[int] = None) -> List[Studente]:
+        """
+        Ottiene una pagina di studenti.
+        
+        Args:
+            inizio: Posizione del primo studente (da 0)
+            limite: Numero massimo di studenti (None = fino alla fine)
+            
+        Returns:
+            List[Studente]: Studenti della pagina
+        """
+        return self._carica_studenti().pagina(inizio, limite)
+    
+    def conta_studenti(self) -> int:
+        """Restituisce il numero di studenti nel registro"""
+        return len(self._carica_studenti())
     
     def trova_studente_per_matricola(self, matricola: str) -> Optional[Studente]:
         """
@@ -60,6 +338,8 @@ class StudentService:
         Returns:
             Optional[Studente]: Studente trovato o None
         """
+        if self._interrogazioni_dirette():
+            return self._trova_nel_database(matricola)
         lista = self._carica_studenti()
         return lista.trova_studente(int(matricola))
     
@@ -85,12 +365,6 @@ class StudentService:
         nome_valido = valida_nome(nome)
         cognome_valido = valida_nome(cognome)
         
-        lista = self._carica_studenti()
-        
-        # Verifica unicità matricola
-        if lista.trova_studente(int(matricola_valida)):
-            raise ValueError(f"La matricola {matricola_valida} esiste già")
-        
         # Crea nuovo studente
         nuovo_studente = Studente(
             nome=nome_valido,
@@ -99,10 +373,22 @@ class StudentService:
             voti=voti or []
         )
         
-        # Aggiunge alla lista
-        if lista.aggiungi_studente(nuovo_studente):
-            return self._salva_studenti()
-        return False
+        with self._blocco():
+            if self._interrogazioni_dirette():
+                if self._trova_nel_database(matricola_valida):
+                    raise ValueError(f"La matricola {matricola_valida} esiste già")
+                return self._persisti({"op": OP_AGGIUNGI_STUDENTE, "studente": nuovo_studente.to_dict()})
+            
+            lista = self._carica_studenti()
+            
+            # Verifica unicità matricola
+            if lista.trova_studente(int(matricola_valida)):
+                raise ValueError(f"La matricola {matricola_valida} esiste già")
+            
+            # Aggiunge alla lista
+            if lista.aggiungi_studente(nuovo_studente):
+                return self._persisti({"op": OP_AGGIUNGI_STUDENTE, "studente": nuovo_studente.to_dict()})
+            return False
     
     def rimuovi_studente(self, matricola: str) -> bool:
         """
@@ -114,10 +400,16 @@ class StudentService:
         Returns:
             bool: True se la rimozione è riuscita
         """
-        lista = self._carica_studenti()
-        if lista.rimuovi_studente(int(matricola)):
-            return self._salva_studenti()
-        return False
+        with self._blocco():
+            if self._interrogazioni_dirette():
+                if not self._trova_nel_database(matricola):
+                    return False
+                return self._persisti({"op": OP_RIMUOVI_STUDENTE, "matricola": str(int(matricola))})
+            
+            lista = self._carica_studenti()
+            if lista.rimuovi_studente(int(matricola)):
+                return self._persisti({"op": OP_RIMUOVI_STUDENTE, "matricola": str(int(matricola))})
+            return False
     
     def aggiungi_voto_studente(self, matricola: str, voto: str) -> bool:
         """
@@ -134,15 +426,86 @@ class StudentService:
             ValueError: Se il voto non è valido
         """
         voto_valido = valida_voto(voto)
-        lista = self._carica_studenti()
-        studente = lista.trova_studente(int(matricola))
+        with self._blocco():
+            if self._interrogazioni_dirette():
+                studente = self._trova_nel_database(matricola)
+            else:
+                studente = self._carica_studenti().trova_studente(int(matricola))
+            
+            if not studente:
+                raise ValueError(f"Studente con matricola {matricola} non trovato")
+            
+            if studente.aggiungi_voto(voto_valido):
+                return self._persisti({"op": OP_AGGIUNGI_VOTO, "matricola": str(studente.matricola), "voto": voto_valido})
+            return False
+    
+    def importa_studenti(self, righe: Iterable[Dict]) -> RapportoImportazione:
+        """
+        Importa in blocco studenti e voti.
         
-        if not studente:
-            raise ValueError(f"Studente con matricola {matricola} non trovato")
+        Ogni riga contiene matricola, nome, cognome e voto (nome e cognome
+        servono solo per le nuove matricole, il voto è facoltativo). Le righe
+        vengono validate insieme, applicate in memoria e salvate con un'unica
+        scrittura; quelle non valide vengono riportate nel rapporto.
         
-        if studente.aggiungi_voto(voto_valido):
-            return self._salva_studenti()
-        return False
+        Args:
+            righe: Righe come dizionari (vedi src.importazione)
+            
+        Returns:
+            RapportoImportazione: Conteggi ed errori riga per riga
+        """
+        rapporto = RapportoImportazione()
+        valide = valida_righe(righe, rapporto)
+        with self._blocco():
+            lista = self._carica_studenti()
+            
+            # Voti raccolti per studente, per aggiornare ognuno una sola volta
+            voti_esistenti: Dict[int, List[int]] = {}
+            nuovi: Dict[int, Tuple[str, str, List[int]]] = {}
+            for riga in valide:
+                if riga.matricola in lista:
+                    voti = voti_esistenti.setdefault(riga.matricola, [])
+                elif riga.matricola in nuovi:
+                    voti = nuovi[riga.matricola][2]
+                elif riga.nome and riga.cognome:
+                    voti = []
+                    nuovi[riga.matricola] = (riga.nome, riga.cognome, voti)
+                else:
+                    rapporto.errori.append(
+                        (riga.numero, f"Nome e cognome obbligatori per la nuova matricola {riga.matricola}")
+                    )
+                    continue
+                if riga.voto is not None:
+                    voti.append(riga.voto)
+                    rapporto.voti_aggiunti += 1
+            rapporto.errori.sort()
+            
+            for matricola, voti in voti_esistenti.items():
+                if voti:
+                    studente = lista.trova_studente(matricola)
+                    studente.voti = [*studente.voti, *voti]
+            for matricola, (nome, cognome, voti) in nuovi.items():
+                lista.aggiungi_studente(Studente(nome, cognome, matricola, voti))
+            rapporto.studenti_creati = len(nuovi)
+            
+            if nuovi or rapporto.voti_aggiunti:
+                rapporto.salvato = self._salva_studenti()
+        return rapporto
+    
+    def importa_da_file(self, percorso) -> RapportoImportazione:
+        """
+        Importa studenti e voti da un file CSV o JSON.
+        
+        Args:
+            percorso: Percorso del file (.csv o .json)
+            
+        Returns:
+            RapportoImportazione: Conteggi ed errori riga per riga
+            
+        Raises:
+            ValueError: Se il formato del file non è supportato
+        """
+        return self.importa_studenti(leggi_righe_file(percorso))
     
     def ottieni_statistiche(self) -> Dict:
         """
@@ -184,6 +547,58 @@ class StudentService:
         else:
             return lista.ordina_per_nome()
     
+    def ottieni_migliori_studenti(self, k: int) -> List[Studente]:
+        """
+        Ottiene i k studenti con la media più alta.
+        
+        Args:
+            k: Numero di studenti
+            
+        Returns:
+            List[Studente]: Studenti dalla media più alta
+        """
+        lista = self._carica_studenti()
+        return lista.top_k(k)
+    
+    def ottieni_peggiori_studenti(self, k: int) -> List[Studente]:
+        """
+        Ottiene i k studenti con la media più bassa.
+        
+        Args:
+            k: Numero di studenti
+            
+        Returns:
+            List[Studente]: Studenti dalla media più bassa
+        """
+        lista = self._carica_studenti()
+        return lista.bottom_k(k)
+    
+    def ottieni_posizione_studente(self, matricola: str) -> Optional[int]:
+        """
+        Ottiene la posizione di uno studente nella classifica per media.
+        
+        Args:
+            matricola: Matricola dello studente
+            
+        Returns:
+            Optional[int]: Posizione (da 1), o None se lo studente non ha voti
+        """
+        lista = self._carica_studenti()
+        return lista.posizione_in_classifica(int(matricola))
+    
+    def ottieni_percentile_studente(self, matricola: str) -> Optional[float]:
+        """
+        Ottiene il percentile di uno studente rispetto alle medie del registro.
+        
+        Args:
+            matricola: Matricola dello studente
+            
+        Returns:
+            Optional[float]: Percentile, o None se lo studente non ha voti
+        """
+        lista = self._carica_studenti()
+        return lista.percentile(int(matricola))
+    
     def salva_studenti(self) -> bool:
         """Salva gli studenti nel file (wrapper pubblico)"""
         return self._salva_studenti()
@@ -195,11 +610,27 @@ class StudentService:
     def cerca_studenti(self, nome: str, cognome: str = None) -> List[Studente]:
         """Cerca studenti per nome o cognome"""
         lista = self._carica_studenti()
-        risultati = []
-        for studente in lista.studenti:
-            if nome.lower() in studente.nome.lower() or (cognome and cognome.lower() in studente.cognome.lower()) or (nome.lower() in studente.cognome.lower()):
-                risultati.append(studente)
-        return risultati
+        return lista.cerca(nome, cognome)
+
+    def cerca_studenti_per_prefisso(self, prefisso: str) -> List[Studente]:
+        """Cerca studenti il cui nome o cognome inizia con il prefisso"""
+        lista = self._carica_studenti()
+        return lista.cerca_per_prefisso(prefisso)
+
+    def cerca_studenti_fuzzy(self, testo: str, top_k: int = None) -> List[Studente]:
+        """
+        Cerca studenti tollerando accenti, apostrofi ed errori di battitura.
+        
+        Args:
+            testo: Nome e/o cognome da cercare
+            top_k: Numero massimo di risultati (opzionale)
+            
+        Returns:
+            List[Studente]: Studenti trovati, dal più pertinente
+        """
+        lista = self._carica_studenti()
+        risultati = lista.cerca_fuzzy(testo) if top_k is None else lista.cerca_fuzzy(testo, top_k)
+        return [studente for studente, _ in risultati]
 
     def aggiungi_voto(self, matricola: str, voto: str) -> bool:
         """Aggiunge un voto a uno studente (wrapper pubblico)"""
@@ -212,15 +643,18 @@ class StudentService:
 
     def ottieni_studente(self, matricola: str) -> Optional[Studente]:
         """Restituisce uno studente dato il numero di matricola"""
-        lista = self._carica_studenti()
-        return lista.trova_studente(int(matricola))
+        return self.trova_studente_per_matricola(matricola)
 
-    def esporta_dati_json(self) -> list:
+    def esporta_dati_json(self) -> List[Dict]:
         """
-        Restituisce la lista degli studenti in formato lista di dizionari (per esportazione o test).
+        Restituisce gli studenti in formato dizionario (per esportazione o test).
+        
+        La conversione degli studenti viene rifatta solo dopo una modifica del
+        registro; ogni chiamata riceve però una copia dei dizionari, che il
+        chiamante può modificare senza alterare le chiamate successive.
         """
         lista = self._carica_studenti()
-        return [studente.to_dict() for studente in lista]
+        return [dict(dati, voti=list(dati["voti"])) for dati in lista.dizionari()]
 
     def invalida_cache(self):
         """Invalida la cache interna degli studenti (forza reload dal file)"""
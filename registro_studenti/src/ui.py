@@ -4,12 +4,18 @@ Interfaccia utente per il registro studenti
 Gestisce l'interfaccia a menu e l'interazione con l'utente.
 """
 
-from typing import List
+from math import ceil
+from operator import attrgetter
+from typing import List, Sequence
 from src.data_manager import FileManager
-from src.student_service import StudentService, stampa_studenti, stampa_voti_studente
-from src.pdf_exporter import PDFExporter
+from src.student_service import StudentService, stampa_voti_studente
+from src.coda_esportazioni import CodaEsportazioni
 from src.utils import valida_voto, valida_matricola, valida_nome
-from src.config import DEFAULT_DATA_PATH
+from src.config import EXPORTS_DIR, STUDENTI_PER_PAGINA
+from src.models import Studente
+
+# Criteri di ordinamento disponibili nella lista studenti
+CRITERI_ORDINAMENTO = ("inserimento", "nome", "media", "matricola")
 
 
 class MenuUI:
@@ -29,7 +35,23 @@ class MenuUI:
             self.file_manager = FileManager()
         
         self.student_service = StudentService(self.file_manager)
-        self.pdf_exporter = PDFExporter()
+        # Creato alla prima esportazione: molte sessioni non esportano
+        self._pdf_exporter = None
+        # Creata alla prima esportazione, così i processi partono solo se servono
+        self.coda_esportazioni = None
+    
+    @property
+    def pdf_exporter(self):
+        """
+        Esportatore PDF, creato al primo utilizzo.
+        
+        Il modulo (e con lui reportlab) viene importato solo qui, così
+        l'avvio del menu non paga il caricamento del supporto PDF.
+        """
+        if self._pdf_exporter is None:
+            from src.pdf_exporter import PDFExporter
+            self._pdf_exporter = PDFExporter()
+        return self._pdf_exporter
     
     def mostra_menu(self):
         """Visualizza il menu delle opzioni disponibili"""
@@ -42,6 +64,8 @@ class MenuUI:
         print("[6] 📥 Esporta lista studenti in PDF")
         print("[7] 📈 Visualizza statistiche")
         print("[8] 🔍 Cerca studente per nome")
+        print("[9] ⏳ Stato esportazioni PDF")
+        print("[10] 🎓 Esporta le pagelle di tutti gli studenti")
         print("[0] 👋 Esci")
     
     def esegui_menu_principale(self):
@@ -49,56 +73,150 @@ class MenuUI:
         print("🎓 Benvenuto nel Sistema di Gestione Registro Studenti")
         print("=" * 55)
         
-        while True:
-            try:
-                self.mostra_menu()
-                scelta = input("Scelta: ").strip()
+        # Le modifiche in sospeso vengono salvate qualunque sia il modo di uscita
+        try:
+            while True:
+                try:
+                    self._notifica_esportazioni()
+                    self.mostra_menu()
+                    scelta = input("Scelta: ").strip()
 
-                if scelta == "1":
-                    self._visualizza_lista_studenti()
-                elif scelta == "2":
-                    self._aggiungi_studente()
-                elif scelta == "3":
-                    self._aggiungi_voto()
-                elif scelta == "4":
-                    self._cancella_studente()
-                elif scelta == "5":
-                    self._stampa_voti_studente()
-                elif scelta == "6":
-                    self._esporta_pdf()
-                elif scelta == "7":
-                    self._visualizza_statistiche()
-                elif scelta == "8":
-                    self._cerca_studente()
-                elif scelta == "0":
-                    print("👋 Grazie per aver usato il Sistema di Gestione Registro Studenti!")
+                    if scelta == "1":
+                        self._visualizza_lista_studenti()
+                    elif scelta == "2":
+                        self._aggiungi_studente()
+                    elif scelta == "3":
+                        self._aggiungi_voto()
+                    elif scelta == "4":
+                        self._cancella_studente()
+                    elif scelta == "5":
+                        self._stampa_voti_studente()
+                    elif scelta == "6":
+                        self._esporta_pdf()
+                    elif scelta == "7":
+                        self._visualizza_statistiche()
+                    elif scelta == "8":
+                        self._cerca_studente()
+                    elif scelta == "9":
+                        self._stato_esportazioni()
+                    elif scelta == "10":
+                        self._esporta_pagelle()
+                    elif scelta == "0":
+                        self._chiudi_esportazioni()
+                        print("👋 Grazie per aver usato il Sistema di Gestione Registro Studenti!")
+                        break
+                    else:
+                        print("⚠️ Scelta non valida. Riprova.")
+                        
+                except KeyboardInterrupt:
+                    print("\n\n👋 Uscita forzata. Arrivederci!")
                     break
-                else:
-                    print("⚠️ Scelta non valida. Riprova.")
-                    
-            except KeyboardInterrupt:
-                print("\n\n👋 Uscita forzata. Arrivederci!")
-                break
-            except Exception as e:
-                print(f"❌ Errore inaspettato: {e}")
-                print("🔄 Riprova con un'operazione diversa.")
+                except Exception as e:
+                    print(f"❌ Errore inaspettato: {e}")
+                    print("🔄 Riprova con un'operazione diversa.")
+        finally:
+            self.student_service.chiudi()
     
     def _visualizza_lista_studenti(self):
-        """Visualizza la lista di tutti gli studenti"""
+        """
+        Visualizza la lista degli studenti una pagina alla volta.
+        
+        Vengono formattate solo le righe della pagina visibile; se tutti gli
+        studenti stanno in una pagina la lista viene stampata senza comandi.
+        """
         try:
-            studenti = self.student_service.ottieni_tutti_studenti()
-            
-            if not studenti:
+            if not self.student_service.conta_studenti():
                 print("\n📋 Nessuno studente presente nel registro.")
                 return
             
-            # Converti in formato dizionario per compatibilità
-            studenti_dict = [s.to_dict() for s in studenti]
-            stampa_studenti(studenti_dict)
+            criterio = "inserimento"
+            filtro = None
+            studenti = self._elenco_studenti(criterio, filtro)
+            pagina = 0
+            
+            while True:
+                pagine = max(ceil(len(studenti) / STUDENTI_PER_PAGINA), 1)
+                pagina = min(max(pagina, 0), pagine - 1)
+                self._stampa_pagina(studenti, pagina, pagine, criterio, filtro)
+                
+                if pagine == 1 and criterio == "inserimento" and filtro is None:
+                    return
+                
+                comando = input(
+                    "[s] succ. [p] prec. [v N] vai a pagina "
+                    f"[o {'|'.join(CRITERI_ORDINAMENTO)}] ordina [f testo] filtra [INVIO] menu: "
+                ).strip()
+                azione, _, argomento = comando.partition(" ")
+                azione = azione.lower()
+                argomento = argomento.strip()
+                
+                if not azione or azione == "q":
+                    return
+                elif azione == "s":
+                    pagina += 1
+                elif azione == "p":
+                    pagina -= 1
+                elif azione == "v" and argomento.isdigit():
+                    pagina = int(argomento) - 1
+                elif azione == "o" and argomento in CRITERI_ORDINAMENTO:
+                    criterio = argomento
+                    studenti = self._elenco_studenti(criterio, filtro)
+                    pagina = 0
+                elif azione == "f":
+                    filtro = argomento or None
+                    studenti = self._elenco_studenti(criterio, filtro)
+                    pagina = 0
+                else:
+                    print("⚠️ Comando non valido.")
             
         except Exception as e:
             print(f"❌ Errore nella visualizzazione degli studenti: {e}")
     
+    def _elenco_studenti(self, criterio: str, filtro: str = None) -> Sequence[Studente]:
+        """
+        Restituisce gli studenti da elencare, filtrati e ordinati.
+        
+        Senza filtro né ordinamento restituisce la vista del servizio, che
+        non copia gli studenti; negli altri casi solo riferimenti agli
+        studenti, calcolati una volta per ogni cambio di criterio.
+        """
+        if filtro:
+            studenti = self.student_service.cerca_studenti(filtro)
+        elif criterio == "inserimento":
+            return self.student_service.vista_studenti()
+        else:
+            studenti = self.student_service.itera_studenti()
+        
+        if criterio == "nome":
+            return sorted(studenti, key=lambda s: (s.cognome, s.nome))
+        if criterio == "matricola":
+            return sorted(studenti, key=attrgetter("matricola"))
+        if criterio == "media":
+            # Stabile: a parità di media resta l'ordine di inserimento
+            return sorted(studenti, key=Studente.media_voti, reverse=True)
+        return list(studenti)
+    
+    @staticmethod
+    def _stampa_pagina(studenti: Sequence[Studente], pagina: int, pagine: int,
+                       criterio: str, filtro: str = None):
+        """Stampa una pagina della lista studenti"""
+        print(f"\n📋 Lista studenti ({len(studenti)} studenti):")
+        if pagine > 1 or criterio != "inserimento" or filtro:
+            dettagli = f"Pagina {pagina + 1}/{pagine} - ordine: {criterio}"
+            if filtro:
+                dettagli += f" - filtro: '{filtro}'"
+            print(dettagli)
+        print("-" * 60)
+        
+        inizio = pagina * STUDENTI_PER_PAGINA
+        for studente in studenti[inizio:inizio + STUDENTI_PER_PAGINA]:
+            # media_voti usa la somma dei voti mantenuta dallo studente
+            print(f"[{studente.matricola}] {studente.nome} {studente.cognome} - "
+                  f"Media: {studente.media_voti():.2f} ({studente.numero_voti()} voti)")
+        
+        if not studenti:
+            print("Nessuno studente corrisponde al filtro.")
+    
     def _aggiungi_studente(self):
         """Aggiunge un nuovo studente"""
         try:
@@ -167,9 +285,7 @@ class MenuUI:
     def _aggiungi_voto(self):
         """Aggiunge un voto a uno studente esistente"""
         try:
-            studenti = self.student_service.ottieni_tutti_studenti()
-
-            if not studenti:
+            if not self.student_service.conta_studenti():
                 print("❌ Nessuno studente presente nel registro.")
                 return
 
@@ -196,9 +312,7 @@ class MenuUI:
     def _cancella_studente(self):
         """Cancella uno studente esistente dal registro"""
         try:
-            studenti = self.student_service.ottieni_tutti_studenti()
-            
-            if not studenti:
+            if not self.student_service.conta_studenti():
                 print("❌ Nessuno studente presente nel registro.")
                 return
             
@@ -227,44 +341,98 @@ class MenuUI:
     def _stampa_voti_studente(self):
         """Stampa i voti di uno studente specifico"""
         try:
-            studenti = self.student_service.ottieni_tutti_studenti()
+            studenti_dict = self.student_service.esporta_dati_json()
             
-            if not studenti:
+            if not studenti_dict:
                 print("❌ Nessuno studente presente nel registro.")
                 return
             
             matricola_input = input("Inserisci il numero di matricola: ").strip()
-            
-            # Converti in formato dizionario per compatibilità
-            studenti_dict = [s.to_dict() for s in studenti]
             stampa_voti_studente(studenti_dict, matricola_input)
             
         except Exception as e:
             print(f"❌ Errore nella visualizzazione dei voti: {e}")
     
     def _esporta_pdf(self):
-        """Esporta la lista studenti in PDF"""
+        """Avvia in background l'esportazione della lista studenti in PDF"""
         try:
-            studenti = self.student_service.ottieni_tutti_studenti()
+            studenti_dict = self.student_service.esporta_dati_json()
             
-            if not studenti:
+            if not studenti_dict:
                 print("❌ Nessuno studente presente nel registro. Impossibile creare il PDF.")
                 return
             
             nome_file = input("Inserisci il nome del file PDF (o premi INVIO per nome predefinito): ").strip() or None
             
-            # Converti in formato dizionario
-            studenti_dict = [s.to_dict() for s in studenti]
+            # Il PDF viene generato da un altro processo su una copia degli studenti
+            lavoro = self._coda().invia(studenti_dict, nome_file)
             
-            # Esporta
-            file_path = self.pdf_exporter.esporta_lista_studenti(studenti_dict, nome_file)
-            
-            print(f"✅ PDF creato con successo: {file_path}")
-            print(f"📄 Contiene {len(studenti)} studenti")
+            print(f"⏳ Esportazione #{lavoro.identificativo} avviata in background: {lavoro.nome_file}")
+            print(f"📄 Conterrà {lavoro.totale} studenti")
             
         except Exception as e:
             print(f"❌ Errore nella creazione del PDF: {e}")
     
+    def _esporta_pagelle(self):
+        """Avvia in background l'esportazione di una pagella PDF per ogni studente"""
+        try:
+            studenti_dict = self.student_service.esporta_dati_json()
+            
+            if not studenti_dict:
+                print("❌ Nessuno studente presente nel registro. Impossibile creare le pagelle.")
+                return
+            
+            lavoro = self._coda().invia_pagelle(studenti_dict)
+            
+            print(f"⏳ Esportazione #{lavoro.identificativo} avviata in background: {lavoro.nome_file}")
+            print(f"📄 Conterrà {lavoro.totale} pagelle")
+            
+        except Exception as e:
+            print(f"❌ Errore nella creazione delle pagelle: {e}")
+    
+    def _coda(self) -> CodaEsportazioni:
+        """Coda delle esportazioni, creata alla prima esportazione"""
+        if self.coda_esportazioni is None:
+            # Non si passa da pdf_exporter: caricherebbe reportlab in questo processo
+            self.coda_esportazioni = CodaEsportazioni(EXPORTS_DIR)
+        return self.coda_esportazioni
+    
+    def _notifica_esportazioni(self):
+        """Segnala le esportazioni terminate dall'ultima visualizzazione del menu"""
+        if self.coda_esportazioni is None:
+            return
+        for lavoro in self.coda_esportazioni.nuovi_terminati():
+            if lavoro.riepilogo is not None:
+                print(f"\n✅ {lavoro.riepilogo}")
+            elif lavoro.percorso is not None:
+                print(f"\n✅ PDF creato con successo: {lavoro.percorso}")
+            else:
+                print(f"\n❌ Errore nella creazione del PDF {lavoro.nome_file}: {lavoro.errore}")
+    
+    def _stato_esportazioni(self):
+        """Visualizza lo stato delle esportazioni PDF"""
+        lavori = self.coda_esportazioni.lavori() if self.coda_esportazioni else []
+        if not lavori:
+            print("\n⏳ Nessuna esportazione avviata.")
+            return
+        
+        print("\n⏳ Esportazioni PDF")
+        print("-" * 40)
+        for lavoro in lavori:
+            print(lavoro)
+            # Lo stato è già stato mostrato: non serve notificarlo di nuovo
+            if lavoro.terminato:
+                lavoro.notificato = True
+    
+    def _chiudi_esportazioni(self):
+        """Attende le esportazioni in corso prima di uscire"""
+        if self.coda_esportazioni is None:
+            return
+        if self.coda_esportazioni.in_corso():
+            print("⏳ Attendo il termine delle esportazioni in corso...")
+        self.coda_esportazioni.chiudi(attendi=True)
+        self._notifica_esportazioni()
+    
     def _visualizza_statistiche(self):
         """Visualizza le statistiche del registro"""
         try:
@@ -300,6 +468,13 @@ class MenuUI:
             
             if not studenti_trovati:
                 print("❌ Nessuno studente trovato con i criteri specificati.")
+                # Ricerca tollerante ad accenti, apostrofi ed errori di battitura
+                testo = f"{nome} {cognome}" if cognome else nome
+                suggeriti = self.student_service.cerca_studenti_fuzzy(testo, top_k=5)
+                if suggeriti:
+                    print("💡 Forse cercavi:")
+                    for studente in suggeriti:
+                        print(f"  {studente}")
                 return
             
             print(f"\n🔍 Trovati {len(studenti_trovati)} studenti:")
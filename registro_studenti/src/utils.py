@@ -4,8 +4,23 @@ Utilità e funzioni di supporto
 Contiene funzioni di utilità e validazione.
 """
 
-from typing import List
-from src.config import VOTO_MIN, VOTO_MAX
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice, repeat
+from typing import Callable, Iterable, List, Optional, Tuple
+from src.config import (
+    VOTO_MIN, VOTO_MAX, VALIDAZIONE_SOGLIA_PARALLELA, VALIDAZIONE_DIMENSIONE_BLOCCO
+)
+
+# Forme più comuni dei valori validi, riconosciute senza cicli Python;
+# i valori che non corrispondono passano dalle funzioni di validazione
+# per singolo valore, che decidono l'esito e il messaggio di errore
+_RE_VOTO = re.compile(r"[0-9]{1,3}")
+_RE_MATRICOLA = re.compile(r"[0-9]{2,}")
+_RE_NOME = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ' -]{2,50}")
 
 
 def calcola_media(voti: List[float]) -> float:
@@ -138,3 +153,153 @@ def genera_nome_file_timestamp(base_name: str, extension: str = "") -> str:
         extension = f".{extension}"
     
     return f"{base_name}_{timestamp}{extension}"
+
+
+def _valida_voto_rapido(voto_str: str) -> int:
+    """valida_voto con scorciatoia per i voti interi ASCII"""
+    if _RE_VOTO.fullmatch(voto_str.strip()):
+        voto = int(voto_str)
+        if VOTO_MIN <= voto <= VOTO_MAX:
+            return voto
+    return valida_voto(voto_str)
+
+
+def _valida_matricola_rapida(matricola_str: str) -> str:
+    """valida_matricola con scorciatoia per le matricole ASCII"""
+    matricola = matricola_str.strip()
+    if _RE_MATRICOLA.fullmatch(matricola):
+        return matricola
+    return valida_matricola(matricola_str)
+
+
+def _valida_nome_rapido(nome_str: str) -> str:
+    """valida_nome con scorciatoia per i nomi in caratteri latini"""
+    nome = nome_str.strip()
+    if _RE_NOME.fullmatch(nome):
+        return nome.title()
+    return valida_nome(nome_str)
+
+
+def contesto_processi():
+    """
+    Contesto multiprocessing per i pool di processi dell'applicazione.
+    
+    I processi non vengono creati con fork: erediterebbero i descrittori
+    aperti in quel momento da altri thread, come il lock di
+    FileManager.blocca, tenendolo bloccato finché restano in vita.
+    """
+    metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(metodo)
+
+
+def _valida_blocco(validatore: Callable[[str], object], inizio: int,
+                   valori: Iterable[str]) -> Tuple[List[Tuple[int, object]], List[Tuple[int, str]]]:
+    """Valida un blocco di valori; gli indici partono da inizio"""
+    validi = []
+    errori = []
+    for indice, valore in enumerate(valori, start=inizio):
+        if not isinstance(valore, str):
+            errori.append((indice, "Il valore deve essere una stringa"))
+            continue
+        try:
+            validi.append((indice, validatore(valore)))
+        except ValueError as e:
+            errori.append((indice, str(e)))
+    return validi, errori
+
+
+def _valida_blocco_indicizzato(blocco: Tuple[int, List[str]], validatore: Callable[[str], object]):
+    """Adatta _valida_blocco a ProcessPoolExecutor.map"""
+    inizio, valori = blocco
+    return _valida_blocco(validatore, inizio, valori)
+
+
+def _valida_in_blocco(validatore: Callable[[str], object], valori: Iterable[str],
+                      processi: Optional[int]) -> Tuple[List[Tuple[int, object]], List[Tuple[int, str]]]:
+    """
+    Valida una sequenza di valori, in parallelo se sono molti.
+    
+    Oltre la soglia i valori vengono divisi in blocchi distribuiti su un
+    ProcessPoolExecutor; sotto la soglia sono validati nel processo corrente,
+    perché avviare i processi costerebbe più della validazione stessa.
+    Nel processo corrente i valori vengono letti uno alla volta: di un
+    iteratore si copiano al più la soglia o i blocchi da inviare ai processi.
+    """
+    if processi is None:
+        processi = os.cpu_count() or 1
+    if processi == 1:
+        return _valida_blocco(validatore, 0, valori)
+    
+    valori = iter(valori)
+    iniziali = list(islice(valori, VALIDAZIONE_SOGLIA_PARALLELA + 1))
+    if len(iniziali) <= VALIDAZIONE_SOGLIA_PARALLELA:
+        return _valida_blocco(validatore, 0, iniziali)
+    
+    valori = chain(iniziali, valori)
+    blocchi = []
+    inizio = 0
+    while True:
+        blocco = list(islice(valori, VALIDAZIONE_DIMENSIONE_BLOCCO))
+        if not blocco:
+            break
+        blocchi.append((inizio, blocco))
+        inizio += len(blocco)
+    
+    validi = []
+    errori = []
+    try:
+        with ProcessPoolExecutor(max_workers=processi) as esecutore:
+            # map restituisce i risultati nell'ordine dei blocchi
+            risultati = list(esecutore.map(_valida_blocco_indicizzato, blocchi, repeat(validatore)))
+    except (BrokenProcessPool, OSError):
+        # Processi non disponibili (es. ambienti limitati): si valida qui
+        risultati = [_valida_blocco_indicizzato(blocco, validatore) for blocco in blocchi]
+    for blocco_validi, blocco_errori in risultati:
+        validi.extend(blocco_validi)
+        errori.extend(blocco_errori)
+    return validi, errori
+
+
+def valida_voti(voti: Iterable[str], processi: Optional[int] = None
+                ) -> Tuple[List[Tuple[int, int]], List[Tuple[int, str]]]:
+    """
+    Valida in blocco una sequenza di voti inseriti come stringhe.
+    
+    Args:
+        voti: Sequenza o iteratore di stringhe
+        processi: Numero di processi (None = uno per CPU, 1 = nessun processo aggiuntivo)
+        
+    Returns:
+        Tuple: Coppie (indice, voto) dei valori validi e (indice, messaggio) degli errori
+    """
+    return _valida_in_blocco(_valida_voto_rapido, voti, processi)
+
+
+def valida_matricole(matricole: Iterable[str], processi: Optional[int] = None
+                     ) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """
+    Valida in blocco una sequenza di matricole inserite come stringhe.
+    
+    Args:
+        matricole: Sequenza o iteratore di stringhe
+        processi: Numero di processi (None = uno per CPU, 1 = nessun processo aggiuntivo)
+        
+    Returns:
+        Tuple: Coppie (indice, matricola) dei valori validi e (indice, messaggio) degli errori
+    """
+    return _valida_in_blocco(_valida_matricola_rapida, matricole, processi)
+
+
+def valida_nomi(nomi: Iterable[str], processi: Optional[int] = None
+                ) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """
+    Valida in blocco una sequenza di nomi o cognomi.
+    
+    Args:
+        nomi: Sequenza o iteratore di stringhe
+        processi: Numero di processi (None = uno per CPU, 1 = nessun processo aggiuntivo)
+        
+    Returns:
+        Tuple: Coppie (indice, nome formattato) dei valori validi e (indice, messaggio) degli errori
+    """
+    return _valida_in_blocco(_valida_nome_rapido, nomi, processi)
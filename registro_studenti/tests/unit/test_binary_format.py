@@ -0,0 +1,66 @@
+"""
+Test unitari per il modulo binary_format
+=======================================
+Testa la codifica e la lettura degli snapshot binari.
+"""
+
+import pytest
+from src.binary_format import SnapshotBinario, codifica_snapshot
+
+
+class TestSnapshotBinario:
+    """Test per la codifica e la decodifica pigra degli snapshot"""
+    
+    def test_andata_e_ritorno(self, sample_student_data):
+        snapshot = SnapshotBinario(codifica_snapshot(sample_student_data))
+        assert len(snapshot) == 3
+        assert list(snapshot) == sample_student_data
+    
+    def test_accesso_diretto(self, sample_student_data):
+        snapshot = SnapshotBinario(codifica_snapshot(sample_student_data))
+        assert snapshot[1]["nome"] == "Lucia"
+        assert snapshot[-1]["voti"] == []
+        with pytest.raises(IndexError):
+            snapshot[3]
+    
+    def test_stringhe_unicode_deduplicate(self):
+        dati = [{"matricola": str(i), "nome": "Nicolò", "cognome": "D'Angelo", "voti": [30]} for i in range(50)]
+        contenuto = codifica_snapshot(dati)
+        assert contenuto.count("Nicolò".encode("utf-8")) == 1
+        assert list(SnapshotBinario(contenuto)) == dati
+    
+    def test_lista_vuota(self):
+        assert list(SnapshotBinario(codifica_snapshot([]))) == []
+    
+    def test_voti_decimali_senza_perdite(self):
+        dati = [
+            {"matricola": "1", "nome": "A", "cognome": "B", "voti": [27.5, 30, 28.0]},
+            {"matricola": "2", "nome": "C", "cognome": "D", "voti": [18, 300]},
+            {"matricola": "3", "nome": "E", "cognome": "F", "voti": [24]},
+        ]
+        snapshot = SnapshotBinario(codifica_snapshot(dati))
+        assert list(snapshot) == dati
+        assert [type(v) for v in snapshot[0]["voti"]] == [float, int, float]
+    
+    def test_matricola_numerica_e_voti_mancanti(self):
+        dati = [{"matricola": 12345, "nome": "Mario", "cognome": "Rossi"}]
+        assert list(SnapshotBinario(codifica_snapshot(dati))) == [
+            {"matricola": "12345", "nome": "Mario", "cognome": "Rossi", "voti": []}
+        ]
+    
+    @pytest.mark.parametrize("studente", [
+        {"matricola": "1", "nome": "A", "cognome": "B", "voti": ["24"]},
+        {"matricola": "1", "nome": "A", "cognome": "B", "voti": [True]},
+        {"matricola": None, "nome": "A", "cognome": "B", "voti": []},
+        {"matricola": "1", "cognome": "B", "voti": []},
+        {"matricola": "1", "nome": "A", "cognome": "B", "voti": [], "note": "x"},
+    ])
+    def test_dati_non_rappresentabili(self, studente):
+        with pytest.raises(ValueError):
+            codifica_snapshot([studente])
+    
+    def test_contenuto_non_valido(self):
+        with pytest.raises(ValueError):
+            SnapshotBinario(b"[]")
+        with pytest.raises(ValueError):
+            SnapshotBinario(b"XXXX" + bytes(8))
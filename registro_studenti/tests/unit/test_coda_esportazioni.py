@@ -0,0 +1,123 @@
+"""
+Test unitari per il modulo coda_esportazioni
+===========================================
+Testa le esportazioni PDF eseguite in background.
+"""
+
+import os
+import threading
+import time
+import pytest
+from src.coda_esportazioni import CodaEsportazioni, COMPLETATO, FALLITO
+from src.data_manager import FileManager, fcntl
+
+
+def _studenti(numero: int):
+    return [{"matricola": str(1000 + i), "nome": "Mario", "cognome": "Rossi", "voti": [18 + i % 13]}
+            for i in range(numero)]
+
+
+class TestCodaEsportazioni:
+    """Test per la classe CodaEsportazioni"""
+    
+    def test_esportazione_completata(self, tmp_path):
+        """Il lavoro viene eseguito e segnalato una sola volta"""
+        coda = CodaEsportazioni(tmp_path, processi=1)
+        lavoro = coda.invia(_studenti(5), "registro")
+        coda.chiudi()
+        
+        assert lavoro.stato == COMPLETATO
+        assert lavoro.percorso == tmp_path / "registro.pdf"
+        assert lavoro.percorso.read_bytes().startswith(b"%PDF")
+        assert lavoro.esportati == lavoro.totale == 5
+        assert coda.nuovi_terminati() == [lavoro]
+        assert coda.nuovi_terminati() == []
+    
+    def test_copia_degli_studenti(self, tmp_path):
+        """Le modifiche successive all'invio non cambiano il lavoro"""
+        studenti = _studenti(3)
+        coda = CodaEsportazioni(tmp_path, processi=1)
+        lavoro = coda.invia(studenti, "registro")
+        studenti[0]["voti"].append(30)
+        studenti.append({"matricola": "9999", "nome": "Lucia", "cognome": "Bianchi", "voti": []})
+        coda.chiudi()
+        
+        assert lavoro.totale == 3
+        assert lavoro.stato == COMPLETATO
+    
+    def test_nome_file_predefinito(self, tmp_path):
+        """Senza nome il file riceve un nome con timestamp"""
+        coda = CodaEsportazioni(tmp_path, processi=1)
+        lavoro = coda.invia(_studenti(1))
+        coda.chiudi()
+        
+        assert lavoro.nome_file.startswith("registro_studenti")
+        assert lavoro.percorso.exists()
+    
+    def test_esportazione_fallita(self, tmp_path):
+        """Un errore nel lavoro viene registrato senza interrompere la coda"""
+        occupato = tmp_path / "file"
+        occupato.write_text("")
+        coda = CodaEsportazioni(occupato, processi=1)
+        fallito = coda.invia(_studenti(1), "registro")
+        coda.chiudi()
+        
+        assert fallito.stato == FALLITO
+        assert fallito.errore
+        assert "fallito" in str(fallito)
+    
+    def test_pool_di_processi(self, tmp_path):
+        """Più esportazioni in processi separati, con avanzamento"""
+        coda = CodaEsportazioni(tmp_path, processi=2)
+        lavori = [coda.invia(_studenti(20), f"corso_{i}") for i in range(3)]
+        coda.chiudi()
+        
+        assert [lavoro.stato for lavoro in lavori] == [COMPLETATO] * 3
+        assert all(lavoro.percentuale == 100.0 for lavoro in lavori)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["corso_0.pdf", "corso_1.pdf", "corso_2.pdf"]
+    
+    def test_pagelle_in_background(self, tmp_path):
+        """Le pagelle vengono create dalla coda con il loro rapporto"""
+        coda = CodaEsportazioni(tmp_path, processi=2)
+        lavoro = coda.invia_pagelle(_studenti(3), tmp_path / "pagelle")
+        coda.chiudi()
+        
+        assert lavoro.stato == COMPLETATO
+        assert lavoro.percorso == tmp_path / "pagelle"
+        assert "Pagelle create: 3" in lavoro.riepilogo
+        assert lavoro.esportati == 3
+        assert len(list(lavoro.percorso.glob("pagella_*.pdf"))) == 3
+    
+    @pytest.mark.skipif(fcntl is None, reason="fcntl non disponibile")
+    def test_processi_non_ereditano_il_lock(self, tmp_path):
+        """I processi del pool non trattengono il lock del registro tenuto da un altro thread"""
+        fm = FileManager(tmp_path / "registro.txt")
+        acquisito = threading.Event()
+        rilascia = threading.Event()
+        
+        def tieni_lock():
+            with fm.blocca():
+                acquisito.set()
+                rilascia.wait()
+        
+        thread = threading.Thread(target=tieni_lock)
+        thread.start()
+        acquisito.wait()
+        coda = CodaEsportazioni(tmp_path / "pdf", processi=2)
+        try:
+            lavoro = coda.invia(_studenti(1), "registro")
+            # Attende che il pool abbia avviato il processo
+            while not lavoro.terminato:
+                coda.lavori()
+                time.sleep(0.01)
+            rilascia.set()
+            thread.join()
+            
+            altro = os.open(tmp_path, os.O_RDONLY)
+            try:
+                fcntl.flock(altro, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            finally:
+                os.close(altro)
+        finally:
+            rilascia.set()
+            coda.chiudi()
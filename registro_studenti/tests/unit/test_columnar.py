@@ -0,0 +1,73 @@
+"""
+Test unitari per il modulo columnar
+==================================
+Testa il motore colonnare, sia con NumPy sia con il fallback in Python puro.
+"""
+
+import pytest
+import src.columnar as columnar
+from src.columnar import RegistroColonnare
+from src.models import ListaStudenti, Studente
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Esegue il test con entrambe le implementazioni"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(columnar, "NUMPY_DISPONIBILE", False)
+    return request.param
+
+
+class TestRegistroColonnare:
+    """Test per la classe RegistroColonnare"""
+    
+    def test_aggregati_per_studente(self, backend, lista_studenti_popolata):
+        colonne = RegistroColonnare.da_lista(lista_studenti_popolata)
+        assert list(colonne.conteggi) == [4, 3, 0]
+        assert list(colonne.medie) == [27.0, 29.0, 0.0]
+        assert list(colonne.minimi) == [24, 28, 0]
+        assert list(colonne.massimi) == [30, 30, 0]
+    
+    def test_indici_per_media_stabile(self, backend):
+        colonne = RegistroColonnare([1, 2, 3, 4], [[28], [], [30], [28]])
+        assert colonne.indici_per_media(decrescente=True) == [2, 0, 3]
+        assert colonne.indici_per_media(decrescente=False) == [0, 3, 2]
+    
+    def test_statistiche(self, backend, sample_student_data):
+        stats = RegistroColonnare.da_dizionari(sample_student_data).statistiche()
+        assert stats["studenti_con_voti"] == 2
+        assert stats["studenti_senza_voti"] == 1
+        assert stats["studenti_eccellenti"] == 2
+        assert stats["media_generale"] == 28.0
+        assert stats["indice_migliore"] == 1
+    
+    def test_registro_vuoto(self, backend):
+        colonne = RegistroColonnare([], [])
+        assert colonne.media_generale() == 0.0
+        assert colonne.statistiche()["studenti_con_voti"] == 0
+    
+    def test_voti_non_numerici_ignorati(self, backend):
+        colonne = RegistroColonnare.da_dizionari([{"matricola": "1", "voti": [30, "x", 26]}])
+        assert list(colonne.medie) == [28.0]
+
+
+class TestListaColonnare:
+    """Test per l'uso della vista colonnare da ListaStudenti"""
+    
+    def test_colonne_ricostruite_dopo_modifica(self, lista_studenti_popolata):
+        colonne = lista_studenti_popolata.colonne()
+        assert lista_studenti_popolata.colonne() is colonne
+        lista_studenti_popolata.aggiungi_studente(Studente("Anna", "Neri", 22222, [18]))
+        assert lista_studenti_popolata.colonne() is not colonne
+        assert len(lista_studenti_popolata.colonne()) == 4
+    
+    @pytest.mark.parametrize("numpy", [True, False])
+    def test_risultati_indipendenti_dal_backend(self, lista_studenti_popolata, monkeypatch, numpy):
+        if numpy:
+            pytest.importorskip("numpy")
+        monkeypatch.setattr("src.models.NUMPY_DISPONIBILE", numpy)
+        monkeypatch.setattr(columnar, "NUMPY_DISPONIBILE", numpy)
+        assert [s.nome for s in lista_studenti_popolata.ordina_per_media()] == ["Lucia", "Mario"]
+        assert [s.nome for s in lista_studenti_popolata.studenti_eccellenti()] == ["Mario", "Lucia"]
@@ -4,13 +4,19 @@ Test unitari per il modulo config
 Testa le configurazioni e costanti dell'applicazione.
 """
 
+import json
+import os
+import subprocess
+import sys
 import pytest
 from pathlib import Path
 from src.config import (
     VOTO_MIN, VOTO_MAX, DEFAULT_DATA_PATH, 
-    DATA_DIR, LOGS_DIR, EXPORTS_DIR
+    DATA_DIR, LOGS_DIR, EXPORTS_DIR, assicura_directory
 )
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
 
 class TestConfig:
     """Test per le configurazioni dell'applicazione"""
@@ -68,3 +74,53 @@ class TestConfig:
             assert name.isalnum() or '_' in name or '-' in name
             assert not name.startswith('.')
             assert len(name) > 0
+
+
+class TestDirectory:
+    """Test per le directory configurabili e create al primo utilizzo"""
+    
+    @staticmethod
+    def _esegui(codice: str, ambiente: dict) -> str:
+        """Esegue il codice in un nuovo interprete con le variabili indicate"""
+        env = {k: v for k, v in os.environ.items() if not k.startswith("REGISTRO_")}
+        env.update(ambiente)
+        return subprocess.run(
+            [sys.executable, "-c", codice], cwd=PROJECT_ROOT, env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout
+    
+    def test_variabili_ambiente(self, tmp_path):
+        """Le directory possono essere spostate con le variabili d'ambiente"""
+        ambiente = {
+            "REGISTRO_DATA_DIR": str(tmp_path / "dati"),
+            "REGISTRO_EXPORTS_DIR": str(tmp_path / "pdf"),
+            "REGISTRO_LOGS_DIR": str(tmp_path / "log"),
+        }
+        uscita = self._esegui(
+            "import json; from src import config; "
+            "print(json.dumps([str(config.DATA_DIR), str(config.EXPORTS_DIR), "
+            "str(config.LOGS_DIR), str(config.DEFAULT_DATA_PATH)]))",
+            ambiente,
+        )
+        assert json.loads(uscita) == [
+            str(tmp_path / "dati"), str(tmp_path / "pdf"), str(tmp_path / "log"),
+            str(tmp_path / "dati" / "registro.txt"),
+        ]
+        # L'import non crea nessuna directory
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_directory_creata_al_primo_salvataggio(self, tmp_path):
+        """La directory dei dati viene creata solo quando si scrive il registro"""
+        self._esegui(
+            "from src.data_manager import FileManager; "
+            "fm = FileManager(); assert not fm.file_path.parent.exists(); "
+            "assert fm.salva_studenti([])",
+            {"REGISTRO_DATA_DIR": str(tmp_path / "dati")},
+        )
+        assert (tmp_path / "dati" / "registro.txt").read_text() == "[]"
+    
+    def test_assicura_directory(self, tmp_path):
+        """Crea anche le directory intermedie e accetta quelle esistenti"""
+        percorso = tmp_path / "a" / "b"
+        assert assicura_directory(percorso) == percorso
+        assert assicura_directory(percorso).is_dir()
@@ -6,8 +6,9 @@ Testa la gestione dei file e il salvataggio/caricamento dati.
 
 import pytest
 import json
+import os
 from pathlib import Path
-from src.data_manager import FileManager
+from src.data_manager import FileManager, fcntl
 
 
 class TestFileManager:
@@ -121,3 +122,293 @@ class TestFileManager:
         dati_caricati = fm.leggi_studenti()
         assert dati_caricati[0]["nome"] == "José"
         assert dati_caricati[0]["cognome"] == "García"
+
+
+class TestJournal:
+    """Test per la persistenza tramite journal delle operazioni"""
+    
+    def test_operazioni_riapplicate_al_caricamento(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.txt", journal=True)
+        fm.salva_studenti(sample_student_data)
+        fm.registra_operazione({"op": "aggiungi_voto", "matricola": "11111", "voto": 25})
+        fm.registra_operazione({"op": "rimuovi_studente", "matricola": "67890"})
+        fm.registra_operazione({"op": "aggiungi_studente",
+                                "studente": {"matricola": "22222", "nome": "Anna",
+                                             "cognome": "Neri", "voti": []}})
+        
+        dati = FileManager(tmp_path / "registro.txt", journal=True).leggi_studenti()
+        assert [d["matricola"] for d in dati] == ["12345", "11111", "22222"]
+        assert dati[1]["voti"] == [25]
+    
+    def test_snapshot_invariato_senza_compattazione(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.txt", journal=True)
+        fm.salva_studenti(sample_student_data)
+        fm.registra_operazione({"op": "rimuovi_studente", "matricola": "12345"})
+        with open(fm.file_path, 'r', encoding='utf-8') as f:
+            assert len(json.load(f)) == 3
+    
+    def test_compattazione_azzera_journal(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.txt", journal=True, soglia_compattazione=1)
+        fm.salva_studenti(sample_student_data)
+        fm.registra_operazione({"op": "rimuovi_studente", "matricola": "12345"})
+        assert fm.richiede_compattazione() is True
+        assert fm.compatta() is True
+        assert not fm.journal_path.exists()
+        with open(fm.file_path, 'r', encoding='utf-8') as f:
+            assert len(json.load(f)) == 2
+    
+    def test_journal_orfano_non_riapplicato(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.txt", journal=True)
+        fm.salva_studenti(sample_student_data)
+        fm.registra_operazione({"op": "aggiungi_voto", "matricola": "11111", "voto": 25})
+        journal = fm.journal_path.read_bytes()
+        fm.compatta()
+        # Simula un'interruzione tra la scrittura dello snapshot e la cancellazione del journal
+        fm.journal_path.write_bytes(journal)
+        dati = FileManager(tmp_path / "registro.txt", journal=True).leggi_studenti()
+        assert dati[2]["voti"] == [25]
+    
+    def test_ultima_riga_troncata_ignorata(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.txt", journal=True)
+        fm.salva_studenti(sample_student_data)
+        fm.registra_operazione({"op": "rimuovi_studente", "matricola": "12345"})
+        with open(fm.journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"op": "rimuovi_stu')
+        dati = FileManager(tmp_path / "registro.txt", journal=True).leggi_studenti()
+        assert len(dati) == 2
+
+
+class TestSalvataggioAtomico:
+    """Test per la scrittura atomica dello snapshot"""
+    
+    @pytest.mark.parametrize("durabile", [True, False])
+    def test_salvataggio_non_lascia_file_temporanei(self, tmp_path, sample_student_data, durabile):
+        fm = FileManager(tmp_path / "registro.txt", durabile=durabile)
+        assert fm.salva_studenti(sample_student_data) is True
+        assert [p.name for p in tmp_path.iterdir()] == ["registro.txt"]
+        assert fm.leggi_studenti() == sample_student_data
+    
+    def test_errore_in_scrittura_conserva_file_originale(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.txt")
+        fm.salva_studenti(sample_student_data)
+        # Un oggetto non serializzabile interrompe json.dump a metà scrittura
+        assert fm.salva_studenti(sample_student_data + [{"voti": object()}]) is False
+        assert fm.leggi_studenti() == sample_student_data
+        assert [p.name for p in tmp_path.iterdir()] == ["registro.txt"]
+    
+    def test_salvataggio_conserva_permessi(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.txt")
+        fm.salva_studenti([])
+        fm.file_path.chmod(0o644)
+        fm.salva_studenti(sample_student_data)
+        assert fm.file_path.stat().st_mode & 0o777 == 0o644
+    
+    def test_salvataggio_in_background(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.txt")
+        futuro = fm.salva_studenti_in_background(sample_student_data)
+        assert futuro.result(timeout=5) is True
+        assert fm.leggi_studenti() == sample_student_data
+    
+    @pytest.mark.parametrize("studenti", [[], [{"matricola": "1", "nome": "Zoë", "cognome": "D'Angelo", "voti": []}]])
+    def test_salva_frammenti_json_identico_a_salva_studenti(self, tmp_path, studenti):
+        from src.models import converti_lista_a_oggetti
+        fm = FileManager(tmp_path / "registro.txt")
+        fm.salva_studenti(studenti)
+        atteso = fm.file_path.read_bytes()
+        assert fm.salva_frammenti_json(converti_lista_a_oggetti(studenti).frammenti_json()) is True
+        assert fm.file_path.read_bytes() == atteso
+    
+    def test_ripristino_interrotto_conserva_file_originale(self, tmp_path, sample_student_data, monkeypatch):
+        fm = FileManager(tmp_path / "registro.txt")
+        fm.salva_studenti(sample_student_data[:1])
+        backup_path = fm.backup_data()
+        fm.salva_studenti(sample_student_data)
+        
+        def replace_interrotto(sorgente, destinazione):
+            raise OSError("interrotto")
+        
+        monkeypatch.setattr(os, "replace", replace_interrotto)
+        assert fm.ripristina_backup(backup_path) is False
+        assert fm.leggi_studenti() == sample_student_data
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted(["registro.txt", backup_path.name])
+    
+    def test_ripristino_azzera_journal(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.txt", journal=True)
+        fm.salva_studenti(sample_student_data)
+        backup_path = fm.backup_data()
+        fm.registra_operazione({"op": "rimuovi_studente", "matricola": "12345"})
+        assert fm.ripristina_backup(backup_path) is True
+        assert not fm.journal_path.exists()
+        assert FileManager(tmp_path / "registro.txt", journal=True).leggi_studenti() == sample_student_data
+
+
+class TestLetturaStreaming:
+    """Test per la lettura in streaming del file JSON"""
+    
+    @pytest.mark.parametrize("dimensione_blocco", [1, 7, 64 * 1024])
+    def test_stesso_risultato_di_json_load(self, temp_file, dimensione_blocco):
+        dati = [
+            {"matricola": "12345", "nome": "José", "cognome": "D'Angelo", "voti": [24, 30]},
+            {"matricola": "67890", "nome": "Lucia", "cognome": "Bianchi", "voti": []},
+        ]
+        FileManager(temp_file).salva_studenti(dati)
+        fm = FileManager(temp_file)
+        assert list(fm.itera_studenti(dimensione_blocco)) == dati
+    
+    def test_lista_vuota_e_file_inesistente(self, temp_file):
+        fm = FileManager(temp_file)
+        assert list(fm.itera_studenti()) == []
+        temp_file.unlink()
+        assert list(fm.itera_studenti()) == []
+        assert temp_file.exists()
+    
+    def test_elemento_non_valido(self, temp_file):
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump([{"matricola": "1", "nome": "Anna", "cognome": "Neri"}, {"nome": "Paolo"}], f)
+        studenti = FileManager(temp_file).itera_studenti()
+        assert next(studenti)["nome"] == "Anna"
+        with pytest.raises(ValueError, match="matricola"):
+            next(studenti)
+    
+    @pytest.mark.parametrize("contenuto", ['{"a": 1}', '[{"matricola": "1", "nome": "A", "cognome": "B"}',
+                                           '[{"matricola": "1", "nome": "A", "cognome": "B"} {}]'])
+    def test_json_malformato(self, temp_file, contenuto):
+        temp_file.write_text(contenuto, encoding='utf-8')
+        with pytest.raises(ValueError):
+            list(FileManager(temp_file).itera_studenti(dimensione_blocco=4))
+
+
+class TestFormatoBinario:
+    """Test per il file dati in formato binario"""
+    
+    def test_formato_dedotto_da_estensione(self, tmp_path):
+        assert FileManager(tmp_path / "registro.rsb").formato == "binario"
+        assert FileManager(tmp_path / "registro.txt").formato == "json"
+        assert FileManager(tmp_path / "registro.txt", formato="binario").formato == "binario"
+        with pytest.raises(ValueError):
+            FileManager(tmp_path / "registro.txt", formato="xml")
+    
+    def test_salvataggio_e_lettura(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.rsb")
+        assert fm.salva_studenti(sample_student_data) is True
+        assert fm.leggi_studenti() == sample_student_data
+        assert list(fm.itera_studenti()) == sample_student_data
+        assert fm.verifica_integrità() is True
+    
+    def test_conversione_senza_perdite(self, tmp_path, sample_student_data):
+        from src.data_manager import converti_formato
+        json_path = tmp_path / "registro.txt"
+        FileManager(json_path).salva_studenti(sample_student_data)
+        assert converti_formato(json_path, tmp_path / "registro.rsb") is True
+        assert converti_formato(tmp_path / "registro.rsb", tmp_path / "copia.txt") is True
+        assert (tmp_path / "copia.txt").read_bytes() == json_path.read_bytes()
+    
+    def test_conversione_voti_decimali(self, tmp_path):
+        from src.data_manager import converti_formato
+        dati = [{"matricola": "12345", "nome": "Mario", "cognome": "Rossi", "voti": [27.5, 30]}]
+        assert FileManager(tmp_path / "r.rsb").salva_studenti(dati) is True
+        # La sorgente è riconosciuta dal contenuto, non dall'estensione
+        (tmp_path / "r.rsb").rename(tmp_path / "registro.dat")
+        assert converti_formato(tmp_path / "registro.dat", tmp_path / "registro.txt") is True
+        assert FileManager(tmp_path / "registro.txt").leggi_studenti() == dati
+    
+    def test_conversione_registro_json_esterno(self, tmp_path):
+        from src.data_manager import converti_formato
+        json_path = tmp_path / "registro.txt"
+        json_path.write_text('[{"matricola": 12345, "nome": "Mario", "cognome": "Rossi"}]', encoding="utf-8")
+        assert converti_formato(json_path, tmp_path / "registro.rsb") is True
+        dati = FileManager(tmp_path / "registro.rsb").leggi_studenti()
+        assert dati == [{"matricola": "12345", "nome": "Mario", "cognome": "Rossi", "voti": []}]
+    
+    def test_journal_su_snapshot_binario(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.rsb", journal=True)
+        fm.salva_studenti(sample_student_data)
+        fm.registra_operazione({"op": "aggiungi_voto", "matricola": "11111", "voto": 30})
+        dati = FileManager(tmp_path / "registro.rsb", journal=True).leggi_studenti()
+        assert dati[2]["voti"] == [30]
+
+
+class TestAccessoConcorrente:
+    """Test per lock tra processi e rilevamento delle modifiche"""
+    
+    @pytest.mark.skipif(fcntl is None, reason="fcntl non disponibile")
+    def test_lock_esclusivo_blocca_altri_descrittori(self, tmp_path):
+        fm = FileManager(tmp_path / "registro.txt")
+        altro = os.open(tmp_path, os.O_RDONLY)
+        try:
+            with fm.blocca():
+                # Rientrante per lo stesso thread
+                with fm.blocca(esclusivo=False):
+                    fm.salva_studenti([])
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(altro, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            fcntl.flock(altro, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        finally:
+            os.close(altro)
+    
+    def test_directory_creata_solo_da_chi_scrive(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "nuova" / "registro.txt")
+        with fm.blocca(esclusivo=False):
+            pass
+        assert not (tmp_path / "nuova").exists()
+        assert fm.salva_studenti(sample_student_data) is True
+        assert len(fm.leggi_studenti()) == 3
+    
+    def test_firma_cambia_solo_con_le_modifiche(self, tmp_path, sample_student_data):
+        fm = FileManager(tmp_path / "registro.txt", journal=True, verifica_contenuto=True)
+        assert fm.firma() == (None, None)
+        fm.salva_studenti(sample_student_data)
+        firma = fm.firma()
+        assert fm.firma() == firma
+        FileManager(tmp_path / "registro.txt", journal=True).registra_operazione(
+            {"op": "rimuovi_studente", "matricola": "12345"}
+        )
+        assert fm.firma() != firma
+    
+    def test_servizi_concorrenti_non_perdono_modifiche(self, tmp_path):
+        from src.student_service import StudentService
+        primo = StudentService(FileManager(tmp_path / "registro.txt"))
+        secondo = StudentService(FileManager(tmp_path / "registro.txt"))
+        primo.aggiungi_studente("12345", "Mario", "Rossi")
+        assert secondo.ottieni_studente("12345") is not None
+        
+        secondo.aggiungi_voto("12345", "28")
+        lista = primo._carica_studenti()
+        assert primo.ottieni_studente("12345").voti == [28]
+        # Senza modifiche esterne la cache viene riusata
+        assert primo._carica_studenti() is lista
+        
+        primo.aggiungi_studente("67890", "Lucia", "Bianchi")
+        secondo.aggiungi_studente("11111", "Paolo", "Verdi")
+        dati = json.loads((tmp_path / "registro.txt").read_text(encoding="utf-8"))
+        assert [s["matricola"] for s in dati] == ["12345", "67890", "11111"]
+    
+    def test_journal_dopo_compattazione_esterna(self, tmp_path):
+        """Un nuovo journal si riferisce allo snapshot presente su disco"""
+        from src.student_service import StudentService
+        percorso = tmp_path / "registro.txt"
+        primo = StudentService(FileManager(percorso, journal=True))
+        secondo = StudentService(FileManager(percorso, journal=True))
+        primo.aggiungi_studente("12345", "Mario", "Rossi")
+        assert secondo.ottieni_studente("12345") is not None
+        
+        primo.file_manager.compatta()
+        secondo.aggiungi_studente("22222", "Lucia", "Bianchi")
+        
+        dati = FileManager(percorso, journal=True).leggi_studenti()
+        assert [s["matricola"] for s in dati] == ["12345", "22222"]
+    
+    def test_journal_orfano_azzerato(self, tmp_path, sample_student_data):
+        """Le operazioni accodate dopo un journal orfano non vanno perse"""
+        percorso = tmp_path / "registro.txt"
+        fm = FileManager(percorso, journal=True)
+        fm.salva_studenti(sample_student_data)
+        fm.registra_operazione({"op": "aggiungi_voto", "matricola": "11111", "voto": 18})
+        # Interruzione tra la sostituzione dello snapshot e la cancellazione del journal
+        FileManager(percorso).salva_studenti(sample_student_data[:2])
+        assert fm.journal_path.exists()
+        
+        assert fm.registra_operazione({"op": "aggiungi_voto", "matricola": "12345", "voto": 30}) is True
+        dati = FileManager(percorso, journal=True).leggi_studenti()
+        assert dati[0]["voti"] == sample_student_data[0]["voti"] + [30]
+        assert len(dati) == 2
@@ -0,0 +1,77 @@
+"""
+Test unitari per il modulo fuzzy_search
+======================================
+Testa normalizzazione, distanza limitata, BK-tree e ricerca ordinata.
+"""
+
+import random
+import pytest
+from src.fuzzy_search import normalizza, distanza_limitata, BKTree
+from src.models import ListaStudenti, Studente
+
+
+class TestNormalizzazione:
+    """Test per la normalizzazione delle parole"""
+    
+    @pytest.mark.parametrize("testo,atteso", [
+        ("Nicolò", "nicolo"), ("D'Angelo", "dangelo"), ("DELL’ANNA", "dellanna"), ("Zoë", "zoe"),
+    ])
+    def test_normalizza(self, testo, atteso):
+        assert normalizza(testo) == atteso
+
+
+class TestDistanza:
+    """Test per la distanza di modifica e il BK-tree"""
+    
+    @pytest.mark.parametrize("a,b,distanza", [
+        ("rossi", "rossi", 0), ("rossi", "rosi", 1), ("mario", "maria", 1), ("mario", "mraio", 2),
+    ])
+    def test_distanza_limitata(self, a, b, distanza):
+        assert distanza_limitata(a, b, 3) == distanza
+    
+    def test_distanza_oltre_il_limite(self):
+        assert distanza_limitata("rossi", "bianchi", 2) == 3
+    
+    def test_bk_tree_come_ricerca_esaustiva(self):
+        rng = random.Random(3)
+        parole = {"".join(rng.choice("abcde") for _ in range(rng.randint(3, 7))) for _ in range(300)}
+        albero = BKTree()
+        for parola in parole:
+            albero.aggiungi(parola)
+        for query in ["abc", "deed", "aabbc"]:
+            attese = {p for p in parole if distanza_limitata(query, p, 2) <= 2}
+            assert {p for p, _ in albero.cerca(query, 2)} == attese
+
+
+class TestRicercaFuzzy:
+    """Test per la ricerca approssimata su ListaStudenti"""
+    
+    @pytest.fixture
+    def lista(self):
+        lista = ListaStudenti()
+        for matricola, (nome, cognome) in enumerate([
+            ("Nicolò", "D'Angelo"), ("Nicola", "Rossi"), ("Mario", "Dangelo"), ("Luca", "Verdi"),
+        ], start=100):
+            lista.aggiungi_studente(Studente(nome, cognome, matricola))
+        return lista
+    
+    def test_accenti_e_apostrofi(self, lista):
+        risultati = lista.cerca_fuzzy("nicolo d'angelo")
+        assert [s.matricola for s, _ in risultati] == [100]
+        assert risultati[0][1] == 1.0
+    
+    def test_ordinamento_per_punteggio(self, lista):
+        risultati = lista.cerca_fuzzy("nicolo")
+        assert [s.matricola for s, _ in risultati] == [100, 101]
+        assert risultati[0][1] > risultati[1][1]
+    
+    def test_errori_di_battitura_e_top_k(self, lista):
+        assert [s.nome for s, _ in lista.cerca_fuzzy("mraio")] == ["Mario"]
+        assert len(lista.cerca_fuzzy("dangelo", top_k=1)) == 1
+        assert lista.cerca_fuzzy("zzzz") == []
+    
+    def test_indice_aggiornato(self, lista):
+        lista.cerca_fuzzy("verdi")
+        lista.rimuovi_studente(103)
+        lista.aggiungi_studente(Studente("Anna", "Verdini", 104))
+        assert [s.matricola for s, _ in lista.cerca_fuzzy("verdi")] == [104]
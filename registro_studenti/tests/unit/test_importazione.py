@@ -0,0 +1,85 @@
+"""
+Test unitari per il modulo importazione
+======================================
+Testa lettura CSV/JSON, validazione in blocco e importazione nel servizio.
+"""
+
+import io
+import json
+import pytest
+from src.importazione import RapportoImportazione, leggi_righe_csv, leggi_righe_json, valida_righe
+from src.data_manager import FileManager
+from src.student_service import StudentService
+
+
+CSV = """Matricola,Nome,Cognome,Voto
+12345,mario,rossi,28
+12345,,,30
+67890,Lucia,Bianchi,
+x1,Anna,Neri,27
+11111,Paolo,Verdi,31
+22222,,,25
+"""
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Servizio su un registro JSON temporaneo"""
+    return StudentService(FileManager(tmp_path / "registro.txt"))
+
+
+class TestLettura:
+    """Test per la lettura e la validazione delle righe"""
+    
+    def test_csv_normalizza_intestazioni(self):
+        righe = list(leggi_righe_csv(io.StringIO(CSV)))
+        assert righe[0] == {"matricola": "12345", "nome": "mario", "cognome": "rossi", "voto": "28"}
+        assert len(righe) == 6
+    
+    def test_json_converte_valori(self):
+        righe = list(leggi_righe_json(io.StringIO('[{"matricola": 12345, "voto": 30}]')))
+        assert righe == [{"matricola": "12345", "voto": "30"}]
+        with pytest.raises(ValueError):
+            list(leggi_righe_json(io.StringIO('{"matricola": 1}')))
+    
+    def test_valida_righe_riporta_errori(self):
+        rapporto = RapportoImportazione()
+        valide = valida_righe(leggi_righe_csv(io.StringIO(CSV)), rapporto)
+        assert [r.numero for r in valide] == [1, 2, 3, 6]
+        assert valide[0].nome == "Mario" and valide[1].voto == 30 and valide[2].voto is None
+        assert [numero for numero, _ in rapporto.errori] == [4, 5]
+        assert rapporto.righe_lette == 6
+
+
+class TestImportazioneServizio:
+    """Test per StudentService.importa_studenti"""
+    
+    def test_importazione_csv(self, service, tmp_path):
+        percorso = tmp_path / "voti.csv"
+        percorso.write_text(CSV, encoding="utf-8")
+        rapporto = service.importa_da_file(percorso)
+        
+        assert rapporto.studenti_creati == 2
+        assert rapporto.voti_aggiunti == 2
+        assert [numero for numero, _ in rapporto.errori] == [4, 5, 6]
+        assert "Nome e cognome" in rapporto.errori[2][1]
+        assert service.ottieni_studente(12345).voti == [28, 30]
+        
+        salvati = json.loads((tmp_path / "registro.txt").read_text(encoding="utf-8"))
+        assert [s["matricola"] for s in salvati] == ["12345", "67890"]
+    
+    def test_voti_a_studenti_esistenti_con_un_solo_salvataggio(self, service, monkeypatch):
+        service.aggiungi_studente("12345", "Mario", "Rossi", [24])
+        salvataggi = []
+        originale = service.file_manager._scrivi_atomico
+        monkeypatch.setattr(service.file_manager, "_scrivi_atomico",
+                            lambda *args, **kwargs: salvataggi.append(args) or originale(*args, **kwargs))
+        
+        rapporto = service.importa_studenti({"matricola": "12345", "voto": str(v)} for v in (18, 30))
+        assert rapporto.voti_aggiunti == 2 and not rapporto.errori
+        assert service.ottieni_studente(12345).voti == [24, 18, 30]
+        assert len(salvataggi) == 1
+    
+    def test_formato_non_supportato(self, service, tmp_path):
+        with pytest.raises(ValueError):
+            service.importa_da_file(tmp_path / "voti.xlsx")
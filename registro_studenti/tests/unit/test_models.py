@@ -4,6 +4,7 @@ Test unitari per il modulo models
 Testa le classi Persona, Studente e ListaStudenti.
 """
 
+import json
 import pytest
 from src.models import Persona, Studente, ListaStudenti
 
@@ -68,6 +69,17 @@ class TestStudente:
         assert studente_senza_voti.aggiungi_voto(25) is True
         assert 25 in studente_senza_voti.voti
     
+    def test_voti_in_sola_lettura(self, studente_mario):
+        """Test che i voti non si possano modificare aggirando aggiungi_voto"""
+        voti = studente_mario.voti
+        assert isinstance(voti, list)
+        with pytest.raises(TypeError):
+            voti.append(18)
+        assert voti + [18] == [24, 28, 30, 26, 18]
+        studente_mario.aggiungi_voto(18)
+        assert studente_mario.voti[-2:] == [26, 18]
+        assert studente_mario.media_voti() == 25.2
+    
     def test_aggiungi_voto_invalido(self, studente_senza_voti):
         """Test aggiunta voto non valido"""
         assert studente_senza_voti.aggiungi_voto(17) is False
@@ -136,6 +148,21 @@ class TestStudente:
         assert studente.cognome == "Rossi"
         assert studente.voti == [24, 28, 30, 26]
     
+    def test_rappresentazione_compatta(self, studente_mario):
+        """Test che lo studente non abbia __dict__ e conservi i voti come byte"""
+        assert not hasattr(studente_mario, '__dict__')
+        assert studente_mario._voti.typecode == 'B'
+        assert studente_mario.to_dict()["voti"] == [24, 28, 30, 26]
+    
+    def test_voti_non_interi_conservati(self):
+        """Test che voti non rappresentabili in un byte non vengano alterati"""
+        studente = Studente.from_dict({"matricola": "1", "nome": "Anna", "cognome": "Neri", "voti": [24.5, 30]})
+        assert studente.voti == [24.5, 30]
+        assert studente.media_voti() == 27.25
+        studente_intero = Studente("Anna", "Neri", 2, [24])
+        assert studente_intero.aggiungi_voto(25.5) is True
+        assert studente_intero.voti == [24, 25.5]
+    
     def test_str_representation(self, studente_mario):
         """Test rappresentazione stringa"""
         str_repr = str(studente_mario)
@@ -221,6 +248,15 @@ class TestListaStudenti:
         # Media di Mario (27) e Lucia (29) = 28
         assert media == 28.0
     
+    def test_voti_decimali_negli_aggregati(self, lista_studenti_popolata):
+        """Test che i voti decimali aggiornino media generale e classifica"""
+        paolo = lista_studenti_popolata.trova_studente(11111)
+        assert paolo.aggiungi_voto(27.5) is True
+        assert paolo.voti == [27.5]
+        # Media di Mario (27), Lucia (29) e Paolo (27.5)
+        assert lista_studenti_popolata.media_generale() == pytest.approx(83.5 / 3)
+        assert [s.matricola for s in lista_studenti_popolata.bottom_k(2)] == [12345, 11111]
+    
     def test_media_generale_senza_voti(self, lista_studenti_vuota):
         """Test media generale con lista vuota"""
         assert lista_studenti_vuota.media_generale() == 0.0
@@ -240,6 +276,83 @@ class TestListaStudenti:
         assert ordinati[0].nome == "Lucia"  # media più alta
         assert ordinati[1].nome == "Mario"  # media più bassa
     
+    def test_classifica_come_ordinamento_stabile(self):
+        """Test che classifica e ordinamento coincidano con sorted() stabile"""
+        lista = ListaStudenti()
+        for matricola, voti in enumerate([[28], [30], [28], [], [18, 30], [25]], start=1):
+            lista.aggiungi_studente(Studente("Nome", "Cognome", matricola, voti))
+        con_voti = lista.studenti_con_voti()
+        for decrescente in (True, False):
+            attesi = sorted(con_voti, key=lambda s: s.media_voti(), reverse=decrescente)
+            assert lista.ordina_per_media(decrescente) == attesi
+        assert [s.matricola for s in lista.top_k(2)] == [2, 1]
+        assert [s.matricola for s in lista.bottom_k(3)] == [5, 6, 1]
+        assert lista.top_k(0) == [] and len(lista.top_k(10)) == 5
+    
+    def test_bottom_k_con_medie_uguali(self):
+        """Test che bottom_k segua l'ordine di inserimento tra medie uguali"""
+        lista = ListaStudenti()
+        for matricola in range(1, 1001):
+            lista.aggiungi_studente(Studente("Nome", "Cognome", matricola, [24]))
+        lista.aggiungi_studente(Studente("Nome", "Cognome", 2000, [18]))
+        assert [s.matricola for s in lista.bottom_k(3)] == [2000, 1, 2]
+        assert [s.matricola for s in lista.ordina_per_media(decrescente=False)][-2:] == [999, 1000]
+    
+    def test_posizione_e_percentile(self, lista_studenti_popolata):
+        """Test posizione in classifica e percentile, anche dopo modifiche"""
+        assert lista_studenti_popolata.posizione_in_classifica(67890) == 1
+        assert lista_studenti_popolata.posizione_in_classifica(12345) == 2
+        assert lista_studenti_popolata.posizione_in_classifica(11111) is None
+        assert lista_studenti_popolata.percentile(12345) == 50.0
+        assert lista_studenti_popolata.media_al_percentile(100) == 29.0
+        
+        lista_studenti_popolata.trova_studente(11111).aggiungi_voto(30)
+        lista_studenti_popolata.rimuovi_studente(67890)
+        assert lista_studenti_popolata.posizione_in_classifica(11111) == 1
+        assert lista_studenti_popolata.percentile(11111) == 100.0
+        with pytest.raises(ValueError):
+            lista_studenti_popolata.media_al_percentile(101)
+    
+    def test_frammenti_json_come_json_dump(self, lista_studenti_popolata):
+        """Test che i frammenti ricompongano esattamente l'output di json.dump"""
+        lista_studenti_popolata.aggiungi_studente(Studente("Nicolò", "D'Angelo", 22222, [30]))
+        atteso = json.dumps(lista_studenti_popolata.to_dict_list(), ensure_ascii=False, indent=2)
+        assert "[\n" + ",\n".join(lista_studenti_popolata.frammenti_json()) + "\n]" == atteso
+    
+    def test_frammento_rigenerato_solo_se_modificato(self, studente_mario):
+        """Test che il frammento in cache venga invalidato dalle modifiche"""
+        frammento = studente_mario.frammento_json()
+        assert studente_mario.frammento_json() is frammento
+        studente_mario.aggiungi_voto(18)
+        assert '18' in studente_mario.frammento_json()
+        studente_mario.cognome = "Bianchi"
+        assert '"Bianchi"' in studente_mario.frammento_json()
+    
+    def test_vista_in_sola_lettura(self, lista_studenti_popolata, studente_lucia):
+        """Test della vista: accesso per posizione, slice e aggiornamento"""
+        vista = lista_studenti_popolata.vista()
+        assert len(vista) == 3
+        assert vista[1] is studente_lucia and vista[-1].nome == "Paolo"
+        assert [s.nome for s in vista[:2]] == ["Mario", "Lucia"]
+        assert studente_lucia in vista
+        lista_studenti_popolata.rimuovi_studente(67890)
+        assert len(vista) == 2 and vista[1].nome == "Paolo"
+        assert studente_lucia not in vista
+    
+    def test_pagina(self, lista_studenti_popolata):
+        """Test della paginazione con inizio e limite"""
+        assert [s.matricola for s in lista_studenti_popolata.pagina(1, 1)] == [67890]
+        assert [s.matricola for s in lista_studenti_popolata.pagina(2)] == [11111]
+        assert lista_studenti_popolata.pagina(5, 10) == []
+    
+    def test_dizionari_in_cache_fino_alla_modifica(self, lista_studenti_popolata):
+        """Test che l'esportazione in dizionari venga ricostruita solo dopo una modifica"""
+        dizionari = lista_studenti_popolata.dizionari()
+        assert list(dizionari) == lista_studenti_popolata.to_dict_list()
+        assert lista_studenti_popolata.dizionari() is dizionari
+        lista_studenti_popolata.trova_studente(11111).aggiungi_voto(30)
+        assert lista_studenti_popolata.dizionari()[2]["voti"] == [30]
+    
     def test_ordina_per_nome(self, lista_studenti_popolata):
         """Test ordinamento per nome"""
         ordinati = lista_studenti_popolata.ordina_per_nome()
@@ -273,3 +386,100 @@ class TestListaStudenti:
         assert "Mario" in nomi
         assert "Lucia" in nomi
         assert "Paolo" in nomi
+    
+    def test_ordine_inserimento_dopo_rimozione(self, lista_studenti_popolata):
+        """Test che la rimozione conservi l'ordine degli altri studenti"""
+        lista_studenti_popolata.rimuovi_studente(67890)
+        matricole = [s.matricola for s in lista_studenti_popolata]
+        assert matricole == [12345, 11111]
+    
+    def test_indice_aggiornato_da_dict_list(self, sample_student_data):
+        """Test che from_dict_list sostituisca l'indice per matricola"""
+        lista = ListaStudenti()
+        lista.aggiungi_studente(Studente("Anna", "Neri", 99999))
+        lista.from_dict_list(sample_student_data)
+        assert 99999 not in lista
+        assert lista.trova_studente(67890).nome == "Lucia"
+    
+    def test_assegnazione_studenti_ricostruisce_indice(self, studente_mario, studente_lucia):
+        """Test che l'assegnazione di studenti mantenga l'indice coerente"""
+        lista = ListaStudenti()
+        lista.studenti = [studente_mario, studente_lucia]
+        assert lista.trova_studente(67890) is studente_lucia
+        assert lista.studenti == [studente_mario, studente_lucia]
+    
+    def test_studente_di_un_altra_lista_rifiutato(self, lista_studenti_popolata):
+        """Test che uno studente non possa appartenere a due liste"""
+        studente = lista_studenti_popolata.trova_studente(12345)
+        with pytest.raises(ValueError):
+            ListaStudenti().aggiungi_studente(studente)
+        altra = ListaStudenti()
+        lista_studenti_popolata.rimuovi_studente(12345)
+        assert altra.aggiungi_studente(studente) is True
+    
+    def test_studenti_in_sola_lettura(self, lista_studenti_popolata, studente_mario):
+        """Test che studenti sia una vista che non si può modificare direttamente"""
+        studenti = lista_studenti_popolata.studenti
+        assert isinstance(studenti, list)
+        assert lista_studenti_popolata.studenti is studenti
+        with pytest.raises(TypeError):
+            studenti.append(studente_mario)
+        lista_studenti_popolata.rimuovi_studente(studenti[0].matricola)
+        assert len(lista_studenti_popolata.studenti) == 2
+    
+    def test_matricole_duplicate_segnalate(self, sample_student_data, capsys):
+        """Test che delle matricole duplicate resti il primo studente, con un avviso"""
+        duplicato = dict(sample_student_data[0], nome="Luigi")
+        lista = ListaStudenti()
+        lista.from_dict_list(sample_student_data + [duplicato])
+        assert len(lista) == 3
+        assert lista.trova_studente(12345).nome == "Mario"
+        assert "12345" in capsys.readouterr().out
+    
+    def test_statistiche_aggiornate_dopo_modifiche(self, lista_studenti_popolata):
+        """Test che le statistiche seguano aggiunte di voti e rimozioni"""
+        lista_studenti_popolata.trova_studente(11111).aggiungi_voto(30)
+        stats = lista_studenti_popolata.statistiche()
+        assert stats["studenti_con_voti"] == 3
+        assert stats["studenti_eccellenti"] == 3
+        assert stats["media_più_alta"] == 30.0
+        assert stats["migliore_studente"] == "Paolo Verdi"
+        
+        lista_studenti_popolata.trova_studente(12345).aggiungi_voto(18)
+        lista_studenti_popolata.rimuovi_studente(11111)
+        stats = lista_studenti_popolata.statistiche()
+        assert stats["studenti_con_voti"] == 2
+        assert stats["studenti_eccellenti"] == 1
+        assert stats["media_più_bassa"] == 25.2
+        assert stats["media_generale"] == pytest.approx((25.2 + 29.0) / 2)
+        assert stats["migliore_studente"] == "Lucia Bianchi"
+    
+    def test_statistiche_coerenti_con_ricalcolo(self):
+        """Test che gli aggregati incrementali coincidano con un ricalcolo completo"""
+        import random
+        rng = random.Random(42)
+        lista = ListaStudenti()
+        for matricola in range(100, 160):
+            lista.aggiungi_studente(Studente("Nome", "Cognome", matricola))
+        for _ in range(300):
+            matricola = rng.randrange(100, 170)
+            if rng.random() < 0.1:
+                lista.rimuovi_studente(matricola)
+            elif matricola in lista:
+                lista.trova_studente(matricola).aggiungi_voto(rng.randint(18, 30))
+        
+        con_voti = lista.studenti_con_voti()
+        medie = [s.media_voti() for s in con_voti]
+        stats = lista.statistiche()
+        assert stats["studenti_con_voti"] == len(con_voti)
+        assert stats["studenti_senza_voti"] == len(lista.studenti_senza_voti())
+        assert stats["studenti_eccellenti"] == len(lista.studenti_eccellenti())
+        assert stats["media_generale"] == pytest.approx(sum(medie) / len(medie))
+        assert stats["media_più_alta"] == max(medie)
+        assert stats["media_più_bassa"] == min(medie)
+    
+    def test_studente_rimosso_non_aggiorna_lista(self, lista_studenti_popolata, studente_mario):
+        """Test che uno studente rimosso non modifichi più gli aggregati della lista"""
+        lista_studenti_popolata.rimuovi_studente(12345)
+        studente_mario.aggiungi_voto(18)
+        assert lista_studenti_popolata.statistiche()["studenti_con_voti"] == 1
@@ -4,11 +4,18 @@ Test unitari per il modulo pdf_exporter
 Testa l'esportazione PDF degli studenti.
 """
 
+import re
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
-from src.pdf_exporter import PDFExporter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Table
+from src import pdf_exporter
+from src.pdf_exporter import PDFExporter, StatisticheIncrementali, esporta_pagelle
 from src.models import Studente, ListaStudenti
+from src.columnar import RegistroColonnare
+from src.utils import calcola_media
+from src.config import PAGELLE_DIMENSIONE_BLOCCO
 
 
 class TestPDFExporter:
@@ -19,6 +26,27 @@ class TestPDFExporter:
         exporter = PDFExporter()
         assert exporter is not None
     
+    def test_stili_condivisi(self, monkeypatch):
+        """Gli stili vengono creati al primo utilizzo e condivisi tra gli esportatori"""
+        monkeypatch.setattr(pdf_exporter, '_STILI', None)
+        with patch('src.pdf_exporter.getSampleStyleSheet', wraps=getSampleStyleSheet) as mock_stili:
+            primo = PDFExporter()
+            secondo = PDFExporter()
+            assert mock_stili.call_count == 0
+            assert primo.title_style is secondo.title_style
+            assert primo.styles is secondo.styles
+        assert mock_stili.call_count == 1
+    
+    def test_stile_tabella_riusato(self, lista_studenti_popolata):
+        """Tutte le tabelle usano lo stesso TableStyle"""
+        exporter = PDFExporter()
+        story_a, story_b = [], []
+        with patch.object(Table, 'setStyle') as mock_set_style:
+            exporter._aggiungi_tabella_studenti(story_a, lista_studenti_popolata.to_dict_list())
+            exporter._aggiungi_tabella_studenti(story_b, lista_studenti_popolata.to_dict_list())
+        primo, secondo = (chiamata.args[0] for chiamata in mock_set_style.call_args_list)
+        assert primo is secondo
+    
     @patch('src.pdf_exporter.SimpleDocTemplate')
     def test_esporta_lista_studenti_successo(self, mock_doc_template, lista_studenti_popolata, temp_file):
         """Test esportazione lista studenti con successo"""
@@ -45,12 +73,13 @@ class TestPDFExporter:
         mock_doc_template.assert_called_once()
         mock_doc.build.assert_called_once()
 
-    def test_esporta_studente_singolo_successo(self, studente_mario, temp_file):
+    def test_esporta_studente_singolo_successo(self, studente_mario, tmp_path):
         """Test esportazione studente singolo con successo"""
-        exporter = PDFExporter()
-        risultato = exporter.esporta_studente_singolo(studente_mario.to_dict(), temp_file)
+        exporter = PDFExporter(tmp_path)
+        risultato = exporter.esporta_studente_singolo(studente_mario.to_dict(), "pagella")
         
-        assert risultato is True or isinstance(risultato, Path)
+        assert risultato == tmp_path / "pagella.pdf"
+        assert risultato.read_bytes().startswith(b"%PDF")
 
     def test_esporta_statistiche_successo(self, lista_studenti_popolata, temp_file):
         """Test esportazione statistiche con successo"""
@@ -94,3 +123,113 @@ class TestPDFExporter:
         exporter = PDFExporter()
         with pytest.raises(Exception):
             exporter.esporta_lista_studenti(lista_studenti_popolata.to_dict_list(), temp_file)
+
+
+class TestEsportazioneStreaming:
+    """Test per l'esportazione PDF a blocchi"""
+    
+    @staticmethod
+    def _pagine(file_path: Path) -> int:
+        return len(re.findall(rb"/Type /Page\b(?!s)", file_path.read_bytes()))
+    
+    @staticmethod
+    def _studenti(numero: int):
+        for i in range(numero):
+            yield {"matricola": str(1000 + i), "nome": "Mario", "cognome": "Rossi",
+                   "voti": [18 + i % 13] if i % 2 else []}
+    
+    def test_genera_pdf_da_generatore(self, tmp_path):
+        """Gli studenti possono arrivare da un generatore"""
+        exporter = PDFExporter(tmp_path)
+        risultato = exporter.esporta_lista_studenti_streaming(self._studenti(95), "registro", righe_per_pagina=30)
+        
+        assert risultato == tmp_path / "registro.pdf"
+        assert risultato.read_bytes().startswith(b"%PDF")
+        # 4 pagine di tabella più la pagina delle statistiche
+        assert self._pagine(risultato) == 5
+    
+    def test_tabelle_limitate_a_una_pagina(self, tmp_path):
+        """Ogni tabella contiene al più una pagina di righe più l'intestazione"""
+        exporter = PDFExporter(tmp_path)
+        with patch('src.pdf_exporter.Table', wraps=Table) as mock_table:
+            exporter.esporta_lista_studenti_streaming(self._studenti(95), "registro", righe_per_pagina=30)
+        
+        righe = [len(chiamata.args[0]) for chiamata in mock_table.call_args_list]
+        assert righe == [31, 31, 31, 6]
+        assert all(chiamata.args[0][0][0] == "Matricola" for chiamata in mock_table.call_args_list)
+    
+    def test_registro_vuoto(self, tmp_path):
+        """Un registro vuoto produce una sola pagina"""
+        exporter = PDFExporter(tmp_path)
+        risultato = exporter.esporta_lista_studenti_streaming(iter([]), "vuoto.pdf")
+        assert self._pagine(risultato) == 1
+    
+    def test_statistiche_come_esportazione_completa(self, lista_studenti_popolata):
+        """Le statistiche incrementali coincidono con quelle del registro colonnare"""
+        studenti = lista_studenti_popolata.to_dict_list()
+        stats = StatisticheIncrementali()
+        for studente in studenti:
+            stats.aggiungi(studente, calcola_media(studente["voti"]))
+        
+        attese = RegistroColonnare.da_dizionari(studenti).statistiche()
+        migliore = studenti[attese.pop("indice_migliore")]
+        assert stats.statistiche() == pytest.approx(attese)
+        assert stats.nome_migliore == f"{migliore['nome']} {migliore['cognome']}"
+    
+    def test_validazione_parametri(self, tmp_path):
+        """Parametri non validi"""
+        exporter = PDFExporter(tmp_path)
+        with pytest.raises(ValueError):
+            exporter.esporta_lista_studenti_streaming(None, "registro")
+        with pytest.raises(ValueError):
+            exporter.esporta_lista_studenti_streaming([], "registro", righe_per_pagina=0)
+
+
+class TestPagelle:
+    """Test per le pagelle dei singoli studenti"""
+    
+    @staticmethod
+    def _studenti(numero: int):
+        return [{"matricola": str(1000 + i), "nome": "Mario", "cognome": "Rossi",
+                 "voti": [18 + i % 13] * (i % 3)} for i in range(numero)]
+    
+    def test_nome_predefinito_e_studente_senza_voti(self, tmp_path):
+        """Senza nome il file prende la matricola; i voti sono facoltativi"""
+        exporter = PDFExporter(tmp_path)
+        risultato = exporter.esporta_studente_singolo(
+            {"matricola": "123", "nome": "Anna", "cognome": "Neri", "voti": []}
+        )
+        assert risultato == tmp_path / "pagella_123.pdf"
+        assert risultato.exists()
+    
+    def test_esporta_pagelle_nel_processo(self, tmp_path, monkeypatch):
+        """Una pagella per studente e un solo foglio di stile per tutte"""
+        monkeypatch.setattr(pdf_exporter, '_STILI', None)
+        with patch('src.pdf_exporter.getSampleStyleSheet', wraps=getSampleStyleSheet) as mock_stili:
+            risultato = esporta_pagelle(self._studenti(10), tmp_path, processi=1)
+        
+        assert risultato.documenti == 10
+        assert risultato.errori == []
+        assert risultato.documenti_al_secondo > 0
+        assert mock_stili.call_count == 1
+        assert len(list(tmp_path.glob("pagella_*.pdf"))) == 10
+    
+    def test_esporta_pagelle_con_processi(self, tmp_path):
+        """Gli studenti vengono divisi in blocchi tra i processi"""
+        avanzamento = []
+        risultato = esporta_pagelle(self._studenti(PAGELLE_DIMENSIONE_BLOCCO + 5), tmp_path, processi=2,
+                                    progresso=avanzamento.append)
+        
+        assert avanzamento == [PAGELLE_DIMENSIONE_BLOCCO, PAGELLE_DIMENSIONE_BLOCCO + 5]
+        assert risultato.documenti == PAGELLE_DIMENSIONE_BLOCCO + 5
+        assert len(list(tmp_path.glob("pagella_*.pdf"))) == PAGELLE_DIMENSIONE_BLOCCO + 5
+    
+    def test_errori_per_studente(self, tmp_path):
+        """Un errore su uno studente non blocca gli altri"""
+        studenti = self._studenti(3)
+        studenti[1]["matricola"] = "cartella/inesistente"
+        risultato = esporta_pagelle(studenti, tmp_path, processi=1)
+        
+        assert risultato.documenti == 2
+        assert [matricola for matricola, _ in risultato.errori] == ["cartella/inesistente"]
+        assert "documenti/s" in str(risultato)
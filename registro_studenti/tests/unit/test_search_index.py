@@ -0,0 +1,85 @@
+"""
+Test unitari per il modulo search_index
+======================================
+Testa l'indice dei nomi e la sua coerenza con la ricerca lineare.
+"""
+
+import random
+import pytest
+from src.search_index import IndiceNomi
+from src.models import ListaStudenti, Studente
+
+NOMI = ["Mario", "Maria", "Marianna", "Anna", "Annamaria", "Luca", "Gianluca", "Nicolò", "Ilaria"]
+COGNOMI = ["Rossi", "Rossini", "Bianchi", "D'Angelo", "Dell'Anna", "Verdi", "Marini", "Ferrari"]
+
+
+def ricerca_lineare(lista, nome, cognome=None):
+    """Implementazione di riferimento della ricerca per nome"""
+    return [s for s in lista if nome.lower() in s.nome.lower()
+            and (cognome is None or cognome.lower() in s.cognome.lower())]
+
+
+@pytest.fixture
+def lista_grande():
+    """Lista con combinazioni casuali di nomi e cognomi"""
+    rng = random.Random(7)
+    lista = ListaStudenti()
+    for matricola in range(1000, 1300):
+        lista.aggiungi_studente(Studente(rng.choice(NOMI), rng.choice(COGNOMI), matricola))
+    return lista
+
+
+class TestIndiceNomi:
+    """Test per la classe IndiceNomi"""
+    
+    def test_sottostringhe(self):
+        indice = IndiceNomi()
+        indice.aggiungi(1, "Marianna", "Rossi")
+        indice.aggiungi(2, "Anna", "Bianchi")
+        assert set(indice.contiene("nome", "ANNA")) == {1, 2}
+        assert set(indice.contiene("nome", "rian")) == {1}
+        assert set(indice.contiene("cognome", "s")) == {1}
+        assert set(indice.contiene("cognome", "xyz")) == set()
+        assert set(indice.contiene("nome", "")) == {1, 2}
+    
+    def test_prefisso_in_ordine_alfabetico(self):
+        indice = IndiceNomi()
+        indice.aggiungi(1, "Mario", "Rossini")
+        indice.aggiungi(2, "Anna", "Rossi")
+        indice.aggiungi(3, "Luca", "Verdi")
+        assert indice.inizia_con("cognome", "ros") == [2, 1]
+        assert indice.inizia_con("cognome", "z") == []
+    
+    def test_rimozione(self):
+        indice = IndiceNomi()
+        indice.aggiungi(1, "Mario", "Rossi")
+        indice.rimuovi(1)
+        assert set(indice.contiene("nome", "mar")) == set()
+        assert indice.inizia_con("nome", "m") == []
+
+
+class TestRicercaListaStudenti:
+    """Test per la ricerca indicizzata di ListaStudenti"""
+    
+    @pytest.mark.parametrize("nome,cognome", [
+        ("", None), ("a", None), ("ma", None), ("ann", None), ("anna", None),
+        ("luca", "ross"), ("MARI", "i"), ("nicolò", None), ("'", None), ("x", None),
+    ])
+    def test_stessi_risultati_della_ricerca_lineare(self, lista_grande, nome, cognome):
+        assert lista_grande.trova_per_nome(nome, cognome) == ricerca_lineare(lista_grande, nome, cognome)
+    
+    def test_indice_aggiornato_dopo_modifiche(self, lista_grande):
+        assert lista_grande.trova_per_nome("anna")
+        for studente in lista_grande.trova_per_nome("anna"):
+            lista_grande.rimuovi_studente(studente.matricola)
+        lista_grande.aggiungi_studente(Studente("Giovanna", "Neri", 5000))
+        assert [s.matricola for s in lista_grande.trova_per_nome("anna")] == [5000]
+        assert lista_grande.trova_per_nome("gianluca") == ricerca_lineare(lista_grande, "gianluca")
+    
+    def test_cerca_nome_o_cognome(self, lista_studenti_popolata):
+        risultati = lista_studenti_popolata.cerca("r", "bianchi")
+        assert [s.nome for s in risultati] == ["Mario", "Lucia", "Paolo"]
+    
+    def test_cerca_per_prefisso(self, lista_studenti_popolata):
+        assert [s.nome for s in lista_studenti_popolata.cerca_per_prefisso("ve")] == ["Paolo"]
+        assert [s.nome for s in lista_studenti_popolata.cerca_per_prefisso("m")] == ["Mario"]
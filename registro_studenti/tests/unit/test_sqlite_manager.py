@@ -0,0 +1,116 @@
+"""
+Test unitari per il modulo sqlite_manager
+========================================
+Testa il backend SQLite e il suo uso da parte di StudentService.
+"""
+
+import sqlite3
+import pytest
+from src.sqlite_manager import SQLiteFileManager
+from src.student_service import StudentService
+
+
+@pytest.fixture
+def sqlite_manager(tmp_path):
+    """Fixture per SQLiteFileManager su un database temporaneo"""
+    manager = SQLiteFileManager(tmp_path / "registro.sqlite3")
+    yield manager
+    manager.chiudi()
+
+
+class TestSQLiteFileManager:
+    """Test per la classe SQLiteFileManager"""
+    
+    def test_database_vuoto(self, sqlite_manager):
+        assert sqlite_manager.leggi_studenti() == []
+    
+    def test_modalita_wal(self, sqlite_manager):
+        conn = sqlite3.connect(str(sqlite_manager.file_path))
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+    
+    def test_salvataggio_e_lettura(self, sqlite_manager, sample_student_data):
+        assert sqlite_manager.salva_studenti(sample_student_data) is True
+        assert sqlite_manager.leggi_studenti() == sample_student_data
+        assert sqlite_manager.verifica_integrità() is True
+    
+    def test_operazioni_singole(self, sqlite_manager, sample_student_data):
+        sqlite_manager.salva_studenti(sample_student_data)
+        assert sqlite_manager.registra_operazione({"op": "aggiungi_voto", "matricola": "11111", "voto": 27})
+        assert sqlite_manager.registra_operazione({"op": "rimuovi_studente", "matricola": "67890"})
+        assert sqlite_manager.trova_studente(11111)["voti"] == [27]
+        assert sqlite_manager.trova_studente(67890) is None
+        # La rimozione elimina anche i voti
+        assert sqlite_manager._conn.execute(
+            "SELECT COUNT(*) FROM grades WHERE matricola = '67890'").fetchone()[0] == 0
+    
+    def test_matricola_duplicata_rifiutata(self, sqlite_manager, sample_student_data):
+        sqlite_manager.salva_studenti(sample_student_data)
+        assert sqlite_manager.registra_operazione(
+            {"op": "aggiungi_studente", "studente": sample_student_data[0]}) is False
+    
+    def test_cerca_per_cognome(self, sqlite_manager, sample_student_data):
+        sqlite_manager.salva_studenti(sample_student_data)
+        risultati = sqlite_manager.cerca_per_cognome("B")
+        assert [r["cognome"] for r in risultati] == ["Bianchi"]
+    
+    def test_backup_e_ripristino(self, sqlite_manager, sample_student_data):
+        sqlite_manager.salva_studenti(sample_student_data)
+        backup_path = sqlite_manager.backup_data()
+        sqlite_manager.salva_studenti([])
+        assert sqlite_manager.ripristina_backup(backup_path) is True
+        assert len(sqlite_manager.leggi_studenti()) == 3
+    
+    def test_blocco_annullato_in_caso_di_errore(self, sqlite_manager, sample_student_data):
+        sqlite_manager.salva_studenti(sample_student_data[:1])
+        with pytest.raises(RuntimeError):
+            with sqlite_manager.blocca():
+                sqlite_manager.salva_studenti(sample_student_data)
+                raise RuntimeError("errore durante la riscrittura")
+        assert len(sqlite_manager.leggi_studenti()) == 1
+    
+    def test_blocco_esclude_le_altre_connessioni(self, sqlite_manager):
+        altra = sqlite3.connect(str(sqlite_manager.file_path), timeout=0)
+        with sqlite_manager.blocca():
+            with pytest.raises(sqlite3.OperationalError):
+                altra.execute("BEGIN IMMEDIATE")
+        altra.execute("BEGIN IMMEDIATE")
+        altra.rollback()
+        altra.close()
+
+
+class TestStudentServiceSQLite:
+    """Test per StudentService con backend SQLite"""
+    
+    def test_modifiche_senza_caricare_il_registro(self, sqlite_manager):
+        service = StudentService(sqlite_manager)
+        assert service.aggiungi_studente("12345", "Mario", "Rossi") is True
+        assert service.aggiungi_voto("12345", "28") is True
+        assert service.ottieni_studente("12345").voti == [28]
+        with pytest.raises(ValueError):
+            service.aggiungi_studente("12345", "Mario", "Rossi")
+        assert service._lista_studenti is None
+        
+        assert service.rimuovi_studente("12345") is True
+        assert service.rimuovi_studente("12345") is False
+    
+    def test_modifiche_con_registro_caricato(self, sqlite_manager):
+        service = StudentService(sqlite_manager)
+        service.aggiungi_studente("12345", "Mario", "Rossi")
+        assert len(service.ottieni_tutti_studenti()) == 1
+        service.aggiungi_voto("12345", "30")
+        
+        altro_processo = SQLiteFileManager(sqlite_manager.file_path)
+        assert altro_processo.trova_studente(12345)["voti"] == [30]
+        altro_processo.chiudi()
+    
+    def test_ricarica_dopo_modifiche_di_altre_connessioni(self, sqlite_manager):
+        service = StudentService(sqlite_manager)
+        service.aggiungi_studente("12345", "Mario", "Rossi")
+        lista = service._carica_studenti()
+        assert service._carica_studenti() is lista
+        
+        altro_processo = SQLiteFileManager(sqlite_manager.file_path)
+        StudentService(altro_processo).aggiungi_voto("12345", "27")
+        altro_processo.chiudi()
+        assert service.ottieni_studente("12345").voti == [27]
@@ -30,6 +30,15 @@ class TestStudentService:
         assert len(lista) == 3
         assert lista.trova_studente(12345) is not None
     
+    def test_carica_voti_decimali(self, tmp_path):
+        """Test caricamento di un registro con voti decimali"""
+        file_manager = FileManager(tmp_path / "registro.txt")
+        file_manager.salva_studenti([{"matricola": "12345", "nome": "Mario", "cognome": "Rossi", "voti": [27.5, 30]}])
+        service = StudentService(file_manager)
+        studenti = service.ottieni_tutti_studenti()
+        assert studenti[0].media_voti() == 28.75
+        assert service.ottieni_statistiche()["media_generale"] == 28.75
+    
     def test_carica_studenti_file_vuoto(self):
         """Test caricamento da file vuoto"""
         mock_file_manager = Mock()
@@ -115,6 +124,22 @@ class TestStudentService:
         studenti = student_service_temp.ottieni_tutti_studenti()
         assert len(studenti) == 2
 
+    def test_letture_senza_copie(self, student_service_temp):
+        student_service_temp.aggiungi_studente("12345", "Mario", "Rossi")
+        student_service_temp.aggiungi_studente("67890", "Lucia", "Bianchi")
+        assert student_service_temp.conta_studenti() == 2
+        assert [s.nome for s in student_service_temp.itera_studenti()] == ["Mario", "Lucia"]
+        assert student_service_temp.vista_studenti()[1].nome == "Lucia"
+        assert [s.nome for s in student_service_temp.ottieni_pagina_studenti(1, 5)] == ["Lucia"]
+        esportati = student_service_temp.esporta_dati_json()
+        esportati[0]["voti"].append(18)
+        esportati[0]["nome"] = "Luigi"
+        assert student_service_temp.esporta_dati_json()[0] == {
+            "matricola": "12345", "nome": "Mario", "cognome": "Rossi", "voti": []
+        }
+        student_service_temp.aggiungi_voto("12345", "30")
+        assert student_service_temp.esporta_dati_json()[0]["voti"] == [30]
+
     def test_cerca_studenti_per_nome(self, student_service_temp):
         student_service_temp.aggiungi_studente("12345", "Mario", "Rossi")
         student_service_temp.aggiungi_studente("67890", "Maria", "Bianchi")
@@ -169,3 +194,110 @@ class TestStudentService:
         # Matricola invalida
         with pytest.raises(ValueError):
             student_service_temp.aggiungi_studente("Mario", "Rossi", "-1")
+    
+    def test_modifiche_con_journal(self, tmp_path):
+        """Test che con il journal attivo le modifiche non riscrivano lo snapshot"""
+        file_manager = FileManager(tmp_path / "registro.txt", journal=True)
+        service = StudentService(file_manager)
+        service.aggiungi_studente("12345", "Mario", "Rossi")
+        service.aggiungi_voto("12345", "28")
+        assert file_manager.journal_path.exists()
+        assert file_manager.file_path.read_text(encoding='utf-8').strip() == "[]"
+        
+        service2 = StudentService(FileManager(tmp_path / "registro.txt", journal=True))
+        assert service2.ottieni_studente("12345").voti == [28]
+    
+    def test_classifica_per_media(self, student_service_temp):
+        """Test delle interrogazioni sulla classifica per media"""
+        for matricola, voto in [("11", "24"), ("22", "30"), ("33", "27")]:
+            student_service_temp.aggiungi_studente(matricola, "Mario", "Rossi")
+            student_service_temp.aggiungi_voto(matricola, voto)
+        assert [s.matricola for s in student_service_temp.ottieni_migliori_studenti(2)] == [22, 33]
+        assert [s.matricola for s in student_service_temp.ottieni_peggiori_studenti(1)] == [11]
+        assert student_service_temp.ottieni_posizione_studente("33") == 2
+        assert student_service_temp.ottieni_percentile_studente("11") == pytest.approx(100 / 3)
+
+
+class TestSalvataggioDifferito:
+    """Test per il salvataggio differito e automatico"""
+    
+    @staticmethod
+    def conta_salvataggi(file_manager, monkeypatch):
+        """Conta le scritture del file dati"""
+        salvataggi = []
+        originale = file_manager._scrivi_atomico
+        monkeypatch.setattr(file_manager, "_scrivi_atomico",
+                            lambda *args, **kwargs: salvataggi.append(args) or originale(*args, **kwargs))
+        return salvataggi
+    
+    @staticmethod
+    def matricole_su_disco(file_manager):
+        return [s["matricola"] for s in FileManager(file_manager.file_path).leggi_studenti()]
+    
+    def test_salvataggio_fallito_segnalato(self, tmp_path, monkeypatch):
+        service = StudentService(FileManager(tmp_path / "registro.txt"))
+        
+        def fallisci(*args, **kwargs):
+            raise OSError("disco pieno")
+        
+        monkeypatch.setattr(service.file_manager, "_scrivi_atomico", fallisci)
+        with pytest.raises(IOError):
+            with service.salvataggio_differito():
+                service.aggiungi_studente("12345", "Mario", "Rossi")
+        assert service.modifiche_in_sospeso == 1
+    
+    def test_blocco_salva_una_volta(self, tmp_path, monkeypatch):
+        service = StudentService(FileManager(tmp_path / "registro.txt"))
+        service.aggiungi_studente("12345", "Mario", "Rossi")
+        salvataggi = self.conta_salvataggi(service.file_manager, monkeypatch)
+        
+        with service.salvataggio_differito():
+            for voto in ("18", "24", "30"):
+                service.aggiungi_voto("12345", voto)
+            service.aggiungi_studente("67890", "Lucia", "Bianchi")
+            assert service.modifiche_in_sospeso == 4
+            assert service.ottieni_studente("12345").voti == [18, 24, 30]
+            assert salvataggi == []
+        
+        assert len(salvataggi) == 1
+        assert service.modifiche_in_sospeso == 0
+        assert self.matricole_su_disco(service.file_manager) == ["12345", "67890"]
+    
+    def test_modifiche_di_altri_processi_integrate(self, tmp_path):
+        service = StudentService(FileManager(tmp_path / "registro.txt"))
+        altro = StudentService(FileManager(tmp_path / "registro.txt"))
+        with service.salvataggio_differito():
+            service.aggiungi_studente("12345", "Mario", "Rossi")
+            altro.aggiungi_studente("67890", "Lucia", "Bianchi")
+            service.aggiungi_voto("12345", "28")
+        assert self.matricole_su_disco(service.file_manager) == ["67890", "12345"]
+        assert altro.ottieni_studente("12345").voti == [28]
+    
+    def test_blocco_con_journal(self, tmp_path):
+        file_manager = FileManager(tmp_path / "registro.txt", journal=True)
+        service = StudentService(file_manager)
+        with service.salvataggio_differito():
+            service.aggiungi_studente("12345", "Mario", "Rossi")
+            service.aggiungi_voto("12345", "28")
+            assert not file_manager.journal_path.exists()
+        assert len(file_manager.journal_path.read_text(encoding="utf-8").splitlines()) == 3
+        assert StudentService(FileManager(file_manager.file_path, journal=True)).ottieni_studente("12345").voti == [28]
+    
+    def test_autosalvataggio_dopo_n_modifiche(self, tmp_path, monkeypatch):
+        service = StudentService(FileManager(tmp_path / "registro.txt"), autosalva_dopo=3)
+        service.carica_studenti()
+        salvataggi = self.conta_salvataggi(service.file_manager, monkeypatch)
+        service.aggiungi_studente("12345", "Mario", "Rossi")
+        service.aggiungi_voto("12345", "18")
+        assert salvataggi == [] and service.modifiche_in_sospeso == 2
+        service.aggiungi_voto("12345", "30")
+        assert len(salvataggi) == 1 and service.modifiche_in_sospeso == 0
+    
+    def test_autosalvataggio_a_tempo(self, tmp_path):
+        import time
+        service = StudentService(FileManager(tmp_path / "registro.txt"), autosalva_secondi=0.05)
+        service.aggiungi_studente("12345", "Mario", "Rossi")
+        scadenza = time.monotonic() + 5
+        while service.modifiche_in_sospeso and time.monotonic() < scadenza:
+            time.sleep(0.01)
+        assert self.matricole_su_disco(service.file_manager) == ["12345"]
@@ -4,9 +4,12 @@ Test unitari per il modulo ui
 Testa l'interfaccia utente e le interazioni con l'utente.
 """
 
+import subprocess
+import sys
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from io import StringIO
+from pathlib import Path
 from src.ui import MenuUI
 from src.student_service import StudentService
 from src.data_manager import FileManager
@@ -21,6 +24,9 @@ class TestMenuUI:
         # Verifica che il file manager punti al file giusto
         assert str(ui.file_manager.file_path) == str(temp_file)
         assert isinstance(ui.student_service, StudentService)
+        # L'esportatore PDF viene creato solo quando serve
+        assert ui._pdf_exporter is None
+        assert ui.pdf_exporter is ui.pdf_exporter
     
     @patch('builtins.input')
     @patch('sys.stdout', new_callable=StringIO)
@@ -166,6 +172,17 @@ class TestMenuUI:
         except Exception as e:
             pytest.fail(f"Eccezione non gestita: {e}")
     
+    @pytest.mark.parametrize("uscita", ["0", KeyboardInterrupt()])
+    @patch('builtins.input')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_uscita_salva_modifiche_in_sospeso(self, mock_stdout, mock_input, uscita, temp_file):
+        """Test salvataggio delle modifiche in sospeso all'uscita dal menu"""
+        ui = MenuUI(str(temp_file))
+        mock_input.side_effect = [uscita]
+        with patch.object(ui.student_service, 'chiudi') as chiudi:
+            ui.esegui_menu_principale()
+        chiudi.assert_called_once_with()
+    
     @patch('builtins.input')
     @patch('sys.stdout', new_callable=StringIO)
     def test_validazione_input_matricola(self, mock_stdout, mock_input, temp_file):
@@ -219,3 +236,151 @@ class TestMenuUI:
         # (questo dipende dall'implementazione specifica)
         # Verifica che il metodo di salvataggio esista
         assert hasattr(ui, 'salva_dati') or hasattr(ui.student_service, 'salva_studenti')
+
+
+class TestListaPaginata:
+    """Test per la lista studenti paginata"""
+    
+    @pytest.fixture
+    def ui_popolata(self, temp_file):
+        ui = MenuUI(str(temp_file))
+        lettere = "abcdefghijklmnopqrstuvwxy"
+        for i in range(25):
+            nome = ("Luca" if i < 10 else "Anna") + lettere[i]
+            ui.student_service.aggiungi_studente(f"{100 + i}", nome, "Cognome" + lettere[24 - i])
+            ui.student_service.aggiungi_voto(f"{100 + i}", str(18 + i % 13))
+        return ui
+    
+    @patch('builtins.input')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_una_pagina_senza_comandi(self, mock_stdout, mock_input, temp_file):
+        """Con una sola pagina la lista viene stampata senza chiedere comandi"""
+        ui = MenuUI(str(temp_file))
+        ui.student_service.aggiungi_studente("12345", "Mario", "Rossi")
+        ui._visualizza_lista_studenti()
+        mock_input.assert_not_called()
+        assert "[12345] Mario Rossi - Media: 0.00 (0 voti)" in mock_stdout.getvalue()
+    
+    @patch('builtins.input')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_navigazione_pagine(self, mock_stdout, mock_input, ui_popolata):
+        """Solo le righe della pagina visibile vengono stampate"""
+        mock_input.side_effect = ["s", "s", "p", "v 1", ""]
+        ui_popolata._visualizza_lista_studenti()
+        pagine = mock_stdout.getvalue().split("📋 Lista studenti")[1:]
+        assert len(pagine) == 5
+        assert "Pagina 1/2" in pagine[0] and "[119]" in pagine[0] and "[120]" not in pagine[0]
+        assert "Pagina 2/2" in pagine[1] and "[120]" in pagine[1] and "[100]" not in pagine[1]
+        # Oltre l'ultima pagina si resta sull'ultima
+        assert "Pagina 2/2" in pagine[2]
+        assert "Pagina 1/2" in pagine[3]
+        assert "Pagina 1/2" in pagine[4]
+    
+    @patch('builtins.input')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_ordinamento(self, mock_stdout, mock_input, ui_popolata):
+        """Ordinamento per nome e per media"""
+        mock_input.side_effect = ["o nome", "o media", ""]
+        ui_popolata._visualizza_lista_studenti()
+        pagine = mock_stdout.getvalue().split("📋 Lista studenti")[1:]
+        righe_nome = [r for r in pagine[1].splitlines() if r.startswith("[")]
+        assert righe_nome[0].startswith("[124] Annay Cognomea")
+        righe_media = [r for r in pagine[2].splitlines() if r.startswith("[")]
+        assert righe_media[0].startswith("[112]") and "Media: 30.00" in righe_media[0]
+    
+    @patch('builtins.input')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_filtro(self, mock_stdout, mock_input, ui_popolata):
+        """Il filtro restringe la lista e si rimuove con 'f' senza testo"""
+        mock_input.side_effect = ["f Luca", "f Zzz", "f", ""]
+        ui_popolata._visualizza_lista_studenti()
+        pagine = mock_stdout.getvalue().split("📋 Lista studenti")[1:]
+        assert "(10 studenti)" in pagine[1] and "Pagina 1/1" in pagine[1]
+        assert "Nessuno studente corrisponde" in pagine[2]
+        assert "(25 studenti)" in pagine[3]
+
+
+class TestEsportazioneInBackground:
+    """Test per le esportazioni PDF avviate dal menu"""
+    
+    @patch('builtins.input')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_esporta_e_notifica(self, mock_stdout, mock_input, temp_file, tmp_path, monkeypatch):
+        """L'esportazione parte in background e viene segnalata al termine"""
+        monkeypatch.setattr('src.ui.EXPORTS_DIR', tmp_path)
+        ui = MenuUI(str(temp_file))
+        ui.student_service.aggiungi_studente("12345", "Mario", "Rossi")
+        
+        mock_input.side_effect = ["6", "registro", "9", "0"]
+        ui.esegui_menu_principale()
+        
+        output = mock_stdout.getvalue()
+        assert "Esportazione #1 avviata in background" in output
+        assert "#1 registro.pdf" in output
+        assert (tmp_path / "registro.pdf").exists()
+        # L'esportatore del menu (e reportlab) non viene caricato
+        assert ui._pdf_exporter is None
+    
+    @patch('builtins.input')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_stato_senza_esportazioni(self, mock_stdout, mock_input, temp_file):
+        """Lo stato senza esportazioni non avvia processi"""
+        ui = MenuUI(str(temp_file))
+        mock_input.side_effect = ["9", "0"]
+        ui.esegui_menu_principale()
+        
+        assert "Nessuna esportazione avviata" in mock_stdout.getvalue()
+        assert ui.coda_esportazioni is None
+    
+    @patch('builtins.input')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_esporta_pagelle(self, mock_stdout, mock_input, temp_file, tmp_path, monkeypatch):
+        """Le pagelle vengono create in background in una nuova cartella con il rapporto"""
+        monkeypatch.setattr('src.ui.EXPORTS_DIR', tmp_path)
+        ui = MenuUI(str(temp_file))
+        ui.student_service.aggiungi_studente("12345", "Mario", "Rossi")
+        ui.student_service.aggiungi_studente("67890", "Lucia", "Bianchi")
+        
+        mock_input.side_effect = ["10", "0"]
+        ui.esegui_menu_principale()
+        
+        output = mock_stdout.getvalue()
+        assert "Esportazione #1 avviata in background: pagelle_" in output
+        assert "Pagelle create: 2" in output
+        assert len(list(tmp_path.glob("pagelle_*/pagella_*.pdf"))) == 2
+
+
+class TestAvvio:
+    """Test per il costo di avvio del menu"""
+    
+    # Budget generoso per le macchine lente: la regressione da evitare è il
+    # caricamento di reportlab e NumPy, verificato separatamente
+    BUDGET_IMPORT_MS = 1000
+    
+    @staticmethod
+    def _importa(modulo: str) -> subprocess.CompletedProcess:
+        codice = (f"import sys, {modulo}; "
+                  "print(sorted(m for m in sys.modules if m.split('.')[0] in ('reportlab', 'numpy')))")
+        return subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", codice],
+            cwd=Path(__file__).resolve().parents[2], capture_output=True, text=True, check=True,
+        )
+    
+    @pytest.mark.parametrize("modulo", ["src.ui", "registro_studenti_ai"])
+    def test_import_senza_dipendenze_pesanti(self, modulo):
+        """Il supporto PDF e NumPy vengono caricati solo al primo utilizzo"""
+        assert self._importa(modulo).stdout.strip() == "[]"
+    
+    def test_budget_import_ui(self):
+        """Il tempo di import di src.ui resta nel budget"""
+        righe = self._importa("src.ui").stderr.splitlines()
+        # Formato: "import time: self [us] | cumulative | imported package"
+        cumulativo = next(int(riga.split("|")[1]) for riga in righe
+                          if riga.split("|")[-1].strip() == "src.ui")
+        assert cumulativo / 1000 < self.BUDGET_IMPORT_MS
+    
+    def test_pdf_caricato_al_primo_utilizzo(self, temp_file):
+        """L'esportatore viene creato dalla proprietà pdf_exporter"""
+        from src.pdf_exporter import PDFExporter
+        ui = MenuUI(str(temp_file))
+        assert isinstance(ui.pdf_exporter, PDFExporter)
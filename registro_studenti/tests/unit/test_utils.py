@@ -5,7 +5,11 @@ Testa le funzioni di utilità e validazione.
 """
 
 import pytest
-from src.utils import calcola_media, valida_voto, valida_matricola, valida_nome
+from src import utils
+from src.utils import (
+    calcola_media, valida_voto, valida_matricola, valida_nome,
+    valida_voti, valida_matricole, valida_nomi
+)
 
 
 class TestCalcolaMedia:
@@ -151,3 +155,64 @@ class TestValidaNome:
         nome_lungo = "A" * 51
         with pytest.raises(ValueError, match="non può superare i 50 caratteri"):
             valida_nome(nome_lungo)
+
+
+class TestValidazioneInBlocco:
+    """Test per le funzioni di validazione in blocco"""
+    
+    VOTI = ["18", " 30 ", "28.7", "17", "31", "abc", "", "024", "٢٥"]
+    MATRICOLE = ["12345", " 67890 ", "1", "-12", "12a", "", "١٢٣"]
+    NOMI = ["mario", "D'Angelo", "nicolò", "x", "Ab1", "  anna maria ", "Zoë", "Ørsted", "a" * 51, "Ⅷ Re"]
+    
+    @staticmethod
+    def attesi(validatore, valori):
+        """Risultato calcolato con la funzione per singolo valore"""
+        validi, errori = [], []
+        for indice, valore in enumerate(valori):
+            try:
+                validi.append((indice, validatore(valore)))
+            except ValueError as e:
+                errori.append((indice, str(e)))
+        return validi, errori
+    
+    @pytest.mark.parametrize("in_blocco,singolo,valori", [
+        (valida_voti, valida_voto, VOTI),
+        (valida_matricole, valida_matricola, MATRICOLE),
+        (valida_nomi, valida_nome, NOMI),
+    ])
+    def test_equivalenza_con_validazione_singola(self, in_blocco, singolo, valori):
+        """Test che i risultati coincidano con le funzioni per singolo valore"""
+        assert in_blocco(iter(valori), processi=1) == self.attesi(singolo, valori)
+    
+    def test_valore_non_stringa(self):
+        """Test che i valori non testuali diventino errori"""
+        validi, errori = valida_voti(["28", None], processi=1)
+        assert validi == [(0, 28)]
+        assert errori[0][0] == 1
+    
+    def test_validazione_parallela(self, monkeypatch):
+        """Test che la suddivisione in blocchi tra processi conservi gli indici"""
+        monkeypatch.setattr(utils, "VALIDAZIONE_SOGLIA_PARALLELA", 10)
+        monkeypatch.setattr(utils, "VALIDAZIONE_DIMENSIONE_BLOCCO", 7)
+        valori = self.VOTI * 5
+        assert valida_voti(valori, processi=2) == self.attesi(valida_voto, valori)
+        assert valida_voti(iter(valori), processi=2) == self.attesi(valida_voto, valori)
+    
+    def test_iteratore_letto_man_mano(self):
+        """Test che nel processo corrente i valori non vengano copiati in anticipo"""
+        letti = []
+        
+        def voti():
+            for voto in self.VOTI:
+                letti.append(voto)
+                yield voto
+        
+        def valida(voto):
+            # Al momento della validazione è stato letto solo il valore corrente
+            assert letti[-1] == voto and len(letti) == len(validati) + 1
+            validati.append(voto)
+            return voto
+        
+        validati = []
+        utils._valida_in_blocco(valida, voti(), processi=1)
+        assert validati == list(self.VOTI)